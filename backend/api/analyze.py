@@ -1,15 +1,25 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks, File, UploadFile
+from fastapi import FastAPI, APIRouter, HTTPException, BackgroundTasks, File, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from pathlib import Path
+from contextlib import asynccontextmanager
 try:
-    from book_detector.book_detector import BookSpineDetector
+    from book_detector.book_detector import BookSpineDetector, BatchedDetector, export_tensorrt_engine
 except ImportError:
-    from backend.book_detector.book_detector import BookSpineDetector
+    from backend.book_detector.book_detector import BookSpineDetector, BatchedDetector, export_tensorrt_engine
+try:
+    from utils.image_processing import decode_image, encode_jpeg, is_jpeg
+except ImportError:
+    from backend.utils.image_processing import decode_image, encode_jpeg, is_jpeg
 import os
+import shutil
 import cv2
 import numpy as np
 import uuid
-from typing import Dict, List, Any, Union
-import json
+from collections import Counter
+from operator import itemgetter
+from typing import Dict, List, Any, Optional, Union
+import orjson
+import aiofiles
 from dotenv import load_dotenv
 from io import BytesIO
 from pydantic import BaseModel
@@ -20,8 +30,92 @@ current_dir = Path(__file__).parent.parent.parent  # Go up to project root
 env_path = current_dir / ".env"
 load_dotenv(env_path)
 
+# Whether a real OpenAI API key is configured (checked once at import)
+OPENAI_KEY_CONFIGURED = os.getenv("OPENAI_API_KEY", "") not in ("", "your_openai_api_key_here")
+
 router = APIRouter()
 
+# Pretty-print result files only when debugging
+DEBUG = os.getenv("DEBUG", "False").lower() == "true"
+JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if DEBUG else 0)
+
+async def _read_json(path: Path) -> Any:
+    """Load a JSON results file without blocking the event loop"""
+    async with aiofiles.open(path, 'rb') as f:
+        return orjson.loads(await f.read())
+
+async def _write_json(path: Path, data: Any) -> None:
+    """Write a JSON results file without blocking the event loop"""
+    async with aiofiles.open(path, 'wb') as f:
+        await f.write(orjson.dumps(data, option=JSON_OPTIONS))
+
+# Extensions uploads are stored with, most common first
+UPLOAD_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.bmp', '.tiff')
+
+def _resolve_upload(file_id: str) -> Path:
+    """
+    Find the stored upload for a file_id
+    
+    Tries the known extensions with a direct stat before falling back to a
+    directory scan.
+    
+    Args:
+        file_id: Unique file identifier
+        
+    Returns:
+        Path to the uploaded image
+        
+    Raises:
+        HTTPException: 404 if no upload exists for the file_id
+    """
+    upload_dir = Path("static/uploads")
+    for extension in UPLOAD_EXTENSIONS:
+        file_path = upload_dir / f"{file_id}{extension}"
+        if os.path.exists(file_path):
+            return file_path
+    
+    files = list(upload_dir.glob(f"{file_id}.*"))
+    if not files:
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    return files[0]
+
+async def _load_analysis(file_id: str) -> List[Dict]:
+    """
+    Load the saved analysis results for a file_id
+    
+    Args:
+        file_id: Unique file identifier
+        
+    Returns:
+        List of analyzed books
+        
+    Raises:
+        HTTPException: 404 if no results exist for the file_id
+    """
+    results_path = Path("static/results") / f"{file_id}_analysis.json"
+    try:
+        return await _read_json(results_path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Analysis results not found")
+
+_is_valid = itemgetter('isValid')
+
+def _count_valid(books: List[Dict]) -> int:
+    """
+    Count books whose extraction passed validation
+    
+    The detector sets 'isValid' on every book it returns, so the flag can be
+    read directly instead of through dict.get.
+    
+    Args:
+        books: List of analyzed books
+        
+    Returns:
+        Number of valid books
+    """
+    return sum(map(_is_valid, books))
+
 # Pydantic models for request/response
 class FileIdRequest(BaseModel):
     file_id: str
@@ -30,33 +124,93 @@ class AnalyzeWithPreferencesRequest(BaseModel):
     file_id: str
     selected_genres: List[str]
 
-# Initialize detector (you'll need to set up environment variables)
-try:
-    # Get the correct path to the model file
-    current_dir = Path(__file__).parent.parent.parent  # Go up to project root
-    model_path = current_dir / "models" / "yolo_weights" / "best.pt"
+def init_detector() -> Optional[BookSpineDetector]:
+    """
+    Initialize the book detector (you'll need to set up environment variables)
     
-    # Check if model file exists
-    if not model_path.exists():
-        print(f"❌ Model file not found at: {model_path}")
-        detector = None
-    else:
+    Returns:
+        BookSpineDetector, or None if the model or API key is unavailable
+    """
+    try:
+        # Get the correct path to the model file
+        current_dir = Path(__file__).parent.parent.parent  # Go up to project root
+        model_path = current_dir / "models" / "yolo_weights" / "best.pt"
+        
+        # Check if model file exists
+        if not model_path.exists():
+            print(f"❌ Model file not found at: {model_path}")
+            return None
+        
         # Check if OpenAI API key is set
         openai_key = os.getenv("OPENAI_API_KEY")
-        if not openai_key or openai_key == "your_openai_api_key_here":
+        if not OPENAI_KEY_CONFIGURED:
             print("❌ OpenAI API key not set. Please update .env file with your actual API key.")
-            detector = None
-        else:
-            detector = BookSpineDetector(
-                model_path=str(model_path),
-                openai_api_key=openai_key
-            )
-            print("✅ BookSpineDetector initialized successfully")
-            
-except Exception as e:
-    print(f"❌ Error initializing detector: {e}")
-    print(f"   Error type: {type(e).__name__}")
-    detector = None
+            return None
+        
+        detector = BookSpineDetector(
+            model_path=export_tensorrt_engine(str(model_path)),
+            openai_api_key=openai_key
+        )
+        print("✅ BookSpineDetector initialized successfully")
+        return detector
+        
+    except Exception as e:
+        print(f"❌ Error initializing detector: {e}")
+        print(f"   Error type: {type(e).__name__}")
+        return None
+
+def warmup_detector(detector: BookSpineDetector) -> None:
+    """Run a dummy YOLO pass so the first request doesn't pay the cold-start cost"""
+    if detector.model is None:
+        return
+    
+    try:
+        detector.predict_batch([np.zeros((640, 640, 3), np.uint8)])
+        print("✅ YOLO model warmed up")
+    except Exception as e:
+        print(f"⚠️  YOLO warmup failed: {e}")
+
+# Set by the lifespan handler at application startup
+detector: Optional[BookSpineDetector] = None
+
+# Coalesces concurrent detection requests into batched YOLO passes
+batched_detector: Optional[BatchedDetector] = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create output directories and initialize the detector at startup"""
+    global detector, batched_detector
+    
+    # Handlers write here relative to the working directory
+    Path("static/uploads").mkdir(parents=True, exist_ok=True)
+    Path("static/results").mkdir(parents=True, exist_ok=True)
+    
+    detector = await run_in_threadpool(init_detector)
+    if detector:
+        await run_in_threadpool(warmup_detector, detector)
+        batched_detector = BatchedDetector(detector)
+    
+    app.state.detector = detector
+    yield
+
+def _genre_statistics(books: List[Dict]) -> Dict[str, int]:
+    """
+    Get genre statistics for a list of books
+    
+    Args:
+        books: Books to compute statistics for
+        
+    Returns:
+        Dict mapping genre to book count, empty on error
+    """
+    if not detector or not books:
+        return {}
+    
+    try:
+        return detector.get_genre_statistics(books)
+    except Exception as e:
+        print(f"Error getting genre statistics: {e}")
+        return {}
 
 @router.post("/books")
 async def analyze_books(file: UploadFile = File(...)) -> Dict[str, Any]:
@@ -73,7 +227,7 @@ async def analyze_books(file: UploadFile = File(...)) -> Dict[str, Any]:
     
     if not detector:
         error_msg = "Book detector not initialized. "
-        if not os.getenv("OPENAI_API_KEY") or os.getenv("OPENAI_API_KEY") == "your_openai_api_key_here":
+        if not OPENAI_KEY_CONFIGURED:
             error_msg += "Please set your OpenAI API key in the .env file."
         else:
             error_msg += "YOLO model failed to load. Check server logs for details. The application can still work with basic functionality."
@@ -84,51 +238,48 @@ async def analyze_books(file: UploadFile = File(...)) -> Dict[str, Any]:
         if not file.content_type.startswith('image/'):
             raise HTTPException(status_code=400, detail="File must be an image")
         
-        # Read file content
+        # Read the upload without blocking the event loop; it may have been
+        # spooled to disk
         file_content = await file.read()
         
-        # Convert bytes to numpy array for OpenCV
-        nparr = np.frombuffer(file_content, np.uint8)
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        # Decode bytes to a BGR array (libjpeg-turbo for JPEG uploads)
+        image = decode_image(file_content)
         
         if image is None:
             raise HTTPException(status_code=400, detail="Invalid image file")
         
-        # Analyze the image directly
-        results = detector.detect_books(image)
+        # Save the original image before detection so the upload can be released
+        # JPEG uploads are written as-is instead of being re-encoded
+        file_id = str(uuid.uuid4())
+        original_image_path = f"static/uploads/{file_id}.jpg"
+        if not is_jpeg(file_content):
+            file_content = encode_jpeg(image, quality=85)
+        async with aiofiles.open(original_image_path, 'wb') as f:
+            await f.write(file_content)
+        del file_content
         
-        # Get annotations data for drawing
-        annotations_data = detector.get_annotations_data(image)
+        await file.close()
         
-        # Create annotated image (simplified for now)
-        annotated_image = image.copy()
+        # Analyze the image directly
+        results = await batched_detector.submit(image)
         
-        # Save annotated image
-        file_id = str(uuid.uuid4())
+        # No overlay is drawn yet, so the annotated image is the original;
+        # link it rather than copying and re-encoding the pixels
         annotated_image_path = f"static/results/{file_id}_annotated.jpg"
-        os.makedirs(os.path.dirname(annotated_image_path), exist_ok=True)
-        cv2.imwrite(annotated_image_path, annotated_image)
-        
-        # Also save the original image for future reference
-        original_image_path = f"static/uploads/{file_id}.jpg"
-        os.makedirs(os.path.dirname(original_image_path), exist_ok=True)
-        cv2.imwrite(original_image_path, image)
+        try:
+            os.link(original_image_path, annotated_image_path)
+        except OSError:
+            await run_in_threadpool(shutil.copyfile, original_image_path, annotated_image_path)
         
         # Get genre statistics
-        genre_stats = {}
-        if detector and results:
-            try:
-                genre_stats = detector.get_genre_statistics(results)
-            except Exception as e:
-                print(f"Error getting genre statistics: {e}")
-                genre_stats = {}
+        genre_stats = _genre_statistics(results)
         
         return {
             "file_id": file_id,
             "books": results,
             "detected_books": results,
             "total_books": len(results),
-            "valid_books": sum(1 for book in results if book.get('isValid', False)),
+            "valid_books": _count_valid(results),
             "annotated_image_url": f"/static/results/{file_id}_annotated.jpg",
             "genre_statistics": genre_stats,
             "message": "Analysis completed successfully"
@@ -155,35 +306,27 @@ async def analyze_books_by_id(request: FileIdRequest) -> Dict[str, Any]:
     
     try:
         # Find the uploaded file
-        upload_dir = Path("static/uploads")
-        files = list(upload_dir.glob(f"{request.file_id}.*"))
-        
-        if not files:
-            raise HTTPException(status_code=404, detail="File not found")
+        file_path = _resolve_upload(request.file_id)
         
-        file_path = files[0]
+        # Load image
+        image = cv2.imread(str(file_path))
+        if image is None:
+            raise HTTPException(status_code=400, detail="Invalid image file")
         
         # Analyze the image
-        books = detector.process_image(str(file_path))
+        books = await batched_detector.submit(image)
         
         # Save results to JSON file
         results_path = Path("static/results") / f"{request.file_id}_analysis.json"
-        with open(results_path, 'w', encoding='utf-8') as f:
-            json.dump(books, f, indent=2, ensure_ascii=False)
+        await _write_json(results_path, books)
         
         # Get genre statistics
-        genre_stats = {}
-        if detector and books:
-            try:
-                genre_stats = detector.get_genre_statistics(books)
-            except Exception as e:
-                print(f"Error getting genre statistics: {e}")
-                genre_stats = {}
+        genre_stats = _genre_statistics(books)
         
         return {
             "books": books,
             "total_detected": len(books),
-            "valid_extractions": sum(1 for book in books if book.get('isValid', False)),
+            "valid_extractions": _count_valid(books),
             "analysis_id": request.file_id,
             "results_path": str(results_path),
             "genre_statistics": genre_stats
@@ -206,27 +349,15 @@ async def get_analysis_results(file_id: str) -> Dict[str, Any]:
         Dict containing book analysis results
     """
     try:
-        results_path = Path("static/results") / f"{file_id}_analysis.json"
-        
-        if not results_path.exists():
-            raise HTTPException(status_code=404, detail="Analysis results not found")
-        
-        with open(results_path, 'r', encoding='utf-8') as f:
-            books = json.load(f)
+        books = await _load_analysis(file_id)
         
         # Get genre statistics
-        genre_stats = {}
-        if detector and books:
-            try:
-                genre_stats = detector.get_genre_statistics(books)
-            except Exception as e:
-                print(f"Error getting genre statistics: {e}")
-                genre_stats = {}
+        genre_stats = _genre_statistics(books)
         
         return {
             "books": books,
             "total_detected": len(books),
-            "valid_extractions": sum(1 for book in books if book.get('isValid', False)),
+            "valid_extractions": _count_valid(books),
             "analysis_id": file_id,
             "genre_statistics": genre_stats
         }
@@ -252,21 +383,18 @@ async def get_annotations(file_id: str) -> Dict:
     
     try:
         # Find the uploaded file
-        upload_dir = Path("static/uploads")
-        files = list(upload_dir.glob(f"{file_id}.*"))
-        
-        if not files:
-            raise HTTPException(status_code=404, detail="File not found")
-        
-        file_path = files[0]
+        file_path = _resolve_upload(file_id)
         
         # Load image
         image = cv2.imread(str(file_path))
         if image is None:
             raise HTTPException(status_code=400, detail="Invalid image file")
         
-        # Get annotation data
-        annotation_data = detector.get_annotations_data(image)
+        # Reuse the saved analysis when there is one instead of detecting again
+        try:
+            annotation_data = detector.annotations_from_books(await _load_analysis(file_id))
+        except HTTPException:
+            annotation_data = detector.annotations_from_books(await batched_detector.submit(image))
         
         return {
             "file_id": file_id,
@@ -308,6 +436,9 @@ async def delete_analysis(file_id: str) -> Dict[str, str]:
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to delete analysis: {str(e)}")
 
+# The predefined genre list is fixed for the detector's lifetime
+_genres_response: Optional[Dict[str, Any]] = None
+
 @router.get("/genres")
 async def get_available_genres() -> Dict[str, Any]:
     """
@@ -319,13 +450,18 @@ async def get_available_genres() -> Dict[str, Any]:
     if not detector:
         raise HTTPException(status_code=500, detail="Book detector not initialized")
     
+    global _genres_response
+    if _genres_response is not None:
+        return _genres_response
+    
     try:
         available_genres = detector.get_available_genres()
-        return {
+        _genres_response = {
             "genres": available_genres,
             "total_genres": len(available_genres),
             "message": "Available genres retrieved successfully"
         }
+        return _genres_response
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get genres: {str(e)}")
 
@@ -342,13 +478,7 @@ async def filter_books_by_genre(file_id: str, genres: List[str]) -> Dict[str, An
         Dict containing filtered books
     """
     try:
-        results_path = Path("static/results") / f"{file_id}_analysis.json"
-        
-        if not results_path.exists():
-            raise HTTPException(status_code=404, detail="Analysis results not found")
-        
-        with open(results_path, 'r', encoding='utf-8') as f:
-            books = json.load(f)
+        books = await _load_analysis(file_id)
         
         # Filter books by genre
         filtered_books = []
@@ -358,13 +488,7 @@ async def filter_books_by_genre(file_id: str, genres: List[str]) -> Dict[str, An
                 filtered_books.append(book)
         
         # Get genre statistics for filtered results
-        genre_stats = {}
-        if detector and filtered_books:
-            try:
-                genre_stats = detector.get_genre_statistics(filtered_books)
-            except Exception as e:
-                print(f"Error getting genre statistics: {e}")
-                genre_stats = {}
+        genre_stats = _genre_statistics(filtered_books)
         
         return {
             "books": filtered_books,
@@ -392,41 +516,21 @@ async def get_book_statistics(file_id: str) -> Dict[str, Any]:
         Dict containing book statistics
     """
     try:
-        results_path = Path("static/results") / f"{file_id}_analysis.json"
-        
-        if not results_path.exists():
-            raise HTTPException(status_code=404, detail="Analysis results not found")
+        books = await _load_analysis(file_id)
         
-        with open(results_path, 'r', encoding='utf-8') as f:
-            books = json.load(f)
-        
-        # Calculate statistics
+        # Calculate valid, author and confidence statistics in one pass
         total_books = len(books)
-        valid_books = sum(1 for book in books if book.get('isValid', False))
-        
-        # Genre statistics
-        genre_stats = {}
-        if detector and books:
-            try:
-                genre_stats = detector.get_genre_statistics(books)
-            except Exception as e:
-                print(f"Error getting genre statistics: {e}")
-                genre_stats = {}
-        
-        # Author statistics
-        author_stats = {}
-        for book in books:
-            author = book.get('author', 'Unknown')
-            author_stats[author] = author_stats.get(author, 0) + 1
-        
-        # Confidence statistics
-        confidence_stats = {'high': 0, 'low': 0, 'unknown': 0}
+        valid_books = 0
+        author_stats = Counter()
+        confidence_stats = Counter({'high': 0, 'low': 0, 'unknown': 0})
         for book in books:
+            valid_books += bool(book.get('isValid', False))
+            author_stats[book.get('author', 'Unknown')] += 1
             confidence = book.get('genre_confidence', 'unknown')
-            if confidence in confidence_stats:
-                confidence_stats[confidence] += 1
-            else:
-                confidence_stats['unknown'] += 1
+            confidence_stats[confidence if confidence in ('high', 'low') else 'unknown'] += 1
+        
+        # Genre statistics
+        genre_stats = _genre_statistics(books)
         
         return {
             "analysis_id": file_id,
@@ -434,10 +538,10 @@ async def get_book_statistics(file_id: str) -> Dict[str, Any]:
             "valid_books": valid_books,
             "invalid_books": total_books - valid_books,
             "genre_statistics": genre_stats,
-            "author_statistics": author_stats,
-            "confidence_statistics": confidence_stats,
+            "author_statistics": dict(author_stats),
+            "confidence_statistics": dict(confidence_stats),
             "most_common_genre": max(genre_stats.items(), key=lambda x: x[1])[0] if genre_stats else "Unknown",
-            "most_common_author": max(author_stats.items(), key=lambda x: x[1])[0] if author_stats else "Unknown"
+            "most_common_author": author_stats.most_common(1)[0][0] if author_stats else "Unknown"
         }
         
     except HTTPException:
@@ -461,7 +565,7 @@ async def analyze_books_with_preferences(request: AnalyzeWithPreferencesRequest)
     
     if not detector:
         error_msg = "Book detector not initialized. "
-        if not os.getenv("OPENAI_API_KEY") or os.getenv("OPENAI_API_KEY") == "your_openai_api_key_here":
+        if not OPENAI_KEY_CONFIGURED:
             error_msg += "Please set your OpenAI API key in the .env file."
         else:
             error_msg += "YOLO model failed to load. Check server logs for details."
@@ -469,17 +573,16 @@ async def analyze_books_with_preferences(request: AnalyzeWithPreferencesRequest)
     
     try:
         # Find the uploaded file
-        upload_dir = Path("static/uploads")
-        files = list(upload_dir.glob(f"{request.file_id}.*"))
+        file_path = _resolve_upload(request.file_id)
         
-        if not files:
-            raise HTTPException(status_code=404, detail="File not found")
-        
-        file_path = files[0]
+        # Load image
+        print(f"🔍 Analyzing image: {file_path}")
+        image = cv2.imread(str(file_path))
+        if image is None:
+            raise HTTPException(status_code=400, detail="Invalid image file")
         
         # Analyze the image using the book detector
-        print(f"🔍 Analyzing image: {file_path}")
-        all_books = detector.process_image(str(file_path))
+        all_books = await batched_detector.submit(image)
         
         if not all_books:
             return {
@@ -493,9 +596,28 @@ async def analyze_books_with_preferences(request: AnalyzeWithPreferencesRequest)
                 "message": "No books detected in the image"
             }
         
+        # Nothing can match without preferences; skip filtering and metadata
+        if not request.selected_genres:
+            return {
+                "file_id": request.file_id,
+                "all_books": all_books,
+                "filtered_books": [],
+                "total_detected": len(all_books),
+                "total_matching_preferences": 0,
+                "selected_genres": [],
+                "genre_matches": {},
+                "all_genre_statistics": _genre_statistics(all_books),
+                "filtered_genre_statistics": {},
+                "message": f"Analysis complete: {len(all_books)} books detected, no genres selected"
+            }
+        
         # Filter books based on user preferences
         filtered_books = []
-        genre_matches = {}
+        genre_match_counts = Counter()
+        
+        # Lowercase the user preferences once instead of per book
+        selected_lower = [(genre, genre.lower()) for genre in request.selected_genres]
+        selected_set = frozenset(lower for _, lower in selected_lower)
         
         for book in all_books:
             # Get book genres (primary, secondary, tertiary)
@@ -503,18 +625,17 @@ async def analyze_books_with_preferences(request: AnalyzeWithPreferencesRequest)
             secondary_genre = book.get('secondary_genre', '').strip()
             tertiary_genre = book.get('tertiary_genre', '').strip()
             
-            # Check if any of the book's genres match user preferences
-            book_genres = [g for g in [primary_genre, secondary_genre, tertiary_genre] if g]
-            matching_genres = []
+            book_genres = {g.lower() for g in (primary_genre, secondary_genre, tertiary_genre) if g}
+            if not book_genres:
+                continue
             
-            for user_genre in request.selected_genres:
-                for book_genre in book_genres:
-                    # Case-insensitive matching with some flexibility
-                    if (user_genre.lower() in book_genre.lower() or 
-                        book_genre.lower() in user_genre.lower() or
-                        user_genre.lower() == book_genre.lower()):
-                        matching_genres.append(user_genre)
-                        break
+            # Exact matches are a single set intersection; only the remaining
+            # preferences need the case-insensitive substring check
+            exact = book_genres & selected_set
+            matching_genres = [
+                genre for genre, lower in selected_lower
+                if lower in exact or any(lower in book_genre or book_genre in lower for book_genre in book_genres)
+            ]
             
             # If book matches any user preference, include it
             if matching_genres:
@@ -524,29 +645,18 @@ async def analyze_books_with_preferences(request: AnalyzeWithPreferencesRequest)
                 filtered_books.append(book)
                 
                 # Update genre match statistics
-                for genre in matching_genres:
-                    genre_matches[genre] = genre_matches.get(genre, 0) + 1
+                genre_match_counts.update(matching_genres)
+        
+        genre_matches = dict(genre_match_counts)
         
         # Sort filtered books by match score (highest first)
         filtered_books.sort(key=lambda x: x.get('match_score', 0), reverse=True)
         
         # Get genre statistics for all books
-        all_genre_stats = {}
-        if detector and all_books:
-            try:
-                all_genre_stats = detector.get_genre_statistics(all_books)
-            except Exception as e:
-                print(f"Error getting genre statistics: {e}")
-                all_genre_stats = {}
+        all_genre_stats = _genre_statistics(all_books)
         
         # Get genre statistics for filtered books
-        filtered_genre_stats = {}
-        if detector and filtered_books:
-            try:
-                filtered_genre_stats = detector.get_genre_statistics(filtered_books)
-            except Exception as e:
-                print(f"Error getting filtered genre statistics: {e}")
-                filtered_genre_stats = {}
+        filtered_genre_stats = _genre_statistics(filtered_books)
         
         # Save results to JSON file
         results_data = {
@@ -559,8 +669,7 @@ async def analyze_books_with_preferences(request: AnalyzeWithPreferencesRequest)
         }
         
         results_path = Path("static/results") / f"{request.file_id}_preferences_analysis.json"
-        with open(results_path, 'w', encoding='utf-8') as f:
-            json.dump(results_data, f, indent=2, ensure_ascii=False)
+        await _write_json(results_path, results_data)
         
         # Fetch metadata for filtered books (covers, ratings, etc.)
         enhanced_books = []
@@ -578,7 +687,7 @@ async def analyze_books_with_preferences(request: AnalyzeWithPreferencesRequest)
                     })
                 
                 # Fetch metadata
-                enhanced_books = metadata_service.get_multiple_books_metadata(books_for_metadata)
+                enhanced_books = await metadata_service.aget_multiple_books_metadata(books_for_metadata)
                 print(f"✅ Enhanced {len(enhanced_books)} books with metadata")
                 
             except Exception as e:
@@ -37,7 +37,7 @@ async def get_book_metadata(request: BookMetadataRequest) -> Dict[str, Any]:
     try:
         logger.info(f"📚 Fetching metadata for: {request.title} by {request.author or 'Unknown'}")
         
-        metadata = metadata_service.get_book_metadata(
+        metadata = await metadata_service.aget_book_metadata(
             title=request.title,
             author=request.author
         )
@@ -65,7 +65,7 @@ async def get_multiple_books_metadata(request: MultipleBooksMetadataRequest) ->
     try:
         logger.info(f"📚 Fetching metadata for {len(request.books)} books")
         
-        enhanced_books = metadata_service.get_multiple_books_metadata(request.books)
+        enhanced_books = await metadata_service.aget_multiple_books_metadata(request.books)
         
         return {
             "success": True,
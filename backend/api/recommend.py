@@ -1,12 +1,33 @@
-from fastapi import APIRouter, HTTPException
-from typing import Dict, List, Any
-import json
+from fastapi import APIRouter, BackgroundTasks, HTTPException
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from typing import AbstractSet, Collection, Dict, FrozenSet, List, Any, Iterator, Mapping, Optional, Tuple
+from types import MappingProxyType
+from functools import lru_cache
+from contextlib import asynccontextmanager
+from itertools import chain
+from operator import itemgetter
+import orjson
+import asyncio
 import random
+import sys
+import hashlib
 import openai
+import httpx
+import aiofiles
 import os
+import logging
 from pathlib import Path
 from dotenv import load_dotenv
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, field_validator
+
+try:
+    from utils.disk_cache import DiskCache
+    from utils.micro_batch import MicroBatcher
+    from utils.rate_limit import AsyncRateLimiter
+except ImportError:
+    from backend.utils.disk_cache import DiskCache
+    from backend.utils.micro_batch import MicroBatcher
+    from backend.utils.rate_limit import AsyncRateLimiter
 
 # Load environment variables
 current_dir = Path(__file__).parent.parent.parent  # Go up to project root
@@ -15,42 +36,91 @@ load_dotenv(env_path)
 
 router = APIRouter()
 
+logger = logging.getLogger(__name__)
+
 # Pydantic models for request/response
+class DetectedBook(BaseModel):
+    """A detected book as sent by the frontend; extra detection fields are dropped"""
+    model_config = ConfigDict(extra='ignore')
+    
+    title: str = 'Unknown'
+    author: str = 'Unknown'
+    genre: str = 'Unknown'
+    
+    @field_validator('title', 'author', 'genre', mode='before')
+    @classmethod
+    def _default_missing(cls, value: Any) -> str:
+        """Treat null or empty fields as not extracted"""
+        if value is None or value == '':
+            return 'Unknown'
+        return str(value)
+
 class RecommendationRequest(BaseModel):
-    detected_books: List[Dict[str, Any]]
+    detected_books: List[DetectedBook]
     selected_genres: List[str]
     max_recommendations: int = 5
 
-# Initialize OpenAI client with proxy support for office environments
-try:
-    openai_api_key = os.getenv("OPENAI_API_KEY")
-    if openai_api_key and openai_api_key != "your_openai_api_key_here":
-        # For office environments with proxies, we need to handle this differently
-        # The new OpenAI client doesn't support proxies in constructor
-        # So we'll use httpx client with proxy support
-        
-        import httpx
-        
-        # Check if we're in a proxy environment
-        http_proxy = os.getenv("HTTP_PROXY") or os.getenv("http_proxy")
-        https_proxy = os.getenv("HTTPS_PROXY") or os.getenv("https_proxy")
-        
-        # Create httpx client with minimal configuration to avoid proxy issues
-        http_client = httpx.Client(
-            timeout=30.0,
-            limits=httpx.Limits(max_keepalive_connections=5, max_connections=10)
-        )
+class BatchRecommendationRequest(BaseModel):
+    requests: List[RecommendationRequest]
+
+class RecommendedBook(BaseModel):
+    """A book recommended by the model, as required by the structured output schema"""
+    model_config = ConfigDict(extra='forbid')
+    
+    title: str
+    author: str
+    genre: str
+    rating: float
+    reason: str
+    amazon_url: str
+    bookshop_url: str
+    source: str
+
+# OpenAI client with proxy support for office environments, created on first use
+@lru_cache(maxsize=1)
+def get_openai_client() -> Optional[openai.AsyncOpenAI]:
+    """
+    Get the shared async OpenAI client used for recommendations
+    
+    Returns:
+        AsyncOpenAI client, or None if the API key is not set
+    """
+    try:
+        openai_api_key = os.getenv("OPENAI_API_KEY")
+        if openai_api_key and openai_api_key != "your_openai_api_key_here":
+            # The OpenAI client doesn't support proxies in its constructor,
+            # so we pass our own httpx client with minimal configuration
+            http_client = httpx.AsyncClient(
+                timeout=30.0,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=50)
+            )
+            
+            # Create OpenAI client with the custom httpx client; the client
+            # retries 429s, 5xx and timeouts with exponential backoff
+            openai_client = openai.AsyncOpenAI(
+                api_key=openai_api_key,
+                http_client=http_client,
+                max_retries=3
+            )
+            logger.info("✅ OpenAI client initialized for recommendations")
+            return openai_client
         
-        # Create OpenAI client with the custom httpx client
-        openai_client = openai.OpenAI(api_key=openai_api_key, http_client=http_client)
-        print("✅ OpenAI client initialized for recommendations")
-    else:
-        openai_client = None
-        print("⚠️ OpenAI API key not set - will use fallback recommendations")
-except Exception as e:
-    openai_client = None
-    print(f"❌ Failed to initialize OpenAI client: {e}")
-    print(f"   This might be due to proxy settings. Check your network configuration.")
+        logger.warning("⚠️ OpenAI API key not set - will use fallback recommendations")
+        return None
+    except Exception as e:
+        logger.error("❌ Failed to initialize OpenAI client: %s", e)
+        logger.error("   This might be due to proxy settings. Check your network configuration.")
+        return None
+
+# Field values that mean a detected book's field wasn't extracted
+_MISSING_VALUES = frozenset({None, '', 'Unknown'})
+
+# Genres suggested when detected books have no usable categorization
+_COMMON_GENRES = (
+    "Fiction", "Non-Fiction", "Mystery", "Science Fiction", 
+    "Fantasy", "Romance", "Thriller", "Biography", "History", 
+    "Self-Help", "Business", "Technology", "Art", "Poetry", "Drama"
+)
 
 # Genre suggestions based on detected books with actual categorization
 def get_genre_suggestions(detected_books: List[Dict]) -> List[str]:
@@ -69,18 +139,12 @@ def get_genre_suggestions(detected_books: List[Dict]) -> List[str]:
     
     # If we have detected genres, use them
     if detected_genres:
-        # Get unique genres and return top 5
-        unique_genres = list(set(detected_genres))
+        # Get unique genres in detection order and return top 5
+        unique_genres = list(dict.fromkeys(detected_genres))
         return unique_genres[:5]
     
     # Fallback to common genres if no categorization available
-    common_genres = [
-        "Fiction", "Non-Fiction", "Mystery", "Science Fiction", 
-        "Fantasy", "Romance", "Thriller", "Biography", "History", 
-        "Self-Help", "Business", "Technology", "Art", "Poetry", "Drama"
-    ]
-    
-    return random.sample(common_genres, min(5, len(common_genres)))
+    return random.sample(_COMMON_GENRES, min(5, len(_COMMON_GENRES)))
 
 # Image-based recommendations: Books similar to what you already have
 def get_image_based_recommendations(detected_books: List[Dict], preferred_genres: List[str], max_recommendations: int = 10) -> List[Dict]:
@@ -96,44 +160,57 @@ def get_image_based_recommendations(detected_books: List[Dict], preferred_genres
     detected_titles = set()
     
     for book in detected_books:
-        if book.get('genre') and book['genre'] != 'Unknown':
-            detected_genres.add(book['genre'])
-        if book.get('author') and book['author'] != 'Unknown':
-            detected_authors.add(book['author'])
-        if book.get('title') and book['title'] != 'Unknown':
-            detected_titles.add(book['title'].lower())
-    
-    # Curated recommendations based on detected content
-    recommendations = []
+        genre = book.get('genre')
+        if genre not in _MISSING_VALUES:
+            detected_genres.add(genre)
+        author = book.get('author')
+        if author not in _MISSING_VALUES:
+            detected_authors.add(author)
+        title = book.get('title')
+        if title not in _MISSING_VALUES:
+            detected_titles.add(title.lower())
+    
+    # Only detected titles that are in the catalog can exclude a book; this is
+    # usually none, which reduces the per-book check to an emptiness test
+    detected_titles &= _CATALOG_TITLES_LOWER
+    
+    # Curated recommendations based on detected content, classified in one
+    # pass over the books in the detected genres
+    high_priority = []
+    medium_priority = []
+    for book in _books_in_genres(detected_genres):
+        if detected_titles and _TITLE_LOWER[book['title']] in detected_titles:
+            continue
+        
+        if book['author'] in detected_authors:
+            # High priority: Same genre + same author
+            high_priority.append({
+                **book,
+                'recommendation_reason': _REASONS[book['title']]['same_author'],
+                'priority': 'high'
+            })
+        elif len(high_priority) + len(medium_priority) < max_recommendations:
+            # Medium priority: Same genre, different author
+            medium_priority.append({
+                **book,
+                'recommendation_reason': _REASONS[book['title']]['same_genre'],
+                'priority': 'medium'
+            })
+    
+    recommendations = high_priority + medium_priority
     
-    # High priority: Same genre + same author
-    for book in get_curated_books():
-        if (book['genre'] in detected_genres and 
-            book['author'] in detected_authors and 
-            book['title'].lower() not in detected_titles):
-            book['recommendation_reason'] = f"Another {book['genre'].lower()} book by {book['author']}, similar to your collection"
-            book['priority'] = 'high'
-            recommendations.append(book)
-    
-    # Medium priority: Same genre, different author
-    for book in get_curated_books():
-        if (book['genre'] in detected_genres and 
-            book['author'] not in detected_authors and 
-            book['title'].lower() not in detected_titles and
-            len(recommendations) < max_recommendations):
-            book['recommendation_reason'] = f"Similar {book['genre'].lower()} book that matches your reading taste"
-            book['priority'] = 'medium'
-            recommendations.append(book)
-    
-    # Lower priority: Related genres
-    related_genres = get_related_genres(detected_genres)
-    for book in get_curated_books():
-        if (book['genre'] in related_genres and 
-            book['title'].lower() not in detected_titles and
-            len(recommendations) < max_recommendations):
-            book['recommendation_reason'] = f"Related {book['genre'].lower()} book that complements your collection"
-            book['priority'] = 'low'
-            recommendations.append(book)
+    # Lower priority: Related genres, only when there is still room
+    if len(recommendations) < max_recommendations:
+        related_genres = get_related_genres(frozenset(detected_genres))
+        for book in _books_in_genres(related_genres):
+            if len(recommendations) >= max_recommendations:
+                break
+            if not detected_titles or _TITLE_LOWER[book['title']] not in detected_titles:
+                recommendations.append({
+                    **book,
+                    'recommendation_reason': _REASONS[book['title']]['related_genre'],
+                    'priority': 'low'
+                })
     
     return recommendations[:max_recommendations]
 
@@ -146,810 +223,1164 @@ def get_genre_based_recommendations(preferred_genres: List[str], max_recommendat
         return []
     
     recommendations = []
-    curated_books = get_curated_books()
-    
-    # Sort books by rating within each genre
-    genre_books = {}
-    for book in curated_books:
-        genre = book['genre']
-        if genre not in genre_books:
-            genre_books[genre] = []
-        genre_books[genre].append(book)
     
     # Get top-rated books from each preferred genre
     for genre in preferred_genres:
-        if genre in genre_books:
-            # Sort by rating and take top books
-            genre_books[genre].sort(key=lambda x: x['rating'], reverse=True)
-            for book in genre_books[genre][:3]:  # Top 3 from each genre
+        if genre in _BOOKS_BY_GENRE_SORTED:
+            for book in _BOOKS_BY_GENRE_SORTED[genre][:3]:  # Top 3 from each genre
                 if len(recommendations) < max_recommendations:
-                    book['recommendation_reason'] = f"Highly rated {genre.lower()} book in your preferred genres"
-                    book['priority'] = 'high'
-                    recommendations.append(book)
+                    recommendations.append({
+                        **book,
+                        'recommendation_reason': _REASONS[book['title']]['top_rated'],
+                        'priority': 'high'
+                    })
     
     # If we need more books, add from related genres
     if len(recommendations) < max_recommendations:
-        related_genres = get_related_genres(set(preferred_genres))
-        for genre in related_genres:
-            if genre in genre_books and len(recommendations) < max_recommendations:
-                genre_books[genre].sort(key=lambda x: x['rating'], reverse=True)
-                for book in genre_books[genre][:2]:  # Top 2 from related genres
+        related_genres = get_related_genres(frozenset(preferred_genres))
+        # Walk related genres in catalog order rather than set order
+        for genre in _BOOKS_BY_GENRE_SORTED:
+            if genre in related_genres and len(recommendations) < max_recommendations:
+                for book in _BOOKS_BY_GENRE_SORTED[genre][:2]:  # Top 2 from related genres
                     if len(recommendations) < max_recommendations:
-                        book['recommendation_reason'] = f"Popular {genre.lower()} book that might interest you"
-                        book['priority'] = 'medium'
-                        recommendations.append(book)
+                        recommendations.append({
+                            **book,
+                            'recommendation_reason': _REASONS[book['title']]['popular'],
+                            'priority': 'medium'
+                        })
     
     return recommendations[:max_recommendations]
 
+# Genres related to each genre, built once at import
+_RELATED_MAP: Dict[str, frozenset] = {
+    'Fiction': frozenset({'Romance', 'Mystery', 'Thriller', 'Drama'}),
+    'Science Fiction': frozenset({'Fantasy', 'Technology'}),
+    'Fantasy': frozenset({'Science Fiction', 'Fiction'}),
+    'Mystery': frozenset({'Thriller', 'Fiction'}),
+    'Thriller': frozenset({'Mystery', 'Fiction'}),
+    'Romance': frozenset({'Fiction', 'Drama'}),
+    'Non-Fiction': frozenset({'Biography', 'History', 'Self-Help', 'Business'}),
+    'Biography': frozenset({'Non-Fiction', 'History'}),
+    'History': frozenset({'Biography', 'Non-Fiction'}),
+    'Self-Help': frozenset({'Non-Fiction', 'Business'}),
+    'Business': frozenset({'Self-Help', 'Non-Fiction', 'Technology'}),
+    'Technology': frozenset({'Business', 'Science Fiction'}),
+    'Art': frozenset({'Poetry', 'Drama'}),
+    'Poetry': frozenset({'Art', 'Drama'}),
+    'Drama': frozenset({'Poetry', 'Art', 'Fiction'})
+}
+
+# Each known genre gets one bit, so related-genre sets combine as integer masks
+_GENRE_BIT: Dict[str, int] = {genre: 1 << code for code, genre in enumerate(_COMMON_GENRES)}
+_RELATED_MASK: Dict[str, int] = {
+    genre: sum(_GENRE_BIT[related_genre] for related_genre in related)
+    for genre, related in _RELATED_MAP.items()
+}
+
+def _genres_from_mask(mask: int) -> FrozenSet[str]:
+    """Decode a genre bitmask back into genre names"""
+    return frozenset(genre for genre, bit in _GENRE_BIT.items() if mask & bit)
+
 # Get related genres for better recommendations
-def get_related_genres(genres: set) -> set:
-    """
-    Get genres related to the input genres
+@lru_cache(maxsize=256)
+def get_related_genres(genres: FrozenSet[str]) -> FrozenSet[str]:
     """
-    related_map = {
-        'Fiction': {'Romance', 'Mystery', 'Thriller', 'Drama'},
-        'Science Fiction': {'Fantasy', 'Technology'},
-        'Fantasy': {'Science Fiction', 'Fiction'},
-        'Mystery': {'Thriller', 'Fiction'},
-        'Thriller': {'Mystery', 'Fiction'},
-        'Romance': {'Fiction', 'Drama'},
-        'Non-Fiction': {'Biography', 'History', 'Self-Help', 'Business'},
-        'Biography': {'Non-Fiction', 'History'},
-        'History': {'Biography', 'Non-Fiction'},
-        'Self-Help': {'Non-Fiction', 'Business'},
-        'Business': {'Self-Help', 'Non-Fiction', 'Technology'},
-        'Technology': {'Business', 'Science Fiction'},
-        'Art': {'Poetry', 'Drama'},
-        'Poetry': {'Art', 'Drama'},
-        'Drama': {'Poetry', 'Art', 'Fiction'}
-    }
+    Get genres related to the input genres, excluding the input genres themselves
     
-    related = set()
+    Takes a frozenset so results can be memoized per genre combination.
+    """
+    related_mask = 0
+    genres_mask = 0
     for genre in genres:
-        if genre in related_map:
-            related.update(related_map[genre])
+        related_mask |= _RELATED_MASK.get(genre, 0)
+        genres_mask |= _GENRE_BIT.get(genre, 0)
     
-    # Remove original genres
-    related = related - genres
-    return related
+    return _genres_from_mask(related_mask & ~genres_mask)
 
 # Curated book database with intelligent recommendations
-def get_curated_books() -> List[Dict]:
+_CURATED_BOOK_DATA: List[Dict] = [
+    # Fiction
+    {
+        "title": "The Seven Husbands of Evelyn Hugo",
+        "author": "Taylor Jenkins Reid",
+        "genre": "Fiction",
+        "rating": 4.5,
+        "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
+        "amazon_url": "https://amazon.com/dp/1501139238",
+        "bookshop_url": "https://bookshop.org/books/the-seven-husbands-of-evelyn-hugo/9781501139239",
+        "reason": "A compelling character-driven story that matches your fiction preferences",
+        "source": "Goodreads"
+    },
+    {
+        "title": "The Midnight Library",
+        "author": "Matt Haig",
+        "genre": "Fiction",
+        "rating": 4.2,
+        "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
+        "amazon_url": "https://amazon.com/dp/0525559477",
+        "bookshop_url": "https://bookshop.org/books/the-midnight-library/9780525559474",
+        "reason": "A thought-provoking novel about life choices and second chances",
+        "source": "Goodreads"
+    },
+    {
+        "title": "Where the Crawdads Sing",
+        "author": "Delia Owens",
+        "genre": "Fiction",
+        "rating": 4.6,
+        "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
+        "amazon_url": "https://amazon.com/dp/0735219095",
+        "bookshop_url": "https://bookshop.org/books/where-the-crawdads-sing/9780735219090",
+        "reason": "A beautiful coming-of-age story with mystery elements",
+        "source": "Goodreads"
+    },
+    {
+        "title": "The Kite Runner",
+        "author": "Khaled Hosseini",
+        "genre": "Fiction",
+        "rating": 4.3,
+        "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
+        "amazon_url": "https://amazon.com/dp/159463193X",
+        "bookshop_url": "https://bookshop.org/books/the-kite-runner/9781594631931",
+        "reason": "A powerful story of friendship and redemption",
+        "source": "Goodreads"
+    },
+    
+    # Science Fiction
+    {
+        "title": "Project Hail Mary",
+        "author": "Andy Weir",
+        "genre": "Science Fiction",
+        "rating": 4.7,
+        "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
+        "amazon_url": "https://amazon.com/dp/0593135202",
+        "bookshop_url": "https://bookshop.org/books/project-hail-mary/9780593135204",
+        "reason": "A thrilling sci-fi adventure that matches your reading preferences",
+        "source": "Goodreads"
+    },
+    {
+        "title": "Dune",
+        "author": "Frank Herbert",
+        "genre": "Science Fiction",
+        "rating": 4.3,
+        "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
+        "amazon_url": "https://amazon.com/dp/0441172717",
+        "bookshop_url": "https://bookshop.org/books/dune/9780441172719",
+        "reason": "A classic epic sci-fi masterpiece with complex world-building",
+        "source": "Goodreads"
+    },
+    {
+        "title": "The Martian",
+        "author": "Andy Weir",
+        "genre": "Science Fiction",
+        "rating": 4.4,
+        "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
+        "amazon_url": "https://amazon.com/dp/0553418025",
+        "bookshop_url": "https://bookshop.org/books/the-martian/9780553418026",
+        "reason": "A gripping survival story set on Mars with scientific accuracy",
+        "source": "Goodreads"
+    },
+    {
+        "title": "Foundation",
+        "author": "Isaac Asimov",
+        "genre": "Science Fiction",
+        "rating": 4.2,
+        "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
+        "amazon_url": "https://amazon.com/dp/0553293354",
+        "bookshop_url": "https://bookshop.org/books/foundation/9780553293357",
+        "reason": "A foundational work of science fiction with grand scope",
+        "source": "Goodreads"
+    },
+    
+    # Fantasy
+    {
+        "title": "The Name of the Wind",
+        "author": "Patrick Rothfuss",
+        "genre": "Fantasy",
+        "rating": 4.5,
+        "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
+        "amazon_url": "https://amazon.com/dp/0756404746",
+        "bookshop_url": "https://bookshop.org/books/the-name-of-the-wind/9780756404741",
+        "reason": "An epic fantasy with beautiful prose and intricate magic system",
+        "source": "Goodreads"
+    },
+    {
+        "title": "Mistborn: The Final Empire",
+        "author": "Brandon Sanderson",
+        "genre": "Fantasy",
+        "rating": 4.4,
+        "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
+        "amazon_url": "https://amazon.com/dp/076531178X",
+        "bookshop_url": "https://bookshop.org/books/mistborn-the-final-empire/9780765311788",
+        "reason": "A unique magic system and compelling heist story",
+        "source": "Goodreads"
+    },
+    {
+        "title": "The Hobbit",
+        "author": "J.R.R. Tolkien",
+        "genre": "Fantasy",
+        "rating": 4.3,
+        "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
+        "amazon_url": "https://amazon.com/dp/054792822X",
+        "bookshop_url": "https://bookshop.org/books/the-hobbit/9780547928227",
+        "reason": "A timeless fantasy adventure that started it all",
+        "source": "Goodreads"
+    },
+    
+    # Mystery/Thriller
+    {
+        "title": "The Silent Patient",
+        "author": "Alex Michaelides",
+        "genre": "Thriller",
+        "rating": 4.3,
+        "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
+        "amazon_url": "https://amazon.com/dp/1250301696",
+        "bookshop_url": "https://bookshop.org/books/the-silent-patient/9781250301697",
+        "reason": "A psychological thriller that will keep you guessing until the end",
+        "source": "Goodreads"
+    },
+    {
+        "title": "Gone Girl",
+        "author": "Gillian Flynn",
+        "genre": "Thriller",
+        "rating": 4.1,
+        "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
+        "amazon_url": "https://amazon.com/dp/030758836X",
+        "bookshop_url": "https://bookshop.org/books/gone-girl/9780307588364",
+        "reason": "A twisted psychological thriller with unreliable narrators",
+        "source": "Goodreads"
+    },
+    {
+        "title": "The Girl with the Dragon Tattoo",
+        "author": "Stieg Larsson",
+        "genre": "Mystery",
+        "rating": 4.2,
+        "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
+        "amazon_url": "https://amazon.com/dp/0307269752",
+        "bookshop_url": "https://bookshop.org/books/the-girl-with-the-dragon-tattoo/9780307269751",
+        "reason": "A complex mystery with strong characters and social commentary",
+        "source": "Goodreads"
+    },
+    {
+        "title": "The Da Vinci Code",
+        "author": "Dan Brown",
+        "genre": "Mystery",
+        "rating": 4.0,
+        "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
+        "amazon_url": "https://amazon.com/dp/0307474275",
+        "bookshop_url": "https://bookshop.org/books/the-da-vinci-code/9780307474278",
+        "reason": "A fast-paced mystery thriller with historical elements",
+        "source": "Goodreads"
+    },
+    
+    # Romance
+    {
+        "title": "The Hating Game",
+        "author": "Sally Thorne",
+        "genre": "Romance",
+        "rating": 4.2,
+        "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
+        "amazon_url": "https://amazon.com/dp/0062439598",
+        "bookshop_url": "https://bookshop.org/books/the-hating-game/9780062439598",
+        "reason": "A delightful enemies-to-lovers romance with great chemistry",
+        "source": "Goodreads"
+    },
+    {
+        "title": "Beach Read",
+        "author": "Emily Henry",
+        "genre": "Romance",
+        "rating": 4.1,
+        "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
+        "amazon_url": "https://amazon.com/dp/1984806734",
+        "bookshop_url": "https://bookshop.org/books/beach-read/9781984806734",
+        "reason": "A charming romance with depth and humor",
+        "source": "Goodreads"
+    },
+    {
+        "title": "The Kiss Quotient",
+        "author": "Helen Hoang",
+        "genre": "Romance",
+        "rating": 4.0,
+        "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
+        "amazon_url": "https://amazon.com/dp/0451490807",
+        "bookshop_url": "https://bookshop.org/books/the-kiss-quotient/9780451490803",
+        "reason": "A unique romance with neurodiverse representation",
+        "source": "Goodreads"
+    },
+    
+    # Non-Fiction
+    {
+        "title": "Sapiens",
+        "author": "Yuval Noah Harari",
+        "genre": "Non-Fiction",
+        "rating": 4.4,
+        "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
+        "amazon_url": "https://amazon.com/dp/0062316095",
+        "bookshop_url": "https://bookshop.org/books/sapiens/9780062316097",
+        "reason": "A fascinating exploration of human history and development",
+        "source": "Goodreads"
+    },
+    {
+        "title": "Educated",
+        "author": "Tara Westover",
+        "genre": "Biography",
+        "rating": 4.5,
+        "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
+        "amazon_url": "https://amazon.com/dp/0399590501",
+        "bookshop_url": "https://bookshop.org/books/educated/9780399590504",
+        "reason": "A powerful memoir about education, family, and self-discovery",
+        "source": "Goodreads"
+    },
+    {
+        "title": "Thinking, Fast and Slow",
+        "author": "Daniel Kahneman",
+        "genre": "Business",
+        "rating": 4.2,
+        "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
+        "amazon_url": "https://amazon.com/dp/0374533555",
+        "bookshop_url": "https://bookshop.org/books/thinking-fast-and-slow/9780374533557",
+        "reason": "A fascinating exploration of how our minds make decisions",
+        "source": "Goodreads"
+    },
+    {
+        "title": "Atomic Habits",
+        "author": "James Clear",
+        "genre": "Self-Help",
+        "rating": 4.8,
+        "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
+        "amazon_url": "https://amazon.com/dp/0735211299",
+        "bookshop_url": "https://bookshop.org/books/atomic-habits/9780735211292",
+        "reason": "A practical guide to building good habits and breaking bad ones",
+        "source": "Goodreads"
+    },
+    {
+        "title": "The Power of Now",
+        "author": "Eckhart Tolle",
+        "genre": "Self-Help",
+        "rating": 4.2,
+        "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
+        "amazon_url": "https://amazon.com/dp/1577314808",
+        "bookshop_url": "https://bookshop.org/books/the-power-of-now/9781577314806",
+        "reason": "A transformative guide to spiritual enlightenment and mindfulness",
+        "source": "Goodreads"
+    },
+    {
+        "title": "Clean Code",
+        "author": "Robert C. Martin",
+        "genre": "Technology",
+        "rating": 4.4,
+        "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
+        "amazon_url": "https://amazon.com/dp/0132350882",
+        "bookshop_url": "https://bookshop.org/books/clean-code/9780132350884",
+        "reason": "Essential principles for writing maintainable software",
+        "source": "Goodreads"
+    },
+    {
+        "title": "The Pragmatic Programmer",
+        "author": "David Thomas",
+        "genre": "Technology",
+        "rating": 4.3,
+        "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
+        "amazon_url": "https://amazon.com/dp/020161622X",
+        "bookshop_url": "https://bookshop.org/books/the-pragmatic-programmer/9780201616224",
+        "reason": "Timeless advice for becoming a better programmer",
+        "source": "Goodreads"
+    }
+]
+
+# Extra titles only offered by get_book_recommendations
+_EXTRA_BOOK_DATA: List[Dict] = [
+    {
+        "title": "The Lean Startup",
+        "author": "Eric Ries",
+        "genre": "Business",
+        "rating": 4.1,
+        "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
+        "amazon_url": "https://amazon.com/dp/0307887898",
+        "bookshop_url": "https://bookshop.org/books/the-lean-startup/9780307887894",
+        "reason": "A revolutionary approach to building successful businesses",
+        "source": "Goodreads"
+    }
+]
+
+def _freeze_book(book: Dict) -> Mapping[str, Any]:
+    """Intern a book's repeated genre/author strings and make it read-only"""
+    return MappingProxyType({
+        **book,
+        'genre': sys.intern(book['genre']),
+        'author': sys.intern(book['author'])
+    })
+
+# The catalog is shared between requests, so its books are read-only and
+# callers copy a book before adding per-request fields to it
+_CURATED_BOOKS: Tuple[Mapping[str, Any], ...] = tuple(map(_freeze_book, _CURATED_BOOK_DATA))
+_EXTRA_BOOKS: Tuple[Mapping[str, Any], ...] = tuple(map(_freeze_book, _EXTRA_BOOK_DATA))
+del _CURATED_BOOK_DATA, _EXTRA_BOOK_DATA
+
+# Lowercase each title once, keeping the lowered titles out of the books
+# returned to clients
+_TITLE_LOWER: Dict[str, str] = {
+    book['title']: book['title'].lower() for book in chain(_CURATED_BOOKS, _EXTRA_BOOKS)
+}
+
+# Recommendation reasons only depend on the book, so each one is formatted
+# once per catalog entry instead of per request
+_REASON_TEMPLATES = {
+    'same_author': "Another {genre} book by {author}, similar to your collection",
+    'same_genre': "Similar {genre} book that matches your reading taste",
+    'related_genre': "Related {genre} book that complements your collection",
+    'top_rated': "Highly rated {genre} book in your preferred genres",
+    'popular': "Popular {genre} book that might interest you"
+}
+_REASONS: Dict[str, Dict[str, str]] = {
+    _book['title']: {
+        kind: template.format(genre=_book['genre'].lower(), author=_book['author'])
+        for kind, template in _REASON_TEMPLATES.items()
+    }
+    for _book in _CURATED_BOOKS
+}
+
+# Lowercased catalog titles, for intersecting with a user's detected titles
+_CATALOG_TITLES_LOWER = frozenset(_TITLE_LOWER.values())
+
+# Curated books grouped by genre, in catalog order and by rating
+_BOOKS_BY_GENRE: Dict[str, List[Mapping[str, Any]]] = {}
+for _book in _CURATED_BOOKS:
+    _BOOKS_BY_GENRE.setdefault(_book['genre'], []).append(_book)
+del _book
+
+_BOOKS_BY_GENRE_SORTED: Dict[str, List[Mapping[str, Any]]] = {
+    genre: sorted(books, key=itemgetter('rating'), reverse=True)
+    for genre, books in _BOOKS_BY_GENRE.items()
+}
+
+# Catalog plus extra titles, highest rated first; the sort is stable, so
+# equally rated books keep their catalog order
+_BOOKS_BY_RATING: List[Mapping[str, Any]] = sorted(
+    chain(_CURATED_BOOKS, _EXTRA_BOOKS), key=itemgetter('rating'), reverse=True
+)
+
+def _books_in_genres(genres: AbstractSet[str]) -> Iterator[Mapping[str, Any]]:
+    """
+    Iterate the curated books belonging to any of the given genres
+    
+    Books are yielded in catalog order, matching a full scan of the catalog.
+    """
+    return chain.from_iterable(
+        books for genre, books in _BOOKS_BY_GENRE.items() if genre in genres
+    )
+
+def get_curated_books() -> Tuple[Mapping[str, Any], ...]:
     """
     Get a curated list of high-quality books for recommendations
+    
+    The books are built once at import, read-only and shared between
+    requests; callers copy the ones they return.
     """
-    return [
-        # Fiction
-        {
-            "title": "The Seven Husbands of Evelyn Hugo",
-            "author": "Taylor Jenkins Reid",
-            "genre": "Fiction",
-            "rating": 4.5,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/1501139238",
-            "bookshop_url": "https://bookshop.org/books/the-seven-husbands-of-evelyn-hugo/9781501139239",
-            "reason": "A compelling character-driven story that matches your fiction preferences",
-            "source": "Goodreads"
-        },
-        {
-            "title": "The Midnight Library",
-            "author": "Matt Haig",
-            "genre": "Fiction",
-            "rating": 4.2,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/0525559477",
-            "bookshop_url": "https://bookshop.org/books/the-midnight-library/9780525559474",
-            "reason": "A thought-provoking novel about life choices and second chances",
-            "source": "Goodreads"
-        },
-        {
-            "title": "Where the Crawdads Sing",
-            "author": "Delia Owens",
-            "genre": "Fiction",
-            "rating": 4.6,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/0735219095",
-            "bookshop_url": "https://bookshop.org/books/where-the-crawdads-sing/9780735219090",
-            "reason": "A beautiful coming-of-age story with mystery elements",
-            "source": "Goodreads"
-        },
-        {
-            "title": "The Kite Runner",
-            "author": "Khaled Hosseini",
-            "genre": "Fiction",
-            "rating": 4.3,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/159463193X",
-            "bookshop_url": "https://bookshop.org/books/the-kite-runner/9781594631931",
-            "reason": "A powerful story of friendship and redemption",
-            "source": "Goodreads"
-        },
-        
-        # Science Fiction
-        {
-            "title": "Project Hail Mary",
-            "author": "Andy Weir",
-            "genre": "Science Fiction",
-            "rating": 4.7,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/0593135202",
-            "bookshop_url": "https://bookshop.org/books/project-hail-mary/9780593135204",
-            "reason": "A thrilling sci-fi adventure that matches your reading preferences",
-            "source": "Goodreads"
-        },
-        {
-            "title": "Dune",
-            "author": "Frank Herbert",
-            "genre": "Science Fiction",
-            "rating": 4.3,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/0441172717",
-            "bookshop_url": "https://bookshop.org/books/dune/9780441172719",
-            "reason": "A classic epic sci-fi masterpiece with complex world-building",
-            "source": "Goodreads"
-        },
-        {
-            "title": "The Martian",
-            "author": "Andy Weir",
-            "genre": "Science Fiction",
-            "rating": 4.4,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/0553418025",
-            "bookshop_url": "https://bookshop.org/books/the-martian/9780553418026",
-            "reason": "A gripping survival story set on Mars with scientific accuracy",
-            "source": "Goodreads"
-        },
-        {
-            "title": "Foundation",
-            "author": "Isaac Asimov",
-            "genre": "Science Fiction",
-            "rating": 4.2,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/0553293354",
-            "bookshop_url": "https://bookshop.org/books/foundation/9780553293357",
-            "reason": "A foundational work of science fiction with grand scope",
-            "source": "Goodreads"
-        },
-        
-        # Fantasy
-        {
-            "title": "The Name of the Wind",
-            "author": "Patrick Rothfuss",
-            "genre": "Fantasy",
-            "rating": 4.5,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/0756404746",
-            "bookshop_url": "https://bookshop.org/books/the-name-of-the-wind/9780756404741",
-            "reason": "An epic fantasy with beautiful prose and intricate magic system",
-            "source": "Goodreads"
-        },
-        {
-            "title": "Mistborn: The Final Empire",
-            "author": "Brandon Sanderson",
-            "genre": "Fantasy",
-            "rating": 4.4,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/076531178X",
-            "bookshop_url": "https://bookshop.org/books/mistborn-the-final-empire/9780765311788",
-            "reason": "A unique magic system and compelling heist story",
-            "source": "Goodreads"
-        },
-        {
-            "title": "The Hobbit",
-            "author": "J.R.R. Tolkien",
-            "genre": "Fantasy",
-            "rating": 4.3,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/054792822X",
-            "bookshop_url": "https://bookshop.org/books/the-hobbit/9780547928227",
-            "reason": "A timeless fantasy adventure that started it all",
-            "source": "Goodreads"
-        },
-        
-        # Mystery/Thriller
-        {
-            "title": "The Silent Patient",
-            "author": "Alex Michaelides",
-            "genre": "Thriller",
-            "rating": 4.3,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/1250301696",
-            "bookshop_url": "https://bookshop.org/books/the-silent-patient/9781250301697",
-            "reason": "A psychological thriller that will keep you guessing until the end",
-            "source": "Goodreads"
-        },
-        {
-            "title": "Gone Girl",
-            "author": "Gillian Flynn",
-            "genre": "Thriller",
-            "rating": 4.1,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/030758836X",
-            "bookshop_url": "https://bookshop.org/books/gone-girl/9780307588364",
-            "reason": "A twisted psychological thriller with unreliable narrators",
-            "source": "Goodreads"
-        },
-        {
-            "title": "The Girl with the Dragon Tattoo",
-            "author": "Stieg Larsson",
-            "genre": "Mystery",
-            "rating": 4.2,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/0307269752",
-            "bookshop_url": "https://bookshop.org/books/the-girl-with-the-dragon-tattoo/9780307269751",
-            "reason": "A complex mystery with strong characters and social commentary",
-            "source": "Goodreads"
-        },
-        {
-            "title": "The Da Vinci Code",
-            "author": "Dan Brown",
-            "genre": "Mystery",
-            "rating": 4.0,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/0307474275",
-            "bookshop_url": "https://bookshop.org/books/the-da-vinci-code/9780307474278",
-            "reason": "A fast-paced mystery thriller with historical elements",
-            "source": "Goodreads"
-        },
-        
-        # Romance
-        {
-            "title": "The Hating Game",
-            "author": "Sally Thorne",
-            "genre": "Romance",
-            "rating": 4.2,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/0062439598",
-            "bookshop_url": "https://bookshop.org/books/the-hating-game/9780062439598",
-            "reason": "A delightful enemies-to-lovers romance with great chemistry",
-            "source": "Goodreads"
-        },
-        {
-            "title": "Beach Read",
-            "author": "Emily Henry",
-            "genre": "Romance",
-            "rating": 4.1,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/1984806734",
-            "bookshop_url": "https://bookshop.org/books/beach-read/9781984806734",
-            "reason": "A charming romance with depth and humor",
-            "source": "Goodreads"
-        },
-        {
-            "title": "The Kiss Quotient",
-            "author": "Helen Hoang",
-            "genre": "Romance",
-            "rating": 4.0,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/0451490807",
-            "bookshop_url": "https://bookshop.org/books/the-kiss-quotient/9780451490803",
-            "reason": "A unique romance with neurodiverse representation",
-            "source": "Goodreads"
-        },
-        
-        # Non-Fiction
-        {
-            "title": "Sapiens",
-            "author": "Yuval Noah Harari",
-            "genre": "Non-Fiction",
-            "rating": 4.4,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/0062316095",
-            "bookshop_url": "https://bookshop.org/books/sapiens/9780062316097",
-            "reason": "A fascinating exploration of human history and development",
-            "source": "Goodreads"
-        },
-        {
-            "title": "Educated",
-            "author": "Tara Westover",
-            "genre": "Biography",
-            "rating": 4.5,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/0399590501",
-            "bookshop_url": "https://bookshop.org/books/educated/9780399590504",
-            "reason": "A powerful memoir about education, family, and self-discovery",
-            "source": "Goodreads"
-        },
-        {
-            "title": "Thinking, Fast and Slow",
-            "author": "Daniel Kahneman",
-            "genre": "Business",
-            "rating": 4.2,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/0374533555",
-            "bookshop_url": "https://bookshop.org/books/thinking-fast-and-slow/9780374533557",
-            "reason": "A fascinating exploration of how our minds make decisions",
-            "source": "Goodreads"
-        },
-        {
-            "title": "Atomic Habits",
-            "author": "James Clear",
-            "genre": "Self-Help",
-            "rating": 4.8,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/0735211299",
-            "bookshop_url": "https://bookshop.org/books/atomic-habits/9780735211292",
-            "reason": "A practical guide to building good habits and breaking bad ones",
-            "source": "Goodreads"
-        },
-        {
-            "title": "The Power of Now",
-            "author": "Eckhart Tolle",
-            "genre": "Self-Help",
-            "rating": 4.2,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/1577314808",
-            "bookshop_url": "https://bookshop.org/books/the-power-of-now/9781577314806",
-            "reason": "A transformative guide to spiritual enlightenment and mindfulness",
-            "source": "Goodreads"
-        },
-        {
-            "title": "Clean Code",
-            "author": "Robert C. Martin",
-            "genre": "Technology",
-            "rating": 4.4,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/0132350882",
-            "bookshop_url": "https://bookshop.org/books/clean-code/9780132350884",
-            "reason": "Essential principles for writing maintainable software",
-            "source": "Goodreads"
-        },
-        {
-            "title": "The Pragmatic Programmer",
-            "author": "David Thomas",
-            "genre": "Technology",
-            "rating": 4.3,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/020161622X",
-            "bookshop_url": "https://bookshop.org/books/the-pragmatic-programmer/9780201616224",
-            "reason": "Timeless advice for becoming a better programmer",
-            "source": "Goodreads"
-        }
-    ]
+    return _CURATED_BOOKS
 
 # Enhanced book recommendations based on detected books and user preferences
 def get_book_recommendations(detected_books: List[Dict], preferred_genres: List[str], max_recommendations: int = 20) -> List[Dict]:
     """
     Generate book recommendations based on detected books and preferred genres
     """
-    # Enhanced book database with more diverse recommendations
-    sample_books = [
-        # Fiction
-        {
-            "title": "The Seven Husbands of Evelyn Hugo",
-            "author": "Taylor Jenkins Reid",
-            "genre": "Fiction",
-            "rating": 4.5,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/1501139238",
-            "bookshop_url": "https://bookshop.org/books/the-seven-husbands-of-evelyn-hugo/9781501139239",
-            "reason": "A compelling character-driven story that matches your fiction preferences",
-            "source": "Goodreads"
-        },
-        {
-            "title": "The Midnight Library",
-            "author": "Matt Haig",
-            "genre": "Fiction",
-            "rating": 4.2,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/0525559477",
-            "bookshop_url": "https://bookshop.org/books/the-midnight-library/9780525559474",
-            "reason": "A thought-provoking novel about life choices and second chances",
-            "source": "Goodreads"
-        },
-        {
-            "title": "Where the Crawdads Sing",
-            "author": "Delia Owens",
-            "genre": "Fiction",
-            "rating": 4.6,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/0735219095",
-            "bookshop_url": "https://bookshop.org/books/where-the-crawdads-sing/9780735219090",
-            "reason": "A beautiful coming-of-age story with mystery elements",
-            "source": "Goodreads"
-        },
-        
-        # Science Fiction
-        {
-            "title": "Project Hail Mary",
-            "author": "Andy Weir",
-            "genre": "Science Fiction",
-            "rating": 4.7,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/0593135202",
-            "bookshop_url": "https://bookshop.org/books/project-hail-mary/9780593135204",
-            "reason": "A thrilling sci-fi adventure that matches your reading preferences",
-            "source": "Goodreads"
-        },
-        {
-            "title": "Dune",
-            "author": "Frank Herbert",
-            "genre": "Science Fiction",
-            "rating": 4.3,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/0441172717",
-            "bookshop_url": "https://bookshop.org/books/dune/9780441172719",
-            "reason": "A classic epic sci-fi masterpiece with complex world-building",
-            "source": "Goodreads"
-        },
-        {
-            "title": "The Martian",
-            "author": "Andy Weir",
-            "genre": "Science Fiction",
-            "rating": 4.4,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/0553418025",
-            "bookshop_url": "https://bookshop.org/books/the-martian/9780553418026",
-            "reason": "A gripping survival story set on Mars with scientific accuracy",
-            "source": "Goodreads"
-        },
-        
-        # Fantasy
-        {
-            "title": "The Name of the Wind",
-            "author": "Patrick Rothfuss",
-            "genre": "Fantasy",
-            "rating": 4.5,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/0756404746",
-            "bookshop_url": "https://bookshop.org/books/the-name-of-the-wind/9780756404741",
-            "reason": "An epic fantasy with beautiful prose and intricate magic system",
-            "source": "Goodreads"
-        },
-        {
-            "title": "Mistborn: The Final Empire",
-            "author": "Brandon Sanderson",
-            "genre": "Fantasy",
-            "rating": 4.4,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/076531178X",
-            "bookshop_url": "https://bookshop.org/books/mistborn-the-final-empire/9780765311788",
-            "reason": "A unique magic system and compelling heist story",
-            "source": "Goodreads"
-        },
-        
-        # Mystery/Thriller
-        {
-            "title": "The Silent Patient",
-            "author": "Alex Michaelides",
-            "genre": "Thriller",
-            "rating": 4.3,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/1250301696",
-            "bookshop_url": "https://bookshop.org/books/the-silent-patient/9781250301697",
-            "reason": "A psychological thriller that will keep you guessing until the end",
-            "source": "Goodreads"
-        },
-        {
-            "title": "Gone Girl",
-            "author": "Gillian Flynn",
-            "genre": "Thriller",
-            "rating": 4.1,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/030758836X",
-            "bookshop_url": "https://bookshop.org/books/gone-girl/9780307588364",
-            "reason": "A twisted psychological thriller with unreliable narrators",
-            "source": "Goodreads"
-        },
-        {
-            "title": "The Girl with the Dragon Tattoo",
-            "author": "Stieg Larsson",
-            "genre": "Mystery",
-            "rating": 4.2,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/0307269752",
-            "bookshop_url": "https://bookshop.org/books/the-girl-with-the-dragon-tattoo/9780307269751",
-            "reason": "A complex mystery with strong characters and social commentary",
-            "source": "Goodreads"
-        },
-        
-        # Romance
-        {
-            "title": "The Hating Game",
-            "author": "Sally Thorne",
-            "genre": "Romance",
-            "rating": 4.2,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/0062439598",
-            "bookshop_url": "https://bookshop.org/books/the-hating-game/9780062439598",
-            "reason": "A delightful enemies-to-lovers romance with great chemistry",
-            "source": "Goodreads"
-        },
-        {
-            "title": "Beach Read",
-            "author": "Emily Henry",
-            "genre": "Romance",
-            "rating": 4.1,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/1984806734",
-            "bookshop_url": "https://bookshop.org/books/beach-read/9781984806734",
-            "reason": "A charming romance with depth and humor",
-            "source": "Goodreads"
-        },
-        
-        # Non-Fiction
-        {
-            "title": "Sapiens",
-            "author": "Yuval Noah Harari",
-            "genre": "Non-Fiction",
-            "rating": 4.4,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/0062316095",
-            "bookshop_url": "https://bookshop.org/books/sapiens/9780062316097",
-            "reason": "A fascinating exploration of human history and development",
-            "source": "Goodreads"
-        },
-        {
-            "title": "Educated",
-            "author": "Tara Westover",
-            "genre": "Biography",
-            "rating": 4.5,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/0399590501",
-            "bookshop_url": "https://bookshop.org/books/educated/9780399590504",
-            "reason": "A powerful memoir about education, family, and self-discovery",
-            "source": "Goodreads"
-        },
-        
-        # Self-Help
-        {
-            "title": "Atomic Habits",
-            "author": "James Clear",
-            "genre": "Self-Help",
-            "rating": 4.8,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/0735211299",
-            "bookshop_url": "https://bookshop.org/books/atomic-habits/9780735211292",
-            "reason": "A practical guide to building good habits and breaking bad ones",
-            "source": "Goodreads"
-        },
-        {
-            "title": "The Power of Now",
-            "author": "Eckhart Tolle",
-            "genre": "Self-Help",
-            "rating": 4.2,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/1577314808",
-            "bookshop_url": "https://bookshop.org/books/the-power-of-now/9781577314806",
-            "reason": "A transformative guide to spiritual enlightenment and mindfulness",
-            "source": "Goodreads"
-        },
-        
-        # Business
-        {
-            "title": "Thinking, Fast and Slow",
-            "author": "Daniel Kahneman",
-            "genre": "Business",
-            "rating": 4.2,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/0374533555",
-            "bookshop_url": "https://bookshop.org/books/thinking-fast-and-slow/9780374533557",
-            "reason": "A fascinating exploration of how our minds make decisions",
-            "source": "Goodreads"
-        },
-        {
-            "title": "The Lean Startup",
-            "author": "Eric Ries",
-            "genre": "Business",
-            "rating": 4.1,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/0307887898",
-            "bookshop_url": "https://bookshop.org/books/the-lean-startup/9780307887894",
-            "reason": "A revolutionary approach to building successful businesses",
-            "source": "Goodreads"
-        },
-        
-        # Technology
-        {
-            "title": "Clean Code",
-            "author": "Robert C. Martin",
-            "genre": "Technology",
-            "rating": 4.4,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/0132350882",
-            "bookshop_url": "https://bookshop.org/books/clean-code/9780132350884",
-            "reason": "Essential principles for writing maintainable software",
-            "source": "Goodreads"
-        },
-        {
-            "title": "The Pragmatic Programmer",
-            "author": "David Thomas",
-            "genre": "Technology",
-            "rating": 4.3,
-            "cover_url": "https://images-na.ssl-images-amazon.com/images/I/81Z5Q6Q6Q6L.jpg",
-            "amazon_url": "https://amazon.com/dp/020161622X",
-            "bookshop_url": "https://bookshop.org/books/the-pragmatic-programmer/9780201616224",
-            "reason": "Timeless advice for becoming a better programmer",
-            "source": "Goodreads"
-        }
-    ]
-    
     # Get detected genres from the user's books
     detected_genres = set()
     for book in detected_books:
         genre = book.get('genre', '')
         if genre and genre != 'Unknown':
             detected_genres.add(genre)
+    preferred = set(preferred_genres)
     
-    # Prioritize recommendations based on detected genres and user preferences
+    # Walk the catalog (plus a few extra titles) in rating order and bucket
+    # each book by priority, so every group comes out already sorted
     priority_books = []
     secondary_books = []
+    detected_only_books = []
+    other_books = []
     
-    for book in sample_books:
+    for book in _BOOKS_BY_RATING:
         book_genre = book["genre"]
         
         # High priority: matches both detected genres AND user preferences
-        if book_genre in detected_genres and book_genre in preferred_genres:
+        if book_genre in preferred and book_genre in detected_genres:
             priority_books.append(book)
         # Medium priority: matches user preferences
-        elif book_genre in preferred_genres:
+        elif book_genre in preferred:
             secondary_books.append(book)
-    
-    # Sort by rating within each priority group
-    priority_books.sort(key=lambda x: x["rating"], reverse=True)
-    secondary_books.sort(key=lambda x: x["rating"], reverse=True)
+        elif book_genre in detected_genres:
+            detected_only_books.append(book)
+        else:
+            other_books.append(book)
     
     # Combine recommendations
     recommendations = priority_books + secondary_books
     
     # If we still need more books, add some from detected genres
     if len(recommendations) < max_recommendations:
-        remaining_books = [book for book in sample_books 
-                          if book not in recommendations and book["genre"] in detected_genres]
-        remaining_books.sort(key=lambda x: x["rating"], reverse=True)
-        recommendations.extend(remaining_books)
+        recommendations.extend(detected_only_books)
     
     # Final fallback: add any remaining books
     if len(recommendations) < max_recommendations:
-        final_books = [book for book in sample_books if book not in recommendations]
-        final_books.sort(key=lambda x: x["rating"], reverse=True)
-        recommendations.extend(final_books)
+        recommendations.extend(other_books)
     
-    return recommendations[:max_recommendations]
+    return [dict(book) for book in recommendations[:max_recommendations]]
+
+# JSON schema of one recommendation; the genre is narrowed per request
+_RECOMMENDED_BOOK_SCHEMA = RecommendedBook.model_json_schema()
+
+def _recommendation_list_schema(selected_genres: List[str]) -> Dict[str, Any]:
+    """Schema of a recommendation array whose genres are the user's preferred ones"""
+    item_schema = dict(_RECOMMENDED_BOOK_SCHEMA)
+    if selected_genres:
+        item_schema["properties"] = {
+            **item_schema["properties"],
+            "genre": {"type": "string", "enum": list(dict.fromkeys(selected_genres))}
+        }
+    return {"type": "array", "items": item_schema}
+
+def _structured_response_format(name: str, properties: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build a strict json_schema response format for an object of the given properties
+    
+    Strict structured outputs guarantee the reply parses and matches the
+    schema, so no markdown stripping or JSON repair is needed.
+    """
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": name,
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": properties,
+                "required": list(properties),
+                "additionalProperties": False
+            }
+        }
+    }
+
+# Instructions shared by every recommendation prompt. They are sent first as
+# the system message and never change, so OpenAI can cache the prefix; the
+# output format is enforced by the response schema instead of an example.
+_RECOMMENDATION_RULES = """Rules for each user:
+1. Recommend exactly n books, each in one of the user's preferred genres
+2. Never recommend a book already in their collection
+3. Consider books by authors similar to those they already have
+4. Include a mix of popular and lesser-known but excellent books, diverse within their preferred genres
+5. rating is on a 1-5 scale and reason briefly says why they would enjoy the book
+6. amazon_url uses https://amazon.com/dp/[ISBN] and bookshop_url uses https://bookshop.org/books/[title]/[ISBN]
+7. source is "OpenAI Recommendation\""""
+
+_RECOMMENDATION_SYSTEM_PROMPT = f"""You are an expert book recommendation system. The user message is JSON: "prefer" lists the user's preferred genres, "detected" the [title, author, genre] of books already in their collection, and "n" how many books to recommend.
+
+{_RECOMMENDATION_RULES}
+
+Return the books in the "recommendations" array."""
+
+_COALESCED_RECOMMENDATION_SYSTEM_PROMPT = f"""You are an expert book recommendation system. The user message is JSON mapping user keys to each user's request: "prefer" lists their preferred genres, "detected" the [title, author, genre] of books already in their collection, and "n" how many books to recommend.
+
+{_RECOMMENDATION_RULES}
+
+Return each user's books under their key."""
+
+# Low temperature keeps answers for the same request stable between calls
+RECOMMENDATION_TEMPERATURE = 0.2
+
+def _user_request_payload(detected_books: List[DetectedBook], selected_genres: List[str], max_recommendations: int) -> Dict[str, Any]:
+    """Compact JSON payload describing one user's request"""
+    return {
+        "prefer": selected_genres,
+        "detected": [[book.title, book.author, book.genre] for book in detected_books],
+        "n": max_recommendations
+    }
+
+def build_recommendation_request(detected_books: List[DetectedBook], selected_genres: List[str], max_recommendations: int = 5) -> Dict[str, Any]:
+    """
+    Build the chat completion parameters for a recommendation request
+    
+    Shared by the online endpoint and the batch job so both send the same prompt.
+    
+    Args:
+        detected_books: Books detected in the user's collection
+        selected_genres: User's preferred genres
+        max_recommendations: Number of books to ask for
+        
+    Returns:
+        Dict of keyword arguments for chat.completions.create
+    """
+    payload = _user_request_payload(detected_books, selected_genres, max_recommendations)
+    
+    return {
+        "model": "gpt-4o-mini",
+        "messages": [
+            {
+                "role": "system",
+                "content": _RECOMMENDATION_SYSTEM_PROMPT
+            },
+            {
+                "role": "user",
+                "content": orjson.dumps(payload).decode()
+            }
+        ],
+        "response_format": _structured_response_format(
+            "book_recommendations",
+            {"recommendations": _recommendation_list_schema(selected_genres)}
+        ),
+        "max_tokens": 2000,
+        "temperature": RECOMMENDATION_TEMPERATURE
+    }
+
+def build_coalesced_recommendation_request(user_requests: List[Tuple[List[DetectedBook], List[str], int]]) -> Dict[str, Any]:
+    """
+    Build one chat completion request covering several users at once
+    
+    The instructions are sent once for the whole group instead of once per
+    user, and the model answers with a JSON object holding each user's
+    recommendations under "user_1", "user_2", and so on.
+    
+    Args:
+        user_requests: (detected_books, selected_genres, max_recommendations)
+            for each user, in the order their results are keyed
+        
+    Returns:
+        Dict of keyword arguments for chat.completions.create
+    """
+    payload = {
+        f"user_{index}": _user_request_payload(*user_request)
+        for index, user_request in enumerate(user_requests, 1)
+    }
+    
+    return {
+        "model": "gpt-4o-mini",
+        "messages": [
+            {
+                "role": "system",
+                "content": _COALESCED_RECOMMENDATION_SYSTEM_PROMPT
+            },
+            {
+                "role": "user",
+                "content": orjson.dumps(payload).decode()
+            }
+        ],
+        "response_format": _structured_response_format(
+            "coalesced_book_recommendations",
+            {
+                f"user_{index}": _recommendation_list_schema(selected_genres)
+                for index, (_, selected_genres, _) in enumerate(user_requests, 1)
+            }
+        ),
+        "max_tokens": min(2000 * len(user_requests), 16000),
+        "temperature": RECOMMENDATION_TEMPERATURE
+    }
+
+def parse_recommendations(response_text: str, selected_genres: AbstractSet[str], max_recommendations: int = 5) -> List[Dict]:
+    """
+    Parse and validate the recommendations returned by the model
+    
+    Responses follow the structured output schema, an object holding the
+    "recommendations" array; bare arrays from batch jobs submitted before the
+    schema was added are accepted too.
+    
+    Args:
+        response_text: Raw message content from the model
+        selected_genres: User's preferred genres; other genres are dropped
+        max_recommendations: Maximum number of recommendations to keep
+        
+    Returns:
+        List of validated recommendations
+        
+    Raises:
+        orjson.JSONDecodeError: If the response is not valid JSON
+    """
+    # Parse JSON
+    recommendations = orjson.loads(response_text)
+    if isinstance(recommendations, dict):
+        recommendations = recommendations.get("recommendations", [])
+    
+    # Validate and clean the recommendations
+    validated_recommendations = [rec for rec in recommendations if is_valid_recommendation(rec, selected_genres)]
+    
+    return validated_recommendations[:max_recommendations]
+
+# Fields every model recommendation must have
+_REQUIRED_RECOMMENDATION_FIELDS = frozenset({'title', 'author', 'genre'})
+
+def is_valid_recommendation(rec: Any, selected_genres: AbstractSet[str]) -> bool:
+    """Check a model recommendation has the required fields and a preferred genre"""
+    return (
+        isinstance(rec, dict) and
+        rec.keys() >= _REQUIRED_RECOMMENDATION_FIELDS and
+        rec['genre'] in selected_genres
+    )
+
+class RecommendationStreamParser:
+    """
+    Incrementally extract the objects of a JSON array streamed in chunks
+    
+    Each object at the array's nesting level is parsed as soon as its closing
+    brace arrives, so recommendations can be forwarded before the model
+    finishes the array.
+    """
+    
+    def __init__(self, object_depth: int = 0):
+        """
+        Args:
+            object_depth: Number of objects enclosing the array, e.g. 1 for
+                the structured output's {"recommendations": [...]} wrapper
+        """
+        self._object_depth = object_depth
+        self._buffer = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+    
+    def feed(self, text: str) -> List[Any]:
+        """
+        Consume the next chunk of model output
+        
+        Args:
+            text: Next piece of streamed content
+            
+        Returns:
+            Objects completed by this chunk, in order
+        """
+        objects = []
+        for char in text:
+            capturing = self._depth > self._object_depth
+            if self._in_string:
+                if capturing:
+                    self._buffer.append(char)
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+            
+            if char == '{':
+                self._depth += 1
+                capturing = self._depth > self._object_depth
+            if not self._depth:
+                continue
+            
+            if capturing:
+                self._buffer.append(char)
+            if char == '"':
+                self._in_string = True
+            elif char == '}':
+                self._depth -= 1
+                if capturing and self._depth == self._object_depth:
+                    try:
+                        objects.append(orjson.loads(''.join(self._buffer)))
+                    except orjson.JSONDecodeError:
+                        pass
+                    self._buffer = []
+        
+        return objects
+
+# Limits on OpenAI recommendation calls shared by all concurrent users
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "10"))
+OPENAI_REQUESTS_PER_MINUTE = int(os.getenv("OPENAI_REQUESTS_PER_MINUTE", "500"))
+
+_openai_semaphore = asyncio.Semaphore(OPENAI_MAX_CONCURRENCY)
+_openai_rate_limiter = AsyncRateLimiter(OPENAI_REQUESTS_PER_MINUTE)
+
+@asynccontextmanager
+async def openai_request_slot():
+    """Hold one of the concurrent OpenAI slots, waiting for the rate limit first"""
+    async with _openai_semaphore:
+        await _openai_rate_limiter.acquire()
+        yield
+
+# OpenAI recommendations keyed by a hash of the normalized request inputs and
+# kept for a day, in memory and on disk so they survive restarts; repeat
+# uploads of the same shelf with the same genres skip the API call
+RECOMMENDATION_CACHE_SIZE = 1024
+RECOMMENDATION_CACHE_TTL = 24 * 60 * 60
+_recommendation_cache = DiskCache("recommendations", ttl=RECOMMENDATION_CACHE_TTL,
+                                  memory_size=RECOMMENDATION_CACHE_SIZE)
+
+def _recommendation_cache_key(detected_books: List[DetectedBook], selected_genres: Collection[str], max_recommendations: int) -> str:
+    """
+    Key a recommendation request by a BLAKE2b hash of its normalized inputs
+    
+    Books and genres are sorted, so the same shelf detected in a different
+    order or with the genres picked in a different order shares an entry.
+    """
+    normalized = {
+        "b": sorted((book.title, book.author, book.genre) for book in detected_books),
+        "g": sorted(selected_genres),
+        "n": max_recommendations
+    }
+    return hashlib.blake2b(orjson.dumps(normalized), digest_size=16).hexdigest()
+
+def _get_cached_recommendations(key: str) -> Optional[List[Dict]]:
+    """Get unexpired cached recommendations for a request key"""
+    recommendations = _recommendation_cache.get(key)
+    return list(recommendations) if recommendations is not None else None
+
+def _cache_recommendations(key: str, recommendations: List[Dict]) -> None:
+    """Cache validated OpenAI recommendations in memory and on disk"""
+    if recommendations:
+        _recommendation_cache.set(key, list(recommendations))
+
+# Concurrent /books requests arriving within the wait window share one prompt
+COALESCE_MAX_USERS = 8
+COALESCE_MAX_WAIT_MS = 50
+
+class RecommendationCoalescer(MicroBatcher):
+    """
+    Coalesce concurrent recommendation requests into shared OpenAI calls
+    
+    Requests are queued and a background worker sends up to ``max_users`` of
+    them in one prompt, waiting at most ``max_wait_ms`` for the group to fill.
+    A request that arrives alone is sent with the regular single-user prompt.
+    """
+    
+    def __init__(self, max_users: int = COALESCE_MAX_USERS, max_wait_ms: float = COALESCE_MAX_WAIT_MS):
+        """
+        Args:
+            max_users: Maximum number of users per OpenAI call
+            max_wait_ms: Maximum time to wait for a group to fill
+        """
+        super().__init__(max_users, max_wait_ms)
+    
+    async def submit(self, detected_books: List[DetectedBook], selected_genres: List[str], max_recommendations: int) -> List[Dict]:
+        """
+        Queue a recommendation request and wait for its validated results
+        
+        Args:
+            detected_books: Books detected in the user's collection
+            selected_genres: User's preferred genres
+            max_recommendations: Number of books to ask for
+            
+        Returns:
+            List of validated recommendations
+            
+        Raises:
+            orjson.JSONDecodeError: If the model's response is not valid JSON
+        """
+        return await self._enqueue((detected_books, selected_genres, max_recommendations))
+    
+    async def _run_batch(self, group: List[Tuple[Tuple[List[DetectedBook], List[str], int], asyncio.Future]]):
+        """Send a group of requests as one call"""
+        # Calls take seconds, so keep collecting the next group meanwhile
+        self._spawn(self._send(group))
+    
+    async def _send(self, group: List[Tuple[Tuple[List[DetectedBook], List[str], int], asyncio.Future]]):
+        """Send one group to OpenAI and resolve each caller's future"""
+        user_requests = [user_request for user_request, _ in group]
+        try:
+            if len(group) == 1:
+                results = [await self._recommend_one(*user_requests[0])]
+            else:
+                results = await self._recommend_many(user_requests)
+        except Exception as e:
+            self._fail(group, e)
+            return
+        
+        for (_, future), recommendations in zip(group, results):
+            if not future.done():
+                future.set_result(recommendations)
+    
+    async def _recommend_one(self, detected_books: List[DetectedBook], selected_genres: List[str], max_recommendations: int) -> List[Dict]:
+        """Get recommendations for a single user with the regular prompt"""
+        request_params = build_recommendation_request(detected_books, selected_genres, max_recommendations)
+        async with openai_request_slot():
+            response = await get_openai_client().chat.completions.create(**request_params)
+        
+        return parse_recommendations(response.choices[0].message.content, frozenset(selected_genres), max_recommendations)
+    
+    async def _recommend_many(self, user_requests: List[Tuple[List[DetectedBook], List[str], int]]) -> List[List[Dict]]:
+        """Get recommendations for several users from one coalesced prompt"""
+        request_params = build_coalesced_recommendation_request(user_requests)
+        async with openai_request_slot():
+            response = await get_openai_client().chat.completions.create(**request_params)
+        
+        recommendations_by_user = orjson.loads(response.choices[0].message.content)
+        logger.debug("✅ OpenAI answered %d coalesced recommendation requests in one call", len(user_requests))
+        
+        results = []
+        for index, (_, selected_genres, max_recommendations) in enumerate(user_requests, 1):
+            preferred_genres = frozenset(selected_genres)
+            recommendations = recommendations_by_user.get(f"user_{index}")
+            if not isinstance(recommendations, list):
+                recommendations = []
+            results.append([rec for rec in recommendations if is_valid_recommendation(rec, preferred_genres)][:max_recommendations])
+        return results
+
+_recommendation_coalescer = RecommendationCoalescer()
+
+def _cold_start_collection(detected_books: List[DetectedBook]) -> List[DetectedBook]:
+    """
+    Drop a collection none of whose titles could be read
+    
+    Such a collection adds nothing useful to the prompt, so these cold-start
+    requests share one cache entry per genre selection.
+    """
+    if all(book.title == 'Unknown' for book in detected_books):
+        return []
+    return detected_books
+
+# Genre selections whose cold-start recommendations are fetched at startup,
+# e.g. "Fiction;Mystery,Thriller" for Fiction alone and Mystery with Thriller
+RECOMMENDATION_PREWARM_GENRES = [
+    [genre.strip() for genre in selection.split(",") if genre.strip()]
+    for selection in os.getenv("RECOMMENDATION_PREWARM_GENRES", "").split(";")
+    if selection.strip()
+]
+
+async def prewarm_cold_start_recommendations(max_recommendations: int = 5) -> None:
+    """
+    Fill the cache with recommendations for users without any detected books
+    
+    Args:
+        max_recommendations: Number of books cached per genre selection
+    """
+    if not RECOMMENDATION_PREWARM_GENRES or not get_openai_client():
+        return
+    
+    logger.info("🔥 Prewarming recommendations for %d genre selections", len(RECOMMENDATION_PREWARM_GENRES))
+    await asyncio.gather(*(
+        get_openai_recommendations([], genres, max_recommendations)
+        for genres in RECOMMENDATION_PREWARM_GENRES
+    ))
 
 # OpenAI-powered book recommendations
-def get_openai_recommendations(detected_books: List[Dict], selected_genres: List[str], max_recommendations: int = 5) -> List[Dict]:
+async def get_openai_recommendations(detected_books: List[DetectedBook], selected_genres: List[str], max_recommendations: int = 5) -> List[Dict]:
     """
     Generate book recommendations using OpenAI API based on user preferences and detected books
     """
+    # The prompt keeps the user's genre order; filtering only needs a set
+    preferred_genres = frozenset(selected_genres)
+    
+    openai_client = get_openai_client()
     if not openai_client:
-        print("⚠️ OpenAI client not available, using fallback recommendations")
-        return get_fallback_recommendations(detected_books, selected_genres, max_recommendations)
+        logger.debug("⚠️ OpenAI client not available, using fallback recommendations")
+        return get_fallback_recommendations(detected_books, preferred_genres, max_recommendations)
+    
+    detected_books = _cold_start_collection(detected_books)
+    cache_key = _recommendation_cache_key(detected_books, preferred_genres, max_recommendations)
+    cached_recommendations = _get_cached_recommendations(cache_key)
+    if cached_recommendations is not None:
+        logger.debug("✅ Using %d cached OpenAI recommendations", len(cached_recommendations))
+        return cached_recommendations
     
     try:
-        # Prepare the prompt for OpenAI
-        detected_titles = [book.get('title', 'Unknown') for book in detected_books if book.get('title')]
-        detected_authors = [book.get('author', 'Unknown') for book in detected_books if book.get('author')]
-        detected_genres = [book.get('genre', 'Unknown') for book in detected_books if book.get('genre')]
+        # Call OpenAI API, sharing the call with other users waiting right now
+        validated_recommendations = await _recommendation_coalescer.submit(detected_books, selected_genres, max_recommendations)
+        _cache_recommendations(cache_key, validated_recommendations)
         
-        # Create comprehensive prompt
-        prompt = f"""
-You are an expert book recommendation system. Based on the user's preferences and their current book collection, recommend new books they would enjoy.
-
-USER'S PREFERRED GENRES: {', '.join(selected_genres)}
-
-BOOKS ALREADY IN THEIR COLLECTION:
-{chr(10).join([f"- {book.get('title', 'Unknown')} by {book.get('author', 'Unknown')} ({book.get('genre', 'Unknown')})" for book in detected_books])}
-
-DETECTED GENRES IN COLLECTION: {', '.join(set(detected_genres))}
-DETECTED AUTHORS IN COLLECTION: {', '.join(set(detected_authors))}
-
-REQUIREMENTS:
-1. Recommend EXACTLY {max_recommendations} books (no more, no less) that match the user's preferred genres
-2. DO NOT recommend any books already in their collection (listed above)
-3. Focus on books that align with their genre preferences: {', '.join(selected_genres)}
-4. Consider books by authors similar to those they already have
-5. Include a mix of popular and lesser-known but excellent books
-6. Provide diverse recommendations within their preferred genres
-7. IMPORTANT: Return exactly {max_recommendations} books in the JSON array
-
-For each recommendation, provide:
-- Title
-- Author
-- Genre (must be one of their preferred genres: {', '.join(selected_genres)})
-- Rating (1-5 scale)
-- Brief reason why they would enjoy it
-- Amazon URL (use format: https://amazon.com/dp/[ISBN])
-- Bookshop URL (use format: https://bookshop.org/books/[title]/[ISBN])
-
-Format your response as a JSON array with EXACTLY {max_recommendations} books using this structure:
-[
-  {{
-    "title": "Book Title 1",
-    "author": "Author Name 1",
-    "genre": "Genre",
-    "rating": 4.5,
-    "reason": "Why they would enjoy this book",
-    "amazon_url": "https://amazon.com/dp/1234567890",
-    "bookshop_url": "https://bookshop.org/books/book-title/1234567890",
-    "source": "OpenAI Recommendation"
-  }},
-  {{
-    "title": "Book Title 2",
-    "author": "Author Name 2",
-    "genre": "Genre",
-    "rating": 4.2,
-    "reason": "Why they would enjoy this book",
-    "amazon_url": "https://amazon.com/dp/0987654321",
-    "bookshop_url": "https://bookshop.org/books/book-title-2/0987654321",
-    "source": "OpenAI Recommendation"
-  }}
-  // ... continue for all {max_recommendations} books
-]
+        logger.debug("✅ OpenAI generated %d recommendations", len(validated_recommendations))
+        return validated_recommendations
+        
+    except orjson.JSONDecodeError as e:
+        logger.error("❌ Failed to parse OpenAI response as JSON: %s", e)
+        return get_fallback_recommendations(detected_books, preferred_genres, max_recommendations)
+    except Exception as e:
+        logger.exception("❌ OpenAI recommendation error: %s", e)
+        return get_fallback_recommendations(detected_books, preferred_genres, max_recommendations)
 
-Return ONLY the JSON array with exactly {max_recommendations} books, no additional text.
-"""
-
-        # Call OpenAI API
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert book recommendation system. Always respond with valid JSON arrays containing book recommendations."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            max_tokens=2000,
-            temperature=0.7
-        )
+# Batch recommendation jobs are tracked here, relative to the working directory
+BATCH_RESULTS_DIR = Path("static/results")
+BATCH_POLL_INTERVAL = 60
+BATCH_FINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+def _batch_job_path(batch_id: str) -> Path:
+    """Path of the file tracking a batch job's requests and results"""
+    return BATCH_RESULTS_DIR / f"{batch_id}_batch.json"
+
+async def submit_batch_recommendations(requests: List[RecommendationRequest]) -> str:
+    """
+    Submit recommendation requests as a single OpenAI Batch API job
+    
+    Batch jobs complete within 24 hours at half the cost of online calls and
+    don't count against the per-minute rate limits, which suits precomputing
+    recommendations for many images at once.
+    
+    Args:
+        requests: Recommendation requests, each sent with the online prompt
+        
+    Returns:
+        The OpenAI batch id
+        
+    Raises:
+        RuntimeError: If the OpenAI client is not available
+    """
+    openai_client = get_openai_client()
+    if not openai_client:
+        raise RuntimeError("OpenAI client not available")
+    
+    jobs = {}
+    lines = []
+    for index, request in enumerate(requests):
+        custom_id = f"request-{index}"
+        # Prompt and key the collection exactly like the online path, so the
+        # results are found by its cache lookups
+        detected_books = _cold_start_collection(request.detected_books)
+        jobs[custom_id] = {
+            "selected_genres": request.selected_genres,
+            "max_recommendations": request.max_recommendations,
+            "cache_key": _recommendation_cache_key(
+                detected_books,
+                frozenset(request.selected_genres),
+                request.max_recommendations
+            )
+        }
+        lines.append(orjson.dumps({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": build_recommendation_request(
+                detected_books,
+                request.selected_genres,
+                request.max_recommendations
+            )
+        }))
+    
+    batch_file = await openai_client.files.create(
+        file=("recommendations.jsonl", b"\n".join(lines)),
+        purpose="batch"
+    )
+    batch = await openai_client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+    
+    # Remember each request's genres and cache key so results can be
+    # validated and cached later
+    async with aiofiles.open(_batch_job_path(batch.id), 'wb') as f:
+        await f.write(orjson.dumps({"requests": jobs}))
+    
+    logger.info("✅ Submitted batch %s with %d recommendation requests", batch.id, len(lines))
+    return batch.id
+
+async def get_batch_recommendations(batch_id: str) -> Dict[str, Any]:
+    """
+    Get the status of a batch job, with its recommendations once it completes
+    
+    Completed results are parsed once and stored next to the job's requests,
+    so later polls don't download the output file again.
+    
+    Args:
+        batch_id: OpenAI batch id returned by submit_batch_recommendations
         
-        # Parse the response
-        response_text = response.choices[0].message.content.strip()
+    Returns:
+        Dict containing the batch status and, when completed, recommendations
+        keyed by request custom_id
         
-        # Clean up the response (remove any markdown formatting)
-        if response_text.startswith('```json'):
-            response_text = response_text[7:]
-        if response_text.endswith('```'):
-            response_text = response_text[:-3]
+    Raises:
+        FileNotFoundError: If the batch was not submitted by this server
+        RuntimeError: If the OpenAI client is not available
+    """
+    job_path = _batch_job_path(batch_id)
+    async with aiofiles.open(job_path, 'rb') as f:
+        job = orjson.loads(await f.read())
+    
+    if "results" in job:
+        return {"batch_id": batch_id, "status": "completed", "results": job["results"]}
+    
+    openai_client = get_openai_client()
+    if not openai_client:
+        raise RuntimeError("OpenAI client not available")
+    
+    batch = await openai_client.batches.retrieve(batch_id)
+    if batch.status != "completed" or not batch.output_file_id:
+        return {
+            "batch_id": batch_id,
+            "status": batch.status,
+            "request_counts": batch.request_counts.model_dump() if batch.request_counts else None
+        }
+    
+    output = await openai_client.files.content(batch.output_file_id)
+    results = {}
+    for line in output.text.splitlines():
+        if not line.strip():
+            continue
         
-        # Parse JSON
-        recommendations = json.loads(response_text)
+        item = orjson.loads(line)
+        custom_id = item["custom_id"]
+        response = item.get("response") or {}
+        if response.get("status_code") != 200:
+            results[custom_id] = {"error": item.get("error") or response.get("body")}
+            continue
         
-        # Validate and clean the recommendations
-        validated_recommendations = []
-        for rec in recommendations:
-            if isinstance(rec, dict) and all(key in rec for key in ['title', 'author', 'genre']):
-                # Ensure genre is in user's preferred genres
-                if rec['genre'] in selected_genres:
-                    validated_recommendations.append(rec)
+        request = job["requests"].get(custom_id, {})
+        try:
+            recommendations = parse_recommendations(
+                response["body"]["choices"][0]["message"]["content"],
+                frozenset(request.get("selected_genres", [])),
+                request.get("max_recommendations", 5)
+            )
+        except (orjson.JSONDecodeError, KeyError, IndexError) as e:
+            results[custom_id] = {"error": f"Invalid response: {e}"}
+            continue
         
-        print(f"✅ OpenAI generated {len(validated_recommendations)} recommendations")
-        return validated_recommendations[:max_recommendations]
+        results[custom_id] = {"recommendations": recommendations}
+        # Later online requests for the same shelf are served from the batch
+        if "cache_key" in request:
+            _cache_recommendations(request["cache_key"], recommendations)
+    
+    job["results"] = results
+    async with aiofiles.open(job_path, 'wb') as f:
+        await f.write(orjson.dumps(job))
+    
+    return {"batch_id": batch_id, "status": "completed", "results": results}
+
+async def poll_batch_recommendations(batch_id: str) -> None:
+    """
+    Poll a batch job until it finishes so its results reach the cache
+    
+    Args:
+        batch_id: OpenAI batch id returned by submit_batch_recommendations
+    """
+    while True:
+        try:
+            batch = await get_batch_recommendations(batch_id)
+        except Exception as e:
+            logger.exception("❌ Failed to poll batch %s: %s", batch_id, e)
+            return
         
-    except json.JSONDecodeError as e:
-        print(f"❌ Failed to parse OpenAI response as JSON: {e}")
-        print(f"Response: {response_text}")
-        return get_fallback_recommendations(detected_books, selected_genres, max_recommendations)
-    except Exception as e:
-        print(f"❌ OpenAI recommendation error: {e}")
-        return get_fallback_recommendations(detected_books, selected_genres, max_recommendations)
+        if batch["status"] in BATCH_FINAL_STATUSES:
+            logger.info("✅ Batch %s finished with status %s", batch_id, batch["status"])
+            return
+        
+        await asyncio.sleep(BATCH_POLL_INTERVAL)
 
-def get_fallback_recommendations(detected_books: List[Dict], selected_genres: List[str], max_recommendations: int = 5) -> List[Dict]:
+def get_fallback_recommendations(detected_books: List[DetectedBook], selected_genres: AbstractSet[str], max_recommendations: int = 5, detected_titles: Optional[AbstractSet[str]] = None) -> List[Dict]:
     """
     Fallback recommendation system when OpenAI is not available
+    
+    Args:
+        detected_books: Books detected in the user's collection
+        selected_genres: User's preferred genres
+        max_recommendations: Maximum number of recommendations
+        detected_titles: Lowercased detected titles, if the caller already has them
+        
+    Returns:
+        List of curated recommendations
     """
     # Get detected titles to exclude
-    detected_titles = {book.get('title', '').lower() for book in detected_books if book.get('title')}
+    if detected_titles is None:
+        detected_titles = {book.title.lower() for book in detected_books if book.title != 'Unknown'}
+    detected_titles = detected_titles & _CATALOG_TITLES_LOWER
     
-    # Filter curated books by user preferences and exclude detected books
-    curated_books = get_curated_books()
+    # Only the user's preferred genres are scanned, via the genre index, and
+    # only books that pass the title check are copied
     recommendations = []
     
-    for book in curated_books:
-        if (book['genre'] in selected_genres and 
-            book['title'].lower() not in detected_titles and
-            len(recommendations) < max_recommendations):
-            book['source'] = 'Fallback Recommendation'
-            recommendations.append(book)
+    for book in _books_in_genres(selected_genres):
+        if len(recommendations) >= max_recommendations:
+            break
+        if not detected_titles or _TITLE_LOWER[book['title']] not in detected_titles:
+            recommendations.append({**book, 'source': 'Fallback Recommendation'})
     
     return recommendations
 
-@router.post("/genres")
-async def recommend_genres(request: Dict[str, Any]) -> Dict[str, Any]:
+@router.post("/genres", response_class=ORJSONResponse, response_model=None)
+async def recommend_genres(request: Dict[str, Any]) -> ORJSONResponse:
     """
     Get genre suggestions based on detected books
     
@@ -963,32 +1394,42 @@ async def recommend_genres(request: Dict[str, Any]) -> Dict[str, Any]:
         detected_books = request.get("detected_books", [])
         suggested_genres = get_genre_suggestions(detected_books)
         
-        return {
+        return ORJSONResponse({
             "suggested_genres": suggested_genres,
             "total_detected": len(detected_books),
             "message": "Genre suggestions generated successfully"
-        }
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate genre suggestions: {str(e)}")
 
-@router.post("/books")
-async def recommend_books(request: RecommendationRequest) -> Dict[str, Any]:
+@router.post("/books", response_class=ORJSONResponse, response_model=None)
+async def recommend_books(request: RecommendationRequest, include_fallback: bool = False) -> ORJSONResponse:
     """
     Get book recommendations based on detected books and preferred genres using OpenAI API
     
     Args:
         request: RecommendationRequest containing detected_books, selected_genres, and max_recommendations
+        include_fallback: Also compute the curated fallback recommendations for comparison
         
     Returns:
         Dict containing OpenAI-powered recommendations
     """
     try:
-        print(f"🔍 Generating recommendations for {len(request.detected_books)} detected books")
-        print(f"📚 User preferred genres: {request.selected_genres}")
+        logger.debug("🔍 Generating recommendations for %d detected books", len(request.detected_books))
+        logger.debug("📚 User preferred genres: %s", request.selected_genres)
+        
+        # Summarize the collection once for the response and the fallback
+        detected_titles = []
+        detected_genres = set()
+        for book in request.detected_books:
+            if book.title != 'Unknown':
+                detected_titles.append(book.title)
+            if book.genre != 'Unknown':
+                detected_genres.add(book.genre)
         
         # Get OpenAI-powered recommendations
-        recommendations = get_openai_recommendations(
+        recommendations = await get_openai_recommendations(
             request.detected_books, 
             request.selected_genres, 
             request.max_recommendations
@@ -998,7 +1439,7 @@ async def recommend_books(request: RecommendationRequest) -> Dict[str, Any]:
         enhanced_recommendations = []
         if recommendations:
             try:
-                print("📚 Fetching metadata for recommended books...")
+                logger.debug("📚 Fetching metadata for recommended books...")
                 from ..services.book_metadata import metadata_service
                 
                 # Prepare books for metadata fetching
@@ -1010,44 +1451,43 @@ async def recommend_books(request: RecommendationRequest) -> Dict[str, Any]:
                     })
                 
                 # Fetch metadata
-                enhanced_recommendations = metadata_service.get_multiple_books_metadata(books_for_metadata)
-                print(f"✅ Enhanced {len(enhanced_recommendations)} recommendations with metadata")
+                enhanced_recommendations = await metadata_service.aget_multiple_books_metadata(books_for_metadata)
+                logger.debug("✅ Enhanced %d recommendations with metadata", len(enhanced_recommendations))
                 
             except Exception as e:
-                print(f"⚠️ Failed to fetch metadata for recommendations: {e}")
+                logger.warning("⚠️ Failed to fetch metadata for recommendations: %s", e)
                 enhanced_recommendations = recommendations  # Fallback to original data
         else:
             enhanced_recommendations = recommendations
         
-        # Get fallback recommendations for comparison
-        fallback_recommendations = get_fallback_recommendations(
-            request.detected_books, 
-            request.selected_genres, 
-            request.max_recommendations
-        )
-        
-        # Calculate statistics
-        detected_titles = [book.get('title', '') for book in request.detected_books if book.get('title')]
-        detected_genres = [book.get('genre', '') for book in request.detected_books if book.get('genre')]
+        # Get fallback recommendations for comparison, only when asked for
+        fallback_recommendations = None
+        if include_fallback:
+            fallback_recommendations = get_fallback_recommendations(
+                request.detected_books, 
+                frozenset(request.selected_genres), 
+                request.max_recommendations,
+                detected_titles={title.lower() for title in detected_titles}
+            )
         
-        return {
+        return ORJSONResponse({
             "recommendations": enhanced_recommendations,  # Return enhanced recommendations with metadata
             "fallback_recommendations": fallback_recommendations,
             "total_recommendations": len(enhanced_recommendations),
             "detected_books_count": len(request.detected_books),
             "detected_titles": detected_titles,
-            "detected_genres": list(set(detected_genres)),
+            "detected_genres": list(detected_genres),
             "selected_genres": request.selected_genres,
-            "recommendation_source": "OpenAI API" if openai_client else "Fallback System",
+            "recommendation_source": "OpenAI API" if get_openai_client() else "Fallback System",
             "message": f"Generated {len(enhanced_recommendations)} personalized recommendations based on your preferences and collection"
-        }
+        })
         
     except Exception as e:
-        print(f"❌ Recommendation error: {e}")
+        logger.exception("❌ Recommendation error: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to generate recommendations: {str(e)}")
 
-@router.post("/books/legacy")
-async def recommend_books_legacy(request: Dict[str, Any]) -> Dict[str, Any]:
+@router.post("/books/legacy", response_class=ORJSONResponse, response_model=None)
+async def recommend_books_legacy(request: Dict[str, Any]) -> ORJSONResponse:
     """
     Legacy recommendation endpoint for backward compatibility
     
@@ -1066,7 +1506,7 @@ async def recommend_books_legacy(request: Dict[str, Any]) -> Dict[str, Any]:
         image_based_recommendations = get_image_based_recommendations(detected_books, preferred_genres, max_recommendations // 2)
         genre_based_recommendations = get_genre_based_recommendations(preferred_genres, max_recommendations // 2)
         
-        return {
+        return ORJSONResponse({
             "image_based_recommendations": image_based_recommendations,
             "genre_based_recommendations": genre_based_recommendations,
             "total_image_recommendations": len(image_based_recommendations),
@@ -1074,8 +1514,130 @@ async def recommend_books_legacy(request: Dict[str, Any]) -> Dict[str, Any]:
             "detected_books_count": len(detected_books),
             "preferred_genres": preferred_genres,
             "message": "Legacy recommendations generated successfully"
-        }
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate legacy recommendations: {str(e)}")
 
+@router.post("/batch", response_class=ORJSONResponse, response_model=None)
+async def recommend_books_batch(request: BatchRecommendationRequest, background_tasks: BackgroundTasks) -> ORJSONResponse:
+    """
+    Submit many recommendation requests as one OpenAI Batch API job
+    
+    The job is polled in the background, and its results are added to the
+    recommendation cache as soon as it completes.
+    
+    Args:
+        request: BatchRecommendationRequest containing the recommendation requests
+        background_tasks: Runs the poll after the response is sent
+        
+    Returns:
+        Dict containing the batch id to poll for results
+    """
+    if not get_openai_client():
+        raise HTTPException(status_code=500, detail="OpenAI client not available. Check API keys.")
+    
+    try:
+        batch_id = await submit_batch_recommendations(request.requests)
+        background_tasks.add_task(poll_batch_recommendations, batch_id)
+        
+        return ORJSONResponse({
+            "batch_id": batch_id,
+            "status": "submitted",
+            "total_requests": len(request.requests),
+            "message": "Batch recommendations submitted; results are ready within 24 hours"
+        })
+        
+    except Exception as e:
+        logger.exception("❌ Batch recommendation error: %s", e)
+        raise HTTPException(status_code=500, detail=f"Failed to submit batch recommendations: {str(e)}")
+
+@router.get("/batch/{batch_id}", response_class=ORJSONResponse, response_model=None)
+async def get_batch_recommendation_results(batch_id: str) -> ORJSONResponse:
+    """
+    Get the status and results of a batch recommendation job
+    
+    Args:
+        batch_id: Batch id returned when the job was submitted
+        
+    Returns:
+        Dict containing the batch status and, when completed, its recommendations
+    """
+    try:
+        return ORJSONResponse(await get_batch_recommendations(batch_id))
+        
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get batch recommendations: {str(e)}")
+
+@router.post("/books/stream")
+async def recommend_books_stream(request: RecommendationRequest) -> StreamingResponse:
+    """
+    Stream OpenAI book recommendations as server-sent events
+    
+    Each recommendation is sent as a `data:` event as soon as the model has
+    written it, followed by a final `done` event. Falls back to the curated
+    recommendations if OpenAI is unavailable or returns nothing usable.
+    
+    Args:
+        request: RecommendationRequest containing detected_books, selected_genres, and max_recommendations
+        
+    Returns:
+        StreamingResponse of text/event-stream events
+    """
+    openai_client = get_openai_client()
+    preferred_genres = frozenset(request.selected_genres)
+    
+    async def event_generator():
+        sent = []
+        if openai_client:
+            detected_books = _cold_start_collection(request.detected_books)
+            cache_key = _recommendation_cache_key(
+                detected_books,
+                preferred_genres,
+                request.max_recommendations
+            )
+            cached_recommendations = _get_cached_recommendations(cache_key)
+            
+            if cached_recommendations is not None:
+                sent = cached_recommendations
+                for rec in cached_recommendations:
+                    yield f"data: {orjson.dumps(rec).decode()}\n\n"
+            else:
+                request_params = build_recommendation_request(
+                    detected_books,
+                    request.selected_genres,
+                    request.max_recommendations
+                )
+                try:
+                    # The slot is held until the stream finishes
+                    async with openai_request_slot():
+                        stream = await openai_client.chat.completions.create(**request_params, stream=True)
+                        
+                        # Skip the {"recommendations": ...} wrapper
+                        parser = RecommendationStreamParser(object_depth=1)
+                        async for chunk in stream:
+                            if not chunk.choices or not chunk.choices[0].delta.content:
+                                continue
+                            for rec in parser.feed(chunk.choices[0].delta.content):
+                                if len(sent) < request.max_recommendations and is_valid_recommendation(rec, preferred_genres):
+                                    sent.append(rec)
+                                    yield f"data: {orjson.dumps(rec).decode()}\n\n"
+                    
+                    _cache_recommendations(cache_key, sent)
+                except Exception as e:
+                    logger.exception("❌ OpenAI streaming recommendation error: %s", e)
+        
+        if not sent:
+            fallback_recommendations = get_fallback_recommendations(
+                request.detected_books,
+                preferred_genres,
+                request.max_recommendations
+            )
+            for rec in fallback_recommendations:
+                yield f"data: {orjson.dumps(rec).decode()}\n\n"
+        
+        yield "event: done\ndata: {}\n\n"
+    
+    return StreamingResponse(event_generator(), media_type="text/event-stream")
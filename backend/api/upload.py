@@ -2,14 +2,38 @@ from fastapi import APIRouter, File, UploadFile, HTTPException
 from pathlib import Path
 import shutil
 import uuid
-from typing import Dict, Union
+from typing import Dict, Optional, Tuple, Union
 import os
+import aiofiles
 
 router = APIRouter()
 
 # Allowed image file types
 ALLOWED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp'}
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+UPLOAD_CHUNK_SIZE = 64 * 1024  # Uploads are copied to disk 64KB at a time
+UPLOAD_DIR = Path("static/uploads")
+
+def _find_upload(file_id: str) -> Optional[Tuple[Path, os.stat_result]]:
+    """
+    Find an uploaded image by probing each allowed extension
+    
+    Uploads are always stored as `{file_id}{extension}`, so this takes a few
+    stat calls instead of a scan of the whole uploads directory.
+    
+    Args:
+        file_id: Unique file identifier
+        
+    Returns:
+        Path and stat result of the upload, or None if it doesn't exist
+    """
+    for extension in ALLOWED_EXTENSIONS:
+        file_path = UPLOAD_DIR / f"{file_id}{extension}"
+        try:
+            return file_path, os.stat(file_path)
+        except FileNotFoundError:
+            continue
+    return None
 
 @router.post("/image")
 async def upload_image(file: UploadFile = File(...)) -> Dict[str, Union[str, int]]:
@@ -31,28 +55,33 @@ async def upload_image(file: UploadFile = File(...)) -> Dict[str, Union[str, int
                 detail=f"File type not supported. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
             )
         
-        # Check file size
-        file_content = await file.read()
-        if len(file_content) > MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=400,
-                detail=f"File too large. Maximum size: {MAX_FILE_SIZE // (1024*1024)}MB"
-            )
-        
         # Generate unique filename
         file_id = str(uuid.uuid4())
         filename = f"{file_id}{file_extension}"
         
-        # Save file
-        file_path = Path("static/uploads") / filename
-        with open(file_path, "wb") as buffer:
-            buffer.write(file_content)
+        # Save file in chunks, checking the size as it streams in
+        file_path = UPLOAD_DIR / filename
+        file_size = 0
+        try:
+            async with aiofiles.open(file_path, "wb") as buffer:
+                while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                    file_size += len(chunk)
+                    if file_size > MAX_FILE_SIZE:
+                        raise HTTPException(
+                            status_code=400,
+                            detail=f"File too large. Maximum size: {MAX_FILE_SIZE // (1024*1024)}MB"
+                        )
+                    await buffer.write(chunk)
+        except BaseException:
+            # Don't leave partial uploads behind
+            file_path.unlink(missing_ok=True)
+            raise
         
         return {
             "file_id": file_id,
             "filename": filename,
             "file_path": str(file_path),
-            "file_size": len(file_content),
+            "file_size": file_size,
             "status": "uploaded",
             "message": "Image uploaded successfully"
         }
@@ -74,17 +103,16 @@ async def delete_image(file_id: str) -> Dict[str, str]:
         Dict containing deletion status
     """
     try:
-        # Find the file
-        upload_dir = Path("static/uploads")
-        files = list(upload_dir.glob(f"{file_id}.*"))
-        
-        if not files:
+        # Delete the file, trying each extension it could be stored with
+        for extension in ALLOWED_EXTENSIONS:
+            try:
+                (UPLOAD_DIR / f"{file_id}{extension}").unlink()
+                break
+            except FileNotFoundError:
+                continue
+        else:
             raise HTTPException(status_code=404, detail="File not found")
         
-        # Delete the file
-        file_path = files[0]
-        file_path.unlink()
-        
         return {
             "file_id": file_id,
             "status": "deleted",
@@ -109,14 +137,12 @@ async def get_image_info(file_id: str) -> Dict[str, Union[str, int]]:
     """
     try:
         # Find the file
-        upload_dir = Path("static/uploads")
-        files = list(upload_dir.glob(f"{file_id}.*"))
-        
-        if not files:
+        upload = _find_upload(file_id)
+        if upload is None:
             raise HTTPException(status_code=404, detail="File not found")
         
-        file_path = files[0]
-        file_size = file_path.stat().st_size
+        file_path, file_stat = upload
+        file_size = file_stat.st_size
         
         return {
             "file_id": file_id,
@@ -8,12 +8,18 @@ import numpy as np
 from ultralytics import YOLO
 import cv2
 import openai
-from PIL import Image
-import base64
-import io
 from typing import List, Tuple, Dict, Optional
 import os
 import re
+import asyncio
+from collections import Counter
+from operator import itemgetter
+
+# pybase64 is an optional SIMD drop-in for the stdlib base64 module
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
 
 from pathlib import Path
 
@@ -29,8 +35,170 @@ try:
 except ImportError:
     from backend.services.book_categorizer import BookCategorizer
 
+try:
+    from utils.disk_cache import DiskCache
+    from utils.http_transport import create_async_http_client
+    from utils.image_processing import encode_jpeg
+    from utils.micro_batch import MicroBatcher
+except ImportError:
+    from backend.utils.disk_cache import DiskCache
+    from backend.utils.http_transport import create_async_http_client
+    from backend.utils.image_processing import encode_jpeg
+    from backend.utils.micro_batch import MicroBatcher
+
+# YOLO detection confidence threshold
+CONFIDENCE_THRESHOLD = 0.50
+
+# Longest side of the image handed to YOLO; larger uploads are downscaled
+MAX_INFERENCE_SIZE = 1600
+
+# Input size YOLO letterboxes to; pinned so every forward pass (and the
+# TensorRT engine profile) uses the same shape
+INFERENCE_IMGSZ = int(os.getenv("YOLO_IMGSZ", "1024"))
+
+# Micro-batching limits for concurrent detection requests
+MAX_BATCH = 16
+MAX_WAIT_MS = 10
+
+# Maximum number of spine Vision requests in flight at once
+VISION_MAX_CONCURRENCY = 16
+
+# Longest side and JPEG quality of spine crops sent to the Vision API;
+# the model downsamples internally, so larger crops only cost bandwidth
+VISION_IMAGE_SIZE = 768
+VISION_JPEG_QUALITY = 82
+
+# Dataset YAML for INT8 calibration; when set, the TensorRT engine is
+# exported with INT8 precision instead of FP16
+TENSORRT_INT8_DATA = os.getenv("TENSORRT_INT8_DATA")
+
+# "FIELD: value" lines of a Vision response, and the book_info key of each field
+RESPONSE_FIELD_PATTERN = re.compile(
+    r'^\s*(TITLE|AUTHOR|GENRE|SPINE_APPEARANCE|REASONING|UNCERTAINTY_NOTES):(.*)$', re.MULTILINE
+)
+RESPONSE_FIELDS = {
+    'TITLE': 'title',
+    'AUTHOR': 'author',
+    'SPINE_APPEARANCE': 'spine_appearance',
+    'REASONING': 'reasoning',
+    'UNCERTAINTY_NOTES': 'uncertainty_notes'
+}
+# Genre list format: [Primary Genre, Secondary Genre, Tertiary Genre]
+GENRE_LIST_PATTERN = re.compile(r'\[([^\]]*)\]')
+
+# Vision results keyed by crop size and perceptual hash of the spine, kept
+# across runs for VISION_CACHE_TTL seconds
+VISION_CACHE_TTL = 30 * 24 * 60 * 60
+SPINE_HASH_SIZE = 16
+# Crop sizes are compared in buckets of this many pixels
+SPINE_SIZE_BUCKET = 32
+# Spines with fewer set or unset hash bits than this fraction, or a flatter
+# thumbnail than SPINE_MIN_CONTRAST, are too plain to tell apart and are not cached
+SPINE_MIN_HASH_BITS = 0.15
+SPINE_MIN_CONTRAST = 8.0
+
+# Genres reported when no categorizer is available
+FALLBACK_GENRES = (
+    "Fiction", "Non-Fiction", "Mystery", "Science Fiction", 
+    "Fantasy", "Romance", "Thriller", "Biography", "History", 
+    "Self-Help", "Business", "Technology", "Art", "Poetry", "Drama"
+)
+
+
+def export_tensorrt_engine(model_path: str) -> str:
+    """
+    Get a TensorRT engine for the given YOLO weights, exporting it once if needed.
+    
+    The engine is cached next to the weights with a dynamic batch dimension of up
+    to MAX_BATCH at INFERENCE_IMGSZ. It uses FP16, or INT8 calibrated on
+    TENSORRT_INT8_DATA when that is set. The original weights are returned if CUDA
+    or TensorRT is unavailable.
+    
+    Args:
+        model_path (str): Path to YOLO .pt weights
+        
+    Returns:
+        str: Path to the engine, or model_path as fallback
+    """
+    precision = 'int8' if TENSORRT_INT8_DATA else 'fp16'
+    engine_path = Path(model_path).with_suffix(f'.{INFERENCE_IMGSZ}.{precision}.engine')
+    if engine_path.exists():
+        return str(engine_path)
+    
+    try:
+        import torch
+        if not torch.cuda.is_available():
+            print("⚠️  CUDA not available, skipping TensorRT export")
+            return model_path
+        
+        print("⚙️  Exporting YOLO model to TensorRT engine (one-time)...")
+        if TENSORRT_INT8_DATA:
+            exported_path = YOLO(model_path).export(format='engine', int8=True, data=TENSORRT_INT8_DATA,
+                                                    imgsz=INFERENCE_IMGSZ, dynamic=True, batch=MAX_BATCH)
+        else:
+            exported_path = YOLO(model_path).export(format='engine', half=True,
+                                                    imgsz=INFERENCE_IMGSZ, dynamic=True, batch=MAX_BATCH)
+        # Keep engines for different sizes and precisions apart
+        exported_path = Path(exported_path).replace(engine_path)
+        print(f"✅ TensorRT engine saved to: {exported_path}")
+        return str(exported_path)
+        
+    except Exception as e:
+        print(f"⚠️  TensorRT export failed, using PyTorch weights: {e}")
+        return model_path
+
+
+def spine_hash(image: np.ndarray) -> Optional[str]:
+    """
+    Compute a cache key from the size and difference hash of a cropped spine.
+    
+    Re-uploads of the same shelf produce slightly different crops; the hash
+    compares brightness gradients on a small grayscale thumbnail, so those
+    crops still map to the same key. The crop size is bucketed into the key
+    so spines of different shapes never share an entry.
+    
+    Args:
+        image (np.ndarray): Cropped spine image (BGR format)
+        
+    Returns:
+        Optional[str]: Size buckets and hex digest of the SPINE_HASH_SIZE x
+        SPINE_HASH_SIZE bit hash, or None if the spine is too plain to hash
+        reliably (e.g. a single colour with little text)
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    small = cv2.resize(gray, (SPINE_HASH_SIZE + 1, SPINE_HASH_SIZE), interpolation=cv2.INTER_AREA)
+    if small.std() < SPINE_MIN_CONTRAST:
+        return None
+    
+    bits = small[:, 1:] > small[:, :-1]
+    set_fraction = bits.mean()
+    if set_fraction < SPINE_MIN_HASH_BITS or set_fraction > 1 - SPINE_MIN_HASH_BITS:
+        return None
+    
+    height, width = image.shape[:2]
+    size = f"{height // SPINE_SIZE_BUCKET}x{width // SPINE_SIZE_BUCKET}"
+    return f"{size}:{np.packbits(bits).tobytes().hex()}"
+
+
+def cuda_image_ops_available() -> bool:
+    """
+    Check whether spines can be cropped on a CUDA device.
+    
+    Returns:
+        bool: True if torch can see a GPU
+    """
+    try:
+        import torch
+        return torch.cuda.is_available()
+    except ImportError:
+        return False
+
 
 class BookSpineDetector:
+    # OpenAI clients by API key, shared across instances so connections to
+    # the API are kept alive instead of re-handshaking for every detector
+    _shared_openai_clients: Dict[str, Tuple] = {}
+
     def __init__(self, model_path: str, openai_api_key: str):
         """
         Initialize the BookSpineDetector with YOLO model and OpenAI Vision.
@@ -105,13 +273,22 @@ class BookSpineDetector:
                     self.model = None
                     print("⚠️  Continuing without YOLO model - some features will be disabled")
         
-        if self.model is not None:
+        # Extra predict() arguments for the device the model ends up on
+        self.predict_options = {'imgsz': INFERENCE_IMGSZ}
+        
+        # Exported engines pick their device at predict time and cannot be moved
+        if self.model is not None and Path(model_path).suffix == '.pt':
             # Check for CUDA availability more safely
             try:
                 import torch
                 if torch.cuda.is_available():
                     self.model.to("cuda")
-                    print("✅ Using CUDA for YOLO model")
+                    # Let FP32 matmuls use TF32 and convolutions pick NHWC Tensor Core kernels
+                    torch.set_float32_matmul_precision('high')
+                    self.model.model = self.model.model.to(memory_format=torch.channels_last)
+                    # FP16 only pays off with Tensor Cores (Volta and newer)
+                    self.predict_options.update(device=0, half=torch.cuda.get_device_capability(0)[0] >= 7)
+                    print(f"✅ Using CUDA for YOLO model (half={self.predict_options['half']})")
                 else:
                     self.model.to("cpu")
                     print("✅ Using CPU for YOLO model")
@@ -119,35 +296,17 @@ class BookSpineDetector:
                 self.model.to("cpu")
                 print(f"⚠️  CUDA check failed, using CPU: {e}")
         
-        # Initialize OpenAI with proxy support for office environments
-        try:
-            # Check for proxy environment
-            http_proxy = os.getenv("HTTP_PROXY") or os.getenv("http_proxy")
-            https_proxy = os.getenv("HTTPS_PROXY") or os.getenv("https_proxy")
-            
-            # Create httpx client with minimal configuration to avoid proxy issues
-            import httpx
-            http_client = httpx.Client(
-                timeout=30.0,
-                limits=httpx.Limits(max_keepalive_connections=5, max_connections=10)
-            )
-            
-            # Create OpenAI client with the custom httpx client
-            self.openai_client = openai.OpenAI(api_key=openai_api_key, http_client=http_client)
-            print("✅ OpenAI client initialized for book analysis")
-                
-        except (AttributeError, TypeError) as e:
-            if "proxies" in str(e):
-                # Fallback for httpx version compatibility issues
-                import httpx
-                self.openai_client = openai.OpenAI(
-                    api_key=openai_api_key,
-                    http_client=httpx.Client()
-                )
-            else:
-                # Fallback for older OpenAI versions
-                openai.api_key = openai_api_key
-                self.openai_client = openai
+        # OpenAI clients are shared with other detectors using the same key
+        self.openai_client, self.async_openai_client = self._get_openai_clients(openai_api_key)
+        self._vision_semaphore = asyncio.Semaphore(VISION_MAX_CONCURRENCY)
+        
+        # Spines analyzed before are answered from the cache without an API call
+        self._vision_cache = DiskCache("vision", ttl=VISION_CACHE_TTL)
+        
+        # Rotate, crop and resize spines on the GPU when one is available
+        self.use_cuda_image_ops = cuda_image_ops_available()
+        if self.use_cuda_image_ops:
+            print("✅ Using CUDA for spine cropping")
         
         # Initialize book categorizer
         try:
@@ -229,9 +388,93 @@ class BookSpineDetector:
         SPINE_APPEARANCE:
         REASONING:
         UNCERTAINTY_NOTES:"""
+        
+        # The prompt is the same for every spine, so build its message part once
+        prompt = f"""Analyze this book spine image and extract the book metadata.
+
+            Look carefully at the text, layout, and visual elements on the book spine.
+            Identify the title and author based on the visual hierarchy and text patterns.
+            
+            {self.system_prompt}
+            
+            Use standard format to output book metadata:
+            TITLE:
+            AUTHOR:
+            GENRE: [Primary Genre, Secondary Genre, Tertiary Genre]
+            SPINE_APPEARANCE:
+            REASONING:
+            UNCERTAINTY_NOTES:"""
+        self._vision_text_part = {
+            "type": "text",
+            "text": prompt
+        }
 
         print(f"✅ BookSpineDetector initialized")
 
+    @classmethod
+    def _get_openai_clients(cls, openai_api_key: str) -> Tuple:
+        """
+        Get the sync and async OpenAI clients for an API key, creating them once.
+        
+        Args:
+            openai_api_key (str): OpenAI API key
+            
+        Returns:
+            Tuple: Sync client and async client (None if unavailable)
+        """
+        clients = cls._shared_openai_clients.get(openai_api_key)
+        if clients is None:
+            clients = (cls._create_openai_client(openai_api_key), cls._create_async_openai_client(openai_api_key))
+            cls._shared_openai_clients[openai_api_key] = clients
+        return clients
+
+    @staticmethod
+    def _create_openai_client(openai_api_key: str):
+        """Create the blocking OpenAI client, with fallbacks for older library versions"""
+        # Initialize OpenAI with proxy support for office environments
+        try:
+            # Check for proxy environment
+            http_proxy = os.getenv("HTTP_PROXY") or os.getenv("http_proxy")
+            https_proxy = os.getenv("HTTPS_PROXY") or os.getenv("https_proxy")
+            
+            # Create httpx client with minimal configuration to avoid proxy issues
+            import httpx
+            http_client = httpx.Client(
+                timeout=30.0,
+                limits=httpx.Limits(max_keepalive_connections=32, max_connections=64)
+            )
+            
+            # Create OpenAI client with the custom httpx client
+            openai_client = openai.OpenAI(api_key=openai_api_key, http_client=http_client)
+            print("✅ OpenAI client initialized for book analysis")
+                
+        except (AttributeError, TypeError) as e:
+            if "proxies" in str(e):
+                # Fallback for httpx version compatibility issues
+                import httpx
+                openai_client = openai.OpenAI(
+                    api_key=openai_api_key,
+                    http_client=httpx.Client()
+                )
+            else:
+                # Fallback for older OpenAI versions
+                openai.api_key = openai_api_key
+                openai_client = openai
+        
+        return openai_client
+
+    @staticmethod
+    def _create_async_openai_client(openai_api_key: str):
+        """Create the async OpenAI client used to analyze all spines of a shelf concurrently"""
+        try:
+            return openai.AsyncOpenAI(
+                api_key=openai_api_key,
+                http_client=create_async_http_client(timeout=30.0, max_connections=4 * VISION_MAX_CONCURRENCY)
+            )
+        except Exception as e:
+            print(f"⚠️  Async OpenAI client unavailable, analyzing spines one at a time: {e}")
+            return None
+
     def detect_books(self, image: np.ndarray) -> List[Dict]:
         """
         Detect books in the image and return book data with annotations.
@@ -242,14 +485,143 @@ class BookSpineDetector:
         Returns:
             List[Dict]: List of book data dictionaries with annotations
         """
-        print("🔍 Detecting books in image...")
+        return self.detect_books_batch([image])[0]
+
+    def detect_books_batch(self, images: List[np.ndarray]) -> List[List[Dict]]:
+        """
+        Detect books in several images with a single YOLO forward pass.
+        
+        Args:
+            images (List[np.ndarray]): Input images, e.g. several shelf photos
+            
+        Returns:
+            List[List[Dict]]: Book data for each image, in input order
+        """
+        print(f"🔍 Detecting books in {len(images)} image(s)...")
         
         if self.model is None:
             print("❌ YOLO model not available - cannot detect books")
-            return []
+            return [[] for _ in images]
+        
+        results = self.predict_batch(images)
+        return [self.process_detections(image, result) for image, result in zip(images, results)]
+
+    def _inference_image(self, image: np.ndarray) -> np.ndarray:
+        """
+        Downscale large images before YOLO inference.
+        
+        Detections are mapped back to the full-resolution image in
+        process_detections, so spine crops keep their original detail.
+        
+        Args:
+            image (np.ndarray): Input image
+            
+        Returns:
+            np.ndarray: Image with its longest side at most MAX_INFERENCE_SIZE
+        """
+        height, width = image.shape[:2]
+        scale = MAX_INFERENCE_SIZE / max(height, width)
+        if scale >= 1:
+            return image
+        
+        return cv2.resize(image, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+
+    def predict_batch(self, images: List[np.ndarray]) -> List:
+        """
+        Run a single YOLO forward pass over several images.
+        
+        Args:
+            images (List[np.ndarray]): Input images
+            
+        Returns:
+            List: One YOLO result per input image, in the same order
+        """
+        import torch
+        
+        inference_images = [self._inference_image(image) for image in images]
+        with torch.inference_mode():
+            return self.model.predict(source=inference_images, conf=CONFIDENCE_THRESHOLD, save=False, show=False,
+                                      verbose=False, **self.predict_options)
+
+    def process_detections(self, image: np.ndarray, results) -> List[Dict]:
+        """
+        Crop, analyze and categorize the books found by a YOLO result.
+        
+        Blocks on one Vision request per spine, so it is only meant for
+        synchronous callers; request handlers go through BatchedDetector,
+        which uses aprocess_detections.
+        
+        Args:
+            image (np.ndarray): Full-resolution image the result was computed for
+            results: YOLO result for that image (possibly computed on a downscaled copy)
+            
+        Returns:
+            List[Dict]: List of book data dictionaries with annotations
+        """
+        crops = self._crop_books(image, results)
+        detected_books = []
+        for crop in crops:
+            book_info = self.analyze_image_with_vision(crop['image'], crop['book_number'])
+            self._add_book(detected_books, book_info, crop)
+        
+        return self._finalize_books(detected_books)
+
+    async def aprocess_detections(self, image: np.ndarray, results) -> List[Dict]:
+        """
+        Crop, analyze and categorize the books found by a YOLO result, analyzing
+        all spines concurrently.
+        
+        Cropping runs in the default executor; the Vision requests for every
+        spine are in flight at the same time, so a shelf takes about as long
+        as its slowest request instead of their sum. Categorization batches
+        are sent concurrently as well.
+        
+        Args:
+            image (np.ndarray): Full-resolution image the result was computed for
+            results: YOLO result for that image (possibly computed on a downscaled copy)
+            
+        Returns:
+            List[Dict]: List of book data dictionaries with annotations
+        """
+        loop = asyncio.get_running_loop()
+        crops = await loop.run_in_executor(None, self._crop_books, image, results)
+        
+        book_infos = await asyncio.gather(*(
+            self.aanalyze_image_with_vision(crop['image'], crop['book_number']) for crop in crops
+        ))
         
-        results = self.model.predict(source=image, conf=0.50, save=False, show=False)[0]
         detected_books = []
+        for crop, book_info in zip(crops, book_infos):
+            self._add_book(detected_books, book_info, crop)
+        
+        detected_books = self._sort_books(detected_books)
+        
+        # Categorize books with genres
+        if self.categorizer and detected_books:
+            print("🏷️  Categorizing books with genres...")
+            try:
+                detected_books = await self.categorizer.acategorize_books(detected_books)
+                print(f"✅ Successfully categorized {len(detected_books)} books")
+            except Exception as e:
+                print(f"❌ Error categorizing books: {e}")
+        
+        return detected_books
+
+    def _crop_books(self, image: np.ndarray, results) -> List[Dict]:
+        """
+        Cut each detected spine out of the image, rotated upright.
+        
+        Args:
+            image (np.ndarray): Full-resolution image the result was computed for
+            results: YOLO result for that image (possibly computed on a downscaled copy)
+            
+        Returns:
+            List[Dict]: Cropped spine image and annotation data for each usable box
+        """
+        crops = []
+        
+        # Scale factor from inference coordinates back to the full-resolution image
+        scale = image.shape[1] / results.orig_shape[1] if results else 1.0
         
         # Debug information
         print(f"🔍 YOLO results type: {type(results)}")
@@ -275,107 +647,187 @@ class BookSpineDetector:
             print("�� Try lowering the confidence threshold or check if your model is trained for book detection")
             return []
         
-        for i, box in enumerate(boxes):
+        # Corners of every box in one transfer, shaped (N, 4, 2)
+        if hasattr(boxes, 'xyxyxyxy'):
+            # OBB (oriented bounding box) - 8 points
+            all_points = boxes.xyxyxyxy.cpu().numpy().reshape(-1, 4, 2)
+        else:
+            # Regular bounding box - convert to 4 corners
+            x1, y1, x2, y2 = boxes.xyxy.cpu().numpy().T
+            all_points = np.stack([x1, y1, x2, y1, x2, y2, x1, y2], axis=1).reshape(-1, 4, 2)
+        
+        if scale != 1.0:
+            all_points = all_points * scale
+        
+        # Angle of the first edge, center, width and height of every box
+        edges1 = all_points[:, 1] - all_points[:, 0]
+        edges2 = all_points[:, 2] - all_points[:, 1]
+        angles = np.degrees(np.arctan2(edges1[:, 1], edges1[:, 0]))
+        centers = all_points.mean(axis=1)
+        widths = np.linalg.norm(edges1, axis=1)
+        heights = np.linalg.norm(edges2, axis=1)
+        
+        # Three corners of each box are mapped straight onto its output tile so
+        # rotation and crop are a single warp instead of rotating the whole
+        # frame. The first edge becomes the top or bottom side depending on the
+        # corner winding, so the spine is never mirrored.
+        windings = edges1[:, 0] * edges2[:, 1] - edges1[:, 1] * edges2[:, 0]
+        src_corners = all_points[:, :3].astype(np.float32)
+        dst_corners = np.empty_like(src_corners)
+        dst_corners[:, :, 0] = widths[:, None] * np.float32([0, 1, 1])
+        dst_corners[:, :, 1] = heights[:, None] * np.where(windings[:, None] >= 0, np.float32([0, 0, 1]), np.float32([1, 1, 0]))
+        
+        # Axis-aligned bounds of each spine in the original image
+        lower_bounds = np.maximum(all_points.min(axis=1), 0).astype(int)
+        upper_bounds = np.minimum(all_points.max(axis=1), (image.shape[1], image.shape[0])).astype(int)
+        
+        affines = []
+        crop_sizes = []
+        for i in range(len(all_points)):
             try:
-                # Handle both OBB and regular boxes
-                if hasattr(box, 'xyxyxyxy'):
-                    # OBB (oriented bounding box) - 8 points
-                    points = box.xyxyxyxy.cpu().numpy().reshape(-1, 2)
-                else:
-                    # Regular bounding box - convert to 4 corners
-                    x1, y1, x2, y2 = box.xyxy.cpu().numpy()[0]
-                    points = np.array([[x1, y1], [x2, y1], [x2, y2], [x1, y2]])
-               
-                # Calculate angle and get rotation matrix
-                edge1 = points[1] - points[0]
-                angle = np.arctan2(edge1[1], edge1[0]) * 180 / np.pi
-                
-                # Get the center point
-                center = np.mean(points, axis=0)
-                
-                # Get width and height of the rotated rectangle
-                width = np.linalg.norm(points[1] - points[0])
-                height = np.linalg.norm(points[2] - points[1])
+                points = all_points[i]
+                center = centers[i]
+                width, height, angle = widths[i], heights[i], angles[i]
                 
                 # Skip if width or height is too small
                 if width < 10 or height < 10:
                     print(f"⚠️  Skipping book {i+1}: too small ({width:.1f}x{height:.1f})")
                     continue
                 
-                # Get rotation matrix
-                rotation_matrix = cv2.getRotationMatrix2D(tuple(center), angle, 1.0)
+                affine = cv2.getAffineTransform(src_corners[i], dst_corners[i])
                 
-                # Calculate new image size after rotation
-                cos = np.abs(rotation_matrix[0, 0])
-                sin = np.abs(rotation_matrix[0, 1])
-                new_width = int(height * sin + width * cos)
-                new_height = int(height * cos + width * sin)
+                x_min, y_min = lower_bounds[i]
+                x_max, y_max = upper_bounds[i]
                 
-                # Adjust rotation matrix
-                rotation_matrix[0, 2] += new_width/2 - center[0]
-                rotation_matrix[1, 2] += new_height/2 - center[1]
-                
-                # Rotate the whole image
-                rotated_image = cv2.warpAffine(image, rotation_matrix, (new_width, new_height))
-                
-                # Calculate the bounding box in the rotated image
-                rotated_points = cv2.transform(points.reshape(-1, 1, 2), rotation_matrix).reshape(-1, 2)
-                x_min, y_min = np.min(rotated_points, axis=0)
-                x_max, y_max = np.max(rotated_points, axis=0)
-                
-                # Ensure valid crop coordinates
-                x_min, y_min = max(0, int(x_min)), max(0, int(y_min))
-                x_max, y_max = min(rotated_image.shape[1], int(x_max)), min(rotated_image.shape[0], int(y_max))
-                
-                # Skip if crop dimensions are invalid
-                if x_max <= x_min or y_max <= y_min:
-                    print(f"⚠️  Skipping book {i+1}: invalid crop dimensions")
-                    continue
-                
-                # Crop the rotated image for analysis
-                cropped_image = rotated_image[y_min:y_max, x_min:x_max]
-                
-                # Analyze the cropped image
-                book_info = self.analyze_image_with_vision(cropped_image, i + 1)
-                
-                # Add annotation data
-                book_info.update({
+                affines.append(affine)
+                crop_sizes.append((int(width), int(height)))
+                crops.append({
                     'book_number': i + 1,
-                    'bbox_coordinates': points.tolist(),
-                    'center': center.tolist(),
-                    'width': float(width),
-                    'height': float(height),
-                    'angle': float(angle),
-                    'crop_coordinates': {
-                        'x_min': int(x_min),
-                        'y_min': int(y_min),
-                        'x_max': int(x_max),
-                        'y_max': int(y_max)
-                    },
-                    'confidence': 'high' if book_info['isValid'] else 'low'
+                    'image': None,
+                    'annotation': {
+                        'book_number': i + 1,
+                        'bbox_coordinates': points.tolist(),
+                        'center': center.tolist(),
+                        'width': float(width),
+                        'height': float(height),
+                        'angle': float(angle),
+                        # Leftmost x coordinate, used to order books on the shelf
+                        'x_min': float(points[:, 0].min()),
+                        'crop_coordinates': {
+                            'x_min': int(x_min),
+                            'y_min': int(y_min),
+                            'x_max': int(x_max),
+                            'y_max': int(y_max)
+                        }
+                    }
                 })
                 
-                detected_books.append(book_info)
-                
-                print(f"✅ Processed book {i+1}: {cropped_image.shape[1]}x{cropped_image.shape[0]} pixels")
-                print(f"   Title: {book_info['title']}")
-                print(f"   Author: {book_info['author']}")
-                print(f"   Primary Genre: {book_info.get('primary_genre', 'Unknown')}")
-                print(f"   Secondary Genre: {book_info.get('secondary_genre', 'Unknown')}")
-                print(f"   Tertiary Genre: {book_info.get('tertiary_genre', 'Unknown')}")
-                print(f"   Valid: {book_info['isValid']}")
-                
             except Exception as e:
                 print(f"❌ Error processing book {i+1}: {e}")
                 continue
         
+        # Warp every spine in one batched GPU kernel, or one by one on the CPU
+        tiles = None
+        if self.use_cuda_image_ops and crops:
+            try:
+                tiles = self._crop_batch_on_gpu(image, np.stack(affines), np.array(crop_sizes))
+            except Exception as e:
+                print(f"⚠️  GPU crop failed, cropping on CPU: {e}")
+        
+        if tiles is None:
+            tiles = [cv2.warpAffine(image, affine, crop_size, flags=cv2.INTER_LINEAR)
+                     for affine, crop_size in zip(affines, crop_sizes)]
+        
+        for crop, tile in zip(crops, tiles):
+            crop['image'] = tile
+        
+        return crops
+
+    def _crop_batch_on_gpu(self, image: np.ndarray, affines: np.ndarray, sizes: np.ndarray) -> List[np.ndarray]:
+        """
+        Warp all spines of a frame on the GPU with a single batched grid_sample.
+        
+        The frame is uploaded once. Each tile is sampled directly at its final
+        size (longest side at most VISION_IMAGE_SIZE), and the tiles come back
+        as uint8 through a pinned host buffer.
+        
+        Args:
+            image (np.ndarray): Full-resolution image (BGR format)
+            affines (np.ndarray): (N, 2, 3) matrices mapping each spine onto its tile
+            sizes (np.ndarray): (N, 2) width and height of each full-size tile
+            
+        Returns:
+            List[np.ndarray]: Cropped spines, in the order of affines
+        """
+        import torch
+        import torch.nn.functional as F
+        
+        height, width = image.shape[:2]
+        count = len(affines)
+        frame = torch.from_numpy(image).to('cuda', non_blocking=True).permute(2, 0, 1)[None].float()
+        
+        # Fold the downscale into each affine and pad the batch to the largest tile
+        scales = np.minimum(1.0, VISION_IMAGE_SIZE / sizes.max(axis=1))
+        out_sizes = np.maximum((sizes * scales[:, None]).astype(int), 1)
+        out_width, out_height = out_sizes.max(axis=0)
+        forward = np.concatenate([affines * scales[:, None, None], np.tile([[[0.0, 0.0, 1.0]]], (count, 1, 1))], axis=1)
+        inverse = torch.from_numpy(np.linalg.inv(forward)[:, :2]).to('cuda', dtype=torch.float32)
+        
+        # Source pixel of every output pixel, normalized for grid_sample
+        ys, xs = torch.meshgrid(torch.arange(out_height, device='cuda', dtype=torch.float32),
+                                torch.arange(out_width, device='cuda', dtype=torch.float32), indexing='ij')
+        dst = torch.stack([xs, ys, torch.ones_like(xs)], dim=-1)
+        src = torch.einsum('nij,hwj->nhwi', inverse, dst)
+        grid = (2 * src + 1) / torch.tensor([width, height], device='cuda', dtype=torch.float32) - 1
+        
+        tiles = F.grid_sample(frame.expand(count, -1, -1, -1), grid, mode='bilinear',
+                              padding_mode='zeros', align_corners=False)
+        tiles = tiles.round_().clamp_(0, 255).to(torch.uint8).permute(0, 2, 3, 1)
+        
+        host = torch.empty(tiles.shape, dtype=torch.uint8, pin_memory=True)
+        host.copy_(tiles, non_blocking=True)
+        torch.cuda.current_stream().synchronize()
+        host = host.numpy()
+        
+        return [np.ascontiguousarray(host[i, :h, :w]) for i, (w, h) in enumerate(out_sizes)]
+
+    def _add_book(self, detected_books: List[Dict], book_info: Dict, crop: Dict):
+        """Attach a spine's annotation data to its Vision result and collect it"""
+        i = crop['book_number'] - 1
+        try:
+            cropped_image = crop['image']
+            
+            # Add annotation data
+            book_info.update(crop['annotation'])
+            book_info['confidence'] = 'high' if book_info['isValid'] else 'low'
+            
+            detected_books.append(book_info)
+            
+            print(f"✅ Processed book {i+1}: {cropped_image.shape[1]}x{cropped_image.shape[0]} pixels")
+            print(f"   Title: {book_info['title']}")
+            print(f"   Author: {book_info['author']}")
+            print(f"   Primary Genre: {book_info.get('primary_genre', 'Unknown')}")
+            print(f"   Secondary Genre: {book_info.get('secondary_genre', 'Unknown')}")
+            print(f"   Tertiary Genre: {book_info.get('tertiary_genre', 'Unknown')}")
+            print(f"   Valid: {book_info['isValid']}")
+            
+        except Exception as e:
+            print(f"❌ Error processing book {i+1}: {e}")
+
+    def _sort_books(self, detected_books: List[Dict]) -> List[Dict]:
+        """Sort analyzed books left to right"""
         if not detected_books:
             print("❌ No valid books could be processed")
             return []
         
         # Sort books by leftmost x coordinate
-        detected_books.sort(key=lambda x: min(x['bbox_coordinates'][::2]))
+        detected_books.sort(key=itemgetter('x_min'))
         print(f"✅ Successfully processed {len(detected_books)} books")
+        return detected_books
+
+    def _finalize_books(self, detected_books: List[Dict]) -> List[Dict]:
+        """Sort analyzed books left to right and categorize them"""
+        detected_books = self._sort_books(detected_books)
         
         # Categorize books with genres
         if self.categorizer and detected_books:
@@ -392,7 +844,7 @@ class BookSpineDetector:
 
     def _process_cropped_image(self, image: np.ndarray) -> np.ndarray:
         """
-        Process cropped image: resize to 1024px max dimension for better vision analysis
+        Process cropped image: cap its longest side at VISION_IMAGE_SIZE
         
         Args:
             image (np.ndarray): Input cropped image
@@ -401,14 +853,16 @@ class BookSpineDetector:
             np.ndarray: Processed image
         """
         height, width = image.shape[:2]
-        target_size = 1024  # Larger size for better vision analysis
-        scale = target_size / max(height, width)
+        if max(height, width) <= VISION_IMAGE_SIZE:
+            return image
+        
+        scale = VISION_IMAGE_SIZE / max(height, width)
         new_width = int(width * scale)
         new_height = int(height * scale)
         
-        # Resize to target size
+        # INTER_AREA is cheaper than LANCZOS4 and looks better when downscaling
         final_image = cv2.resize(image, (new_width, new_height), 
-                               interpolation=cv2.INTER_LANCZOS4)
+                               interpolation=cv2.INTER_AREA)
         
         return final_image
 
@@ -422,18 +876,116 @@ class BookSpineDetector:
         Returns:
             str: Base64 encoded image
         """
-        # Convert BGR to RGB
-        rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        # Encoded straight from BGR, with libjpeg-turbo when available
+        return base64.b64encode(encode_jpeg(image, quality=VISION_JPEG_QUALITY)).decode('ascii')
+
+    def image_to_data_url(self, image: np.ndarray) -> str:
+        """
+        Convert OpenCV image to a JPEG data URL for OpenAI Vision API
+        
+        The prefix is joined to the base64 bytes before the single ASCII
+        decode, so the (large) payload is not copied again by formatting.
+        
+        Args:
+            image (np.ndarray): OpenCV image (BGR format)
+            
+        Returns:
+            str: data:image/jpeg;base64 URL
+        """
+        jpeg = encode_jpeg(image, quality=VISION_JPEG_QUALITY)
+        return (b"data:image/jpeg;base64," + base64.b64encode(jpeg)).decode('ascii')
+
+    def _vision_failure(self, raw_text: str, reasoning: str) -> Dict[str, str]:
+        """Book metadata returned when a spine could not be analyzed"""
+        return {
+            'title': '',
+            'author': '',
+            'genre': '',
+            'primary_genre': '',
+            'secondary_genre': '',
+            'tertiary_genre': '',
+            'isValid': False,
+            'rawText': raw_text,
+            'reasoning': reasoning
+        }
+
+    def _vision_request(self, image: np.ndarray) -> Dict:
+        """
+        Build the OpenAI Vision request for a cropped spine image
         
-        # Convert to PIL Image
-        pil_image = Image.fromarray(rgb_image)
+        Args:
+            image (np.ndarray): Cropped spine image
+            
+        Returns:
+            Dict: Keyword arguments for chat.completions.create
+        """
+        # Process image for better analysis
+        processed_image = self._process_cropped_image(image)
         
-        # Convert to base64
-        buffer = io.BytesIO()
-        pil_image.save(buffer, format='JPEG', quality=95)
-        img_bytes = buffer.getvalue()
+        # Convert to a base64 data URL
+        image_url = self.image_to_data_url(processed_image)
         
-        return base64.b64encode(img_bytes).decode('utf-8')
+        return {
+            "model": "gpt-4o-mini",
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        self._vision_text_part,
+                        {
+                            "type": "image_url",
+                            "image_url": {
+                                "url": image_url
+                            }
+                        }
+                    ]
+                }
+            ],
+            "max_tokens": 500,
+            "temperature": 0.1
+        }
+
+    def _vision_result(self, response) -> Dict[str, str]:
+        """
+        Parse an OpenAI Vision response into book metadata
+        
+        Args:
+            response: Chat completion returned by the Vision request
+            
+        Returns:
+            Dict[str, str]: Book metadata
+        """
+        # Handle API response format
+        if hasattr(response, 'choices') and len(response.choices) > 0:
+            if hasattr(response.choices[0], 'message'):
+                response_text = response.choices[0].message.content
+            else:
+                response_text = response.choices[0].text
+        else:
+            print(f"❌ Unexpected response format: {response}")
+            return self._vision_failure('Invalid API Response', 'OpenAI API returned unexpected response format')
+        
+        # Parse the response
+        book_info = self._parse_openai_response(response_text)
+        book_info['rawText'] = 'Vision Analysis'  # Indicate this came from vision
+        
+        return book_info
+
+    def _cached_vision_result(self, key: Optional[str]) -> Optional[Dict[str, str]]:
+        """Get a copy of the cached Vision result for a spine hash, if any"""
+        if key is None:
+            return None
+        
+        book_info = self._vision_cache.get(key)
+        return dict(book_info) if book_info is not None else None
+
+    def _cache_vision_result(self, key: Optional[str], book_info: Dict[str, str]):
+        """Remember a Vision result for a spine hash, in memory and on disk"""
+        # Failed analyses and spines too plain to hash are not cached
+        if key is None or book_info.get('rawText') != 'Vision Analysis':
+            return
+        
+        self._vision_cache.set(key, dict(book_info))
 
     def analyze_image_with_vision(self, image: np.ndarray, book_number: int) -> Dict[str, str]:
         """
@@ -447,107 +999,76 @@ class BookSpineDetector:
             Dict[str, str]: Book metadatas
         """
         try:
-            # Process image for better analysis
-            processed_image = self._process_cropped_image(image)
+            key = spine_hash(image)
+            cached = self._cached_vision_result(key)
+            if cached is not None:
+                print(f"♻️  Using cached vision result for book {book_number}")
+                return cached
             
-            # Convert to base64
-            base64_image = self.image_to_base64(processed_image)
+            request = self._vision_request(image)
             
-            # Create the prompt
-            prompt = f"""Analyze this book spine image and extract the book metadata.
-
-            Look carefully at the text, layout, and visual elements on the book spine.
-            Identify the title and author based on the visual hierarchy and text patterns.
-            
-            {self.system_prompt}
-            
-            Use standard format to output book metadata:
-            TITLE:
-            AUTHOR:
-            GENRE: [Primary Genre, Secondary Genre, Tertiary Genre]
-            SPINE_APPEARANCE:
-            REASONING:
-            UNCERTAINTY_NOTES:"""
-
             # Call OpenAI Vision API
             try:
                 # Use the new API format (OpenAI v1.0+)
-                response = self.openai_client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=[
-                        {
-                            "role": "user",
-                            "content": [
-                                {
-                                    "type": "text",
-                                    "text": prompt
-                                },
-                                {
-                                    "type": "image_url",
-                                    "image_url": {
-                                        "url": f"data:image/jpeg;base64,{base64_image}"
-                                    }
-                                }
-                            ]
-                        }
-                    ],
-                    max_tokens=500,
-                    temperature=0.1
-                )
+                response = self.openai_client.chat.completions.create(**request)
             except Exception as api_error:
                 print(f"❌ OpenAI API error: {api_error}")
                 # Return a fallback response
-                return {
-                    'title': '',
-                    'author': '',
-                    'genre': '',
-                    'primary_genre': '',
-                    'secondary_genre': '',
-                    'tertiary_genre': '',
-                    'isValid': False,
-                    'rawText': 'OpenAI API Error',
-                    'reasoning': f'OpenAI API call failed: {str(api_error)}'
-                }
+                return self._vision_failure('OpenAI API Error', f'OpenAI API call failed: {str(api_error)}')
             
-            # Handle API response format
-            if hasattr(response, 'choices') and len(response.choices) > 0:
-                if hasattr(response.choices[0], 'message'):
-                    response_text = response.choices[0].message.content
-                else:
-                    response_text = response.choices[0].text
-            else:
-                print(f"❌ Unexpected response format: {response}")
-                return {
-                    'title': '',
-                    'author': '',
-                    'genre': '',
-                    'primary_genre': '',
-                    'secondary_genre': '',
-                    'tertiary_genre': '',
-                    'isValid': False,
-                    'rawText': 'Invalid API Response',
-                    'reasoning': 'OpenAI API returned unexpected response format'
-                }
+            book_info = self._vision_result(response)
+            self._cache_vision_result(key, book_info)
+            return book_info
+            
+        except Exception as e:
+            print(f"❌ OpenAI Vision API error for book {book_number}: {e}")
+            return self._vision_failure('Vision Analysis Failed', f'OpenAI Vision API error: {str(e)}')
+
+    async def aanalyze_image_with_vision(self, image: np.ndarray, book_number: int) -> Dict[str, str]:
+        """
+        Analyze book spine image using the async OpenAI client
+        
+        At most VISION_MAX_CONCURRENCY requests are in flight at once. Falls
+        back to the blocking client in the default executor when the async
+        client is unavailable.
+        
+        Args:
+            image (np.ndarray): Input image
+            book_number (int): Book number for debugging
+            
+        Returns:
+            Dict[str, str]: Book metadatas
+        """
+        loop = asyncio.get_running_loop()
+        if self.async_openai_client is None:
+            return await loop.run_in_executor(None, self.analyze_image_with_vision, image, book_number)
+        
+        try:
+            key = spine_hash(image)
+            cached = self._cached_vision_result(key)
+            if cached is not None:
+                print(f"♻️  Using cached vision result for book {book_number}")
+                return cached
+            
+            # Resizing and encoding are CPU-bound, keep them off the event loop
+            request = await loop.run_in_executor(None, self._vision_request, image)
             
-            # Parse the response
-            book_info = self._parse_openai_response(response_text)
-            book_info['rawText'] = 'Vision Analysis'  # Indicate this came from vision
+            # Call OpenAI Vision API
+            try:
+                async with self._vision_semaphore:
+                    response = await self.async_openai_client.chat.completions.create(**request)
+            except Exception as api_error:
+                print(f"❌ OpenAI API error: {api_error}")
+                # Return a fallback response
+                return self._vision_failure('OpenAI API Error', f'OpenAI API call failed: {str(api_error)}')
             
+            book_info = self._vision_result(response)
+            self._cache_vision_result(key, book_info)
             return book_info
             
         except Exception as e:
             print(f"❌ OpenAI Vision API error for book {book_number}: {e}")
-            return {
-                'title': '',
-                'author': '',
-                'genre': '',
-                'primary_genre': '',
-                'secondary_genre': '',
-                'tertiary_genre': '',
-                'isValid': False,
-                'rawText': 'Vision Analysis Failed',
-                'reasoning': f'OpenAI Vision API error: {str(e)}'
-            }
+            return self._vision_failure('Vision Analysis Failed', f'OpenAI Vision API error: {str(e)}')
 
     def _parse_openai_response(self, response_text: str) -> Dict[str, str]:
         """
@@ -573,23 +1094,15 @@ class BookSpineDetector:
         }
         
         try:
-            lines = response_text.split('\n')
-            
-            for line in lines:
-                line = line.strip()
-                if line.startswith('TITLE:'):
-                    book_info['title'] = line.replace('TITLE:', '').strip()
-                elif line.startswith('AUTHOR:'):
-                    book_info['author'] = line.replace('AUTHOR:', '').strip()
-                elif line.startswith('GENRE:'):
-                    # Extract genres from the GENRE line
-                    genre_text = line.replace('GENRE:', '').strip()
-                    
+            for match in RESPONSE_FIELD_PATTERN.finditer(response_text):
+                field, value = match.group(1), match.group(2).strip()
+                if field != 'GENRE':
+                    book_info[RESPONSE_FIELDS[field]] = value
+                else:
                     # Parse the genre list format: [Primary Genre, Secondary Genre, Tertiary Genre]
-                    if genre_text.startswith('[') and genre_text.endswith(']'):
-                        # Remove brackets and split by comma
-                        genre_text = genre_text.strip('[]')
-                        genres = [g.strip() for g in genre_text.split(',')]
+                    genre_list = GENRE_LIST_PATTERN.fullmatch(value)
+                    if genre_list:
+                        genres = [g.strip() for g in genre_list.group(1).split(',')]
                         
                         # Assign genres
                         book_info['primary_genre'] = genres[0] if len(genres) > 0 else ''
@@ -600,16 +1113,10 @@ class BookSpineDetector:
                         book_info['genre'] = book_info['primary_genre']
                     else:
                         # Fallback if format is different
-                        book_info['primary_genre'] = genre_text
+                        book_info['primary_genre'] = value
                         book_info['secondary_genre'] = ''
                         book_info['tertiary_genre'] = ''
-                        book_info['genre'] = genre_text
-                elif line.startswith('SPINE_APPEARANCE:'):
-                    book_info['spine_appearance'] = line.replace('SPINE_APPEARANCE:', '').strip()
-                elif line.startswith('REASONING:'):
-                    book_info['reasoning'] = line.replace('REASONING:', '').strip()
-                elif line.startswith('UNCERTAINTY_NOTES:'):
-                    book_info['uncertainty_notes'] = line.replace('UNCERTAINTY_NOTES:', '').strip()
+                        book_info['genre'] = value
 
         except Exception as e:
             book_info['uncertainty_notes'] = f"Parsing error: {str(e)}"
@@ -701,8 +1208,18 @@ class BookSpineDetector:
         Returns:
             Dict: Annotation data including bounding boxes and colors
         """
-        books = self.detect_books(image)
+        return self.annotations_from_books(self.detect_books(image))
+
+    def annotations_from_books(self, books: List[Dict]) -> Dict:
+        """
+        Build annotation data from already detected books
         
+        Args:
+            books (List[Dict]): Books returned by detect_books
+            
+        Returns:
+            Dict: Annotation data including bounding boxes and colors
+        """
         if not books:
             return {"boxes": [], "colors": [], "labels": []}
         
@@ -755,25 +1272,77 @@ class BookSpineDetector:
             return self.categorizer.get_genre_statistics(books)
         else:
             # Fallback statistics
-            stats = {}
-            for book in books:
-                genre = book.get('genre', 'Unknown')
-                stats[genre] = stats.get(genre, 0) + 1
-            return stats
+            return dict(Counter(book.get('genre', 'Unknown') for book in books))
 
-    def get_available_genres(self) -> List[str]:
+    def get_available_genres(self) -> Tuple[str, ...]:
         """
         Get the list of available predefined genres.
         
         Returns:
-            List[str]: List of available genres
+            Tuple[str, ...]: Available genres, shared and immutable
         """
         if self.categorizer:
             return self.categorizer.get_available_genres()
         else:
             # Fallback genre list
-            return [
-                "Fiction", "Non-Fiction", "Mystery", "Science Fiction", 
-                "Fantasy", "Romance", "Thriller", "Biography", "History", 
-                "Self-Help", "Business", "Technology", "Art", "Poetry", "Drama"
-            ]
\ No newline at end of file
+            return FALLBACK_GENRES
+
+
+class BatchedDetector(MicroBatcher):
+    """
+    Coalesce concurrent detection requests into batched YOLO forward passes.
+    
+    Requests are queued and a background worker runs up to ``max_batch``
+    images through the model at once, waiting at most ``max_wait_ms`` for
+    the batch to fill. Cropping and Vision analysis still run per image.
+    """
+
+    def __init__(self, detector: BookSpineDetector, max_batch: int = MAX_BATCH, max_wait_ms: float = MAX_WAIT_MS):
+        """
+        Args:
+            detector (BookSpineDetector): Detector to run batches on
+            max_batch (int): Maximum number of images per forward pass
+            max_wait_ms (float): Maximum time to wait for a batch to fill
+        """
+        super().__init__(max_batch, max_wait_ms)
+        self.detector = detector
+
+    async def submit(self, image: np.ndarray) -> List[Dict]:
+        """
+        Queue an image for detection and wait for its books.
+        
+        Args:
+            image (np.ndarray): Input image
+            
+        Returns:
+            List[Dict]: Same result as BookSpineDetector.detect_books
+        """
+        if self.detector.model is None:
+            return self.detector.detect_books(image)
+        
+        return await self._enqueue(image)
+
+    async def _run_batch(self, batch: List[Tuple[np.ndarray, asyncio.Future]]):
+        """Run a batch of images through YOLO in one forward pass"""
+        images = [image for image, _ in batch]
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(None, self.detector.predict_batch, images)
+        except Exception as e:
+            print(f"❌ Batched YOLO inference failed: {e}")
+            self._fail(batch, e)
+            return
+        
+        # Post-process each image independently so the next batch can start
+        for (image, future), result in zip(batch, results):
+            self._spawn(self._finish(image, result, future))
+
+    async def _finish(self, image: np.ndarray, result, future: asyncio.Future):
+        """Run per-image post-processing and resolve the caller's future"""
+        try:
+            books = await self.detector.aprocess_detections(image, result)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(books)
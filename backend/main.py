@@ -1,7 +1,9 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse
+from contextlib import asynccontextmanager
+import asyncio
 import os
 from pathlib import Path
 import uvicorn
@@ -12,13 +14,42 @@ current_dir = Path(__file__).parent.parent  # Go up to project root
 env_path = current_dir / ".env"
 load_dotenv(env_path)
 
+# Import API routes
+try:
+    from api.upload import router as upload_router
+    from api.analyze import router as analyze_router, lifespan as analyze_lifespan
+    from api.recommend import router as recommend_router, prewarm_cold_start_recommendations
+    from api.metadata import router as metadata_router
+    from utils.disk_cache import close_caches
+except ImportError:
+    # If running from project root, try relative imports
+    from backend.api.upload import router as upload_router
+    from backend.api.analyze import router as analyze_router, lifespan as analyze_lifespan
+    from backend.api.recommend import router as recommend_router, prewarm_cold_start_recommendations
+    from backend.api.metadata import router as metadata_router
+    from backend.utils.disk_cache import close_caches
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the detector, then prewarm recommendations without blocking startup"""
+    try:
+        async with analyze_lifespan(app):
+            prewarm_task = asyncio.create_task(prewarm_cold_start_recommendations())
+            yield
+            prewarm_task.cancel()
+    finally:
+        # Persist the metadata, category, Vision and recommendation caches
+        close_caches()
+
 # Create FastAPI app
 app = FastAPI(
     title="BookSpine Detector API",
     description="AI-powered book spine detection and analysis system",
     version="1.0.0",
     docs_url="/api/docs",
-    redoc_url="/api/redoc"
+    redoc_url="/api/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS middleware for frontend communication
@@ -31,51 +62,52 @@ app.add_middleware(
 )
 
 # Create necessary directories
-project_root = Path(__file__).parent.parent
-Path(project_root / "static/uploads").mkdir(parents=True, exist_ok=True)
-Path(project_root / "static/crops").mkdir(parents=True, exist_ok=True)
-Path(project_root / "static/results").mkdir(parents=True, exist_ok=True)
+project_root = current_dir
+static_dir = project_root / "static"
+frontend_dir = project_root / "frontend"
+(static_dir / "uploads").mkdir(parents=True, exist_ok=True)
+(static_dir / "crops").mkdir(parents=True, exist_ok=True)
+(static_dir / "results").mkdir(parents=True, exist_ok=True)
 
 # Mount static files
-static_dir = Path(__file__).parent.parent / "static"
 app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
 
 # Mount frontend files
-frontend_dir = Path(__file__).parent.parent / "frontend"
 app.mount("/frontend", StaticFiles(directory=str(frontend_dir)), name="frontend")
 
+def _read_page(path: Path):
+    """Read an HTML page once at startup, or None if it doesn't exist"""
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+# HTML pages served as-is, read once instead of on every request
+INDEX_HTML = _read_page(frontend_dir / "index.html")
+TEST_HTML = _read_page(project_root / "test_upload.html")
+
+# Let browsers reuse the pages for a few minutes
+PAGE_HEADERS = {"Cache-Control": "public, max-age=300"}
+
 @app.get("/", response_class=HTMLResponse)
 async def read_root():
     """Serve the main frontend page"""
-    frontend_path = project_root / "frontend" / "index.html"
-    with open(frontend_path, "r", encoding="utf-8") as f:
-        return HTMLResponse(content=f.read())
+    if INDEX_HTML is None:
+        raise HTTPException(status_code=404, detail="Frontend not found")
+    return HTMLResponse(content=INDEX_HTML, headers=PAGE_HEADERS)
 
 @app.get("/test", response_class=HTMLResponse)
 async def test_upload():
     """Serve the test upload page"""
-    test_path = project_root / "test_upload.html"
-    with open(test_path, "r", encoding="utf-8") as f:
-        return HTMLResponse(content=f.read())
+    if TEST_HTML is None:
+        raise HTTPException(status_code=404, detail="Test page not found")
+    return HTMLResponse(content=TEST_HTML, headers=PAGE_HEADERS)
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "message": "BookSpine Detector API is running"}
 
-# Import API routes
-try:
-    from api.upload import router as upload_router
-    from api.analyze import router as analyze_router
-    from api.recommend import router as recommend_router
-    from api.metadata import router as metadata_router
-except ImportError:
-    # If running from project root, try relative imports
-    from backend.api.upload import router as upload_router
-    from backend.api.analyze import router as analyze_router
-    from backend.api.recommend import router as recommend_router
-    from backend.api.metadata import router as metadata_router
-
 # Include routers
 app.include_router(upload_router, prefix="/api/upload", tags=["upload"])
 app.include_router(analyze_router, prefix="/api/analyze", tags=["analyze"])
@@ -6,20 +6,65 @@ This service categorizes books into genres using OpenAI's text analysis capabili
 
 import openai
 import os
+import json
+import orjson
+import re
+import asyncio
+from collections import Counter
 from typing import List, Dict, Optional, Tuple
 from pathlib import Path
 from dotenv import load_dotenv
 import logging
 
+try:
+    from utils.disk_cache import DiskCache, cache_key
+except ImportError:
+    from backend.utils.disk_cache import DiskCache, cache_key
+
 # Load environment variables
 current_dir = Path(__file__).parent.parent.parent
 env_path = current_dir / ".env"
 load_dotenv(env_path)
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Handlers and levels are configured by the application, not at import
 logger = logging.getLogger(__name__)
 
+# Number of books categorized per OpenAI request
+CATEGORIZE_BATCH_SIZE = 25
+
+# Maximum number of batches categorized concurrently by acategorize_books
+CATEGORIZE_MAX_CONCURRENCY = 8
+
+# Attempts per batch on rate limits and timeouts, with exponential backoff
+CATEGORIZE_MAX_RETRIES = 3
+
+# Title keywords for the fallback categorization; earlier genres win
+FALLBACK_GENRE_KEYWORDS = (
+    ('Mystery', ('mystery', 'murder', 'detective', 'crime')),
+    ('Romance', ('love', 'romance', 'heart')),
+    ('Science Fiction', ('space', 'future', 'robot', 'alien', 'sci-fi')),
+    ('Fantasy', ('magic', 'dragon', 'fantasy', 'wizard')),
+    ('History', ('history', 'historical', 'war', 'battle')),
+    ('Business', ('business', 'management', 'entrepreneur')),
+    ('Technology', ('programming', 'code', 'software', 'tech')),
+    ('Self-Help', ('self-help', 'success', 'motivation', 'habits')),
+    ('Biography', ('biography', 'life of', 'memoir')),
+    ('Poetry', ('poetry', 'poems', 'verse')),
+    ('Art', ('art', 'painting', 'design')),
+    ('Drama', ('drama', 'play', 'theater'))
+)
+
+# Position in FALLBACK_GENRE_KEYWORDS of each keyword's genre
+FALLBACK_KEYWORD_RANKS = {
+    word: rank for rank, (_, words) in enumerate(FALLBACK_GENRE_KEYWORDS) for word in words
+}
+
+# Every keyword in one pass over a title; the lookahead reports the
+# earliest-ranked keyword starting at each position, overlaps included
+FALLBACK_KEYWORD_PATTERN = re.compile(
+    "(?=(" + "|".join(re.escape(word) for _, words in FALLBACK_GENRE_KEYWORDS for word in words) + "))"
+)
+
 class BookCategorizer:
     def __init__(self, openai_api_key: str):
         """
@@ -44,15 +89,33 @@ class BookCategorizer:
             self.openai_client = openai.OpenAI(api_key=openai_api_key, http_client=http_client)
             logger.info("✅ BookCategorizer initialized successfully")
         except Exception as e:
-            logger.error(f"❌ Failed to initialize BookCategorizer: {e}")
+            logger.error("❌ Failed to initialize BookCategorizer: %s", e)
             self.openai_client = None
         
+        # Async client for categorizing several batches at once
+        try:
+            import httpx
+            self.async_openai_client = openai.AsyncOpenAI(
+                api_key=openai_api_key,
+                http_client=httpx.AsyncClient(
+                    timeout=30.0,
+                    limits=httpx.Limits(max_keepalive_connections=CATEGORIZE_MAX_CONCURRENCY, max_connections=2 * CATEGORIZE_MAX_CONCURRENCY)
+                )
+            )
+        except Exception as e:
+            logger.warning("⚠️  Async OpenAI client unavailable, categorizing batches one at a time: %s", e)
+            self.async_openai_client = None
+        self._batch_semaphore = asyncio.Semaphore(CATEGORIZE_MAX_CONCURRENCY)
+        
+        # Mapped genre by (title, author), kept across restarts
+        self._genre_cache = DiskCache("categories")
+        
         # Predefined genre list that matches the frontend
-        self.predefined_genres = [
+        self.predefined_genres = (
             "Fiction", "Non-Fiction", "Mystery", "Science Fiction", 
             "Fantasy", "Romance", "Thriller", "Biography", "History", 
             "Self-Help", "Business", "Technology", "Art", "Poetry", "Drama"
-        ]
+        )
         
         # Genre mapping from OpenAI categories to predefined genres
         self.genre_mapping = {
@@ -114,65 +177,253 @@ class BookCategorizer:
             "theater": "Drama",
             "theatre": "Drama"
         }
+        
+        # Predefined genre by its lowercase name, for exact matches
+        self._predefined_by_lower = {genre.lower(): genre for genre in self.predefined_genres}
+        self._predefined_genres_text = ', '.join(self.predefined_genres)
+        self._predefined_genre_set = frozenset(self.predefined_genres)
+        
+        # Structured output schema restricting each answer to a predefined genre
+        self._batch_response_format = {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "book_genres",
+                "strict": True,
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "genres": {
+                            "type": "array",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "idx": {"type": "integer"},
+                                    "genre": {"type": "string", "enum": list(self.predefined_genres)}
+                                },
+                                "required": ["idx", "genre"],
+                                "additionalProperties": False
+                            }
+                        }
+                    },
+                    "required": ["genres"],
+                    "additionalProperties": False
+                }
+            }
+        }
+        
+        # Single pass over a response for every mapping key. The lookahead
+        # reports the earliest listed key starting at each position, and the
+        # earliest listed key overall wins, same as checking them in order
+        self._genre_mapping_priority = {key: i for i, key in enumerate(self.genre_mapping)}
+        self._genre_mapping_pattern = re.compile(
+            "(?=(" + "|".join(map(re.escape, self.genre_mapping)) + "))"
+        )
 
     def categorize_books(self, books: List[Dict]) -> List[Dict]:
         """
         Categorize a list of books using OpenAI API.
         
+        The genre fields are set on the given book dicts. Books with the same
+        title and author are categorized once.
+        
         Args:
             books (List[Dict]): List of book dictionaries with title and author
             
         Returns:
-            List[Dict]: List of books with added genre information
+            List[Dict]: The same books with added genre information
         """
         if not self.openai_client:
             logger.error("OpenAI client not initialized")
             return self._add_default_genres(books)
         
-        categorized_books = []
+        unique_books, duplicates = self._dedupe_books(books)
+        for batch in self._batches(unique_books):
+            try:
+                genres, error = self._categorize_batch(batch), None
+            except Exception as e:
+                logger.error("Error categorizing batch of %d books: %s", len(batch), e)
+                genres, error = [None] * len(batch), str(e)
+            self._set_genres(batch, genres, error)
+        
+        self._copy_genres(duplicates)
+        return books
+
+    async def acategorize_books(self, books: List[Dict]) -> List[Dict]:
+        """
+        Categorize a list of books using the async OpenAI client.
         
-        for book in books:
+        All batches are sent concurrently, at most CATEGORIZE_MAX_CONCURRENCY
+        at a time, so a long list takes about as long as its slowest batch.
+        Falls back to categorize_books in the default executor when the async
+        client is unavailable. The genre fields are set on the given book dicts,
+        and books with the same title and author are categorized once.
+        
+        Args:
+            books (List[Dict]): List of book dictionaries with title and author
+            
+        Returns:
+            List[Dict]: The same books with added genre information
+        """
+        if not self.async_openai_client:
+            return await asyncio.get_running_loop().run_in_executor(None, self.categorize_books, books)
+        
+        async def categorize(batch: List[Dict]) -> None:
             try:
-                genre = self._categorize_single_book(book)
-                book_with_genre = book.copy()
-                book_with_genre['genre'] = genre
-                book_with_genre['genre_confidence'] = 'high'  # Could be enhanced with confidence scoring
-                categorized_books.append(book_with_genre)
+                async with self._batch_semaphore:
+                    genres, error = await self._acategorize_batch(batch), None
             except Exception as e:
-                logger.error(f"Error categorizing book {book.get('title', 'Unknown')}: {e}")
+                logger.error("Error categorizing batch of %d books: %s", len(batch), e)
+                genres, error = [None] * len(batch), str(e)
+            self._set_genres(batch, genres, error)
+        
+        unique_books, duplicates = self._dedupe_books(books)
+        await asyncio.gather(*(categorize(batch) for batch in self._batches(unique_books)))
+        self._copy_genres(duplicates)
+        return books
+
+    def _dedupe_books(self, books: List[Dict]) -> Tuple[List[Dict], List[Tuple[Dict, Dict]]]:
+        """
+        Separate repeated (title, author) pairs from the books to categorize.
+        
+        Args:
+            books (List[Dict]): List of book dictionaries with title and author
+            
+        Returns:
+            Tuple[List[Dict], List[Tuple[Dict, Dict]]]: First book of each pair,
+                and (duplicate, first book) for every repeat
+        """
+        first_by_key = {}
+        unique_books, duplicates = [], []
+        for book in books:
+            key = cache_key(book.get('title', ''), book.get('author', ''))
+            first = first_by_key.setdefault(key, book)
+            if first is book:
+                unique_books.append(book)
+            else:
+                duplicates.append((book, first))
+        return unique_books, duplicates
+
+    def _copy_genres(self, duplicates: List[Tuple[Dict, Dict]]) -> None:
+        """Give each duplicate the genre fields of the book it repeats"""
+        for book, first in duplicates:
+            for field in ('genre', 'genre_confidence', 'genre_error'):
+                if field in first:
+                    book[field] = first[field]
+
+    def _batches(self, books: List[Dict]) -> List[List[Dict]]:
+        """Split books into slices of CATEGORIZE_BATCH_SIZE"""
+        return [books[start:start + CATEGORIZE_BATCH_SIZE] for start in range(0, len(books), CATEGORIZE_BATCH_SIZE)]
+
+    def _set_genres(self, batch: List[Dict], genres: List[Optional[str]], error: Optional[str]) -> None:
+        """
+        Attach categorized genres to the books of a batch, in place.
+        
+        Args:
+            batch (List[Dict]): Books of the batch
+            genres (List[Optional[str]]): Genre of each book, None if the batch failed
+            error (Optional[str]): Error message of a failed batch
+        """
+        for book, genre in zip(batch, genres):
+            if genre is not None:
+                book['genre'] = genre
+                book['genre_confidence'] = 'high'  # Could be enhanced with confidence scoring
+            else:
                 # Add default genre on error
-                book_with_genre = book.copy()
-                book_with_genre['genre'] = 'Fiction'  # Default fallback
-                book_with_genre['genre_confidence'] = 'low'
-                book_with_genre['genre_error'] = str(e)
-                categorized_books.append(book_with_genre)
+                book['genre'] = 'Fiction'  # Default fallback
+                book['genre_confidence'] = 'low'
+                book['genre_error'] = error
+
+    def _categorize_batch(self, books: List[Dict]) -> List[str]:
+        """
+        Categorize several books with a single OpenAI request.
         
-        return categorized_books
+        The genre list and instructions are sent once for the whole batch;
+        the model answers with a JSON object mapping each book's index to
+        its genre.
+        
+        Args:
+            books (List[Dict]): Book dictionaries with title and author
+            
+        Returns:
+            List[str]: Categorized genre for each book, in input order
+        """
+        pending = self._pending_books(books)
+        if not pending:
+            return self._assign_genres(books, pending, {})
+        
+        try:
+            response = self.openai_client.chat.completions.create(**self._batch_request(pending))
+            answered = self._parse_batch_response(response)
+        except Exception as e:
+            self._log_api_error(e, f"batch of {len(pending)} books")
+            answered = {}
+        
+        return self._assign_genres(books, pending, answered)
 
-    def _categorize_single_book(self, book: Dict) -> str:
+    async def _acategorize_batch(self, books: List[Dict]) -> List[str]:
         """
-        Categorize a single book using OpenAI API.
+        Categorize several books with a single async OpenAI request.
+        
+        Rate limits and timeouts are retried with exponential backoff, up to
+        CATEGORIZE_MAX_RETRIES attempts.
         
         Args:
-            book (Dict): Book dictionary with title and author
+            books (List[Dict]): Book dictionaries with title and author
             
         Returns:
-            str: Categorized genre
+            List[str]: Categorized genre for each book, in input order
         """
-        title = book.get('title', '')
-        author = book.get('author', '')
+        pending = self._pending_books(books)
+        if not pending:
+            return self._assign_genres(books, pending, {})
         
-        if not title:
-            return 'Fiction'  # Default fallback
+        request = self._batch_request(pending)
+        answered = {}
+        for attempt in range(CATEGORIZE_MAX_RETRIES):
+            try:
+                response = await self.async_openai_client.chat.completions.create(**request)
+                answered = self._parse_batch_response(response)
+                break
+            except (openai.RateLimitError, openai.APITimeoutError) as e:
+                if attempt == CATEGORIZE_MAX_RETRIES - 1:
+                    self._log_api_error(e, f"batch of {len(pending)} books")
+                    break
+                delay = 2 ** attempt
+                logger.warning("OpenAI API %s, retrying batch in %ss", type(e).__name__, delay)
+                await asyncio.sleep(delay)
+            except Exception as e:
+                self._log_api_error(e, f"batch of {len(pending)} books")
+                break
         
+        return self._assign_genres(books, pending, answered)
+
+    def _pending_books(self, books: List[Dict]) -> List[Dict]:
+        """Indexed title and author of the books that still need to be sent to OpenAI"""
+        pending = []
+        for idx, book in enumerate(books):
+            title, author = book.get('title', ''), book.get('author', '')
+            if title and self._genre_cache.get(cache_key(title, author)) is None:
+                pending.append({"idx": idx, "title": title, "author": author})
+        return pending
+
+    def _batch_request(self, pending: List[Dict]) -> Dict:
+        """
+        Build the chat completion request for a batch of books.
+        
+        Args:
+            pending (List[Dict]): Indexed books from _pending_books
+            
+        Returns:
+            Dict: Keyword arguments for chat.completions.create
+        """
         # Create prompt for genre categorization
-        prompt = f"""Analyze the following book and determine its most appropriate genre from the predefined list.
+        prompt = f"""Analyze the following books and determine the most appropriate genre of each from the predefined list.
 
-Book Title: "{title}"
-Author: "{author}"
+Books (JSON):
+{json.dumps(pending, ensure_ascii=False)}
 
-Please categorize this book into ONE of the following genres:
-{', '.join(self.predefined_genres)}
+Categorize each book into ONE of the following genres:
+{self._predefined_genres_text}
 
 Consider the following factors:
 1. The book's title and any genre indicators
@@ -180,59 +431,111 @@ Consider the following factors:
 3. Common genre patterns in book titles
 4. The most likely primary genre for this book
 
-Respond with ONLY the genre name from the list above, nothing else."""
+Respond with a JSON object of the form {{"genres": [{{"idx": 0, "genre": "Mystery"}}, ...]}} containing one entry per book, using only genre names from the list above."""
 
-        try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a book categorization expert. Analyze books and assign them to the most appropriate genre from a predefined list. Always respond with only the genre name."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                max_tokens=50,
-                temperature=0.1,
-                timeout=30  # 30 second timeout
-            )
+        return {
+            "model": "gpt-4o-mini",
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "You are a book categorization expert. Analyze books and assign each to the most appropriate genre from a predefined list. Always respond with JSON."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            "response_format": self._batch_response_format,
+            "max_tokens": 20 * len(pending) + 50,
+            "temperature": 0.1,
+            "timeout": 30  # 30 second timeout
+        }
+
+    def _parse_batch_response(self, response) -> Dict[int, str]:
+        """
+        Extract the genre answered for each book index.
+        
+        Args:
+            response: Chat completion returned by the batch request
             
-            # Extract genre from response
-            if hasattr(response, 'choices') and len(response.choices) > 0:
-                if hasattr(response.choices[0], 'message'):
-                    genre_response = response.choices[0].message.content.strip()
-                else:
-                    genre_response = response.choices[0].text.strip()
+        Returns:
+            Dict[int, str]: Raw genre response by book index
+        """
+        # Extract genres from response
+        if hasattr(response, 'choices') and len(response.choices) > 0:
+            if hasattr(response.choices[0], 'message'):
+                genre_response = response.choices[0].message.content
             else:
-                logger.error("Unexpected response format from OpenAI")
-                return 'Fiction'
-            
-            # Validate and map the response
-            genre = self._validate_and_map_genre(genre_response)
-            logger.info(f"Categorized '{title}' as '{genre}'")
-            return genre
+                genre_response = response.choices[0].text
+        else:
+            logger.error("Unexpected response format from OpenAI")
+            return {}
+        
+        answered = {}
+        for entry in orjson.loads(genre_response).get('genres', []):
+            if isinstance(entry, dict) and isinstance(entry.get('genre'), str):
+                answered[entry.get('idx')] = entry['genre']
+        return answered
+
+    def _assign_genres(self, books: List[Dict], pending: List[Dict], answered: Dict[int, str]) -> List[str]:
+        """
+        Map a batch's answers back to its books, caching the answered genres.
+        
+        Args:
+            books (List[Dict]): Books of the batch
+            pending (List[Dict]): Indexed books that were sent to OpenAI; the
+                others are answered from the cache
+            answered (Dict[int, str]): Raw genre response by book index
             
-        except Exception as e:
-            error_type = type(e).__name__
-            logger.error(f"OpenAI API error for book '{title}': {error_type} - {e}")
+        Returns:
+            List[str]: Genre for each book, in input order
+        """
+        pending_indices = {item['idx'] for item in pending}
+        genres = []
+        for idx, book in enumerate(books):
+            title, author = book.get('title', ''), book.get('author', '')
+            if not title:
+                genres.append('Fiction')  # Default fallback for untitled books
+                continue
             
-            # Handle specific error types
-            if "timeout" in str(e).lower():
-                logger.warning(f"OpenAI API timeout for book '{title}', using fallback categorization")
-            elif "rate_limit" in str(e).lower():
-                logger.warning(f"OpenAI API rate limit for book '{title}', using fallback categorization")
-            elif "authentication" in str(e).lower() or "unauthorized" in str(e).lower():
-                logger.error(f"OpenAI API authentication error for book '{title}', using fallback categorization")
-            elif "quota" in str(e).lower():
-                logger.error(f"OpenAI API quota exceeded for book '{title}', using fallback categorization")
+            key = cache_key(title, author)
+            if idx in pending_indices and idx in answered:
+                # The schema restricts answers to predefined genres; map anything else
+                genre = answered[idx]
+                if genre not in self._predefined_genre_set:
+                    genre = self._validate_and_map_genre(genre)
+                self._genre_cache.set(key, genre)
+                logger.info("Categorized %r as %r", title, genre)
+            elif idx in pending_indices:
+                # Fallback to title-based categorization
+                genre = self._fallback_categorization(title, author)
             else:
-                logger.error(f"Unknown OpenAI API error for book '{title}': {e}")
-            
-            # Fallback to title-based categorization
-            return self._fallback_categorization(title, author)
+                genre = self._genre_cache.get(key) or self._fallback_categorization(title, author)
+            genres.append(genre)
+        return genres
+
+    def _log_api_error(self, e: Exception, subject: str):
+        """
+        Log an OpenAI API error with a hint about its cause.
+        
+        Args:
+            e (Exception): Error raised by the OpenAI client
+            subject (str): What was being categorized, for the log message
+        """
+        error_type = type(e).__name__
+        logger.error("OpenAI API error for %s: %s - %s", subject, error_type, e)
+        
+        # Handle specific error types
+        if "timeout" in str(e).lower():
+            logger.warning("OpenAI API timeout for %s, using fallback categorization", subject)
+        elif "rate_limit" in str(e).lower():
+            logger.warning("OpenAI API rate limit for %s, using fallback categorization", subject)
+        elif "authentication" in str(e).lower() or "unauthorized" in str(e).lower():
+            logger.error("OpenAI API authentication error for %s, using fallback categorization", subject)
+        elif "quota" in str(e).lower():
+            logger.error("OpenAI API quota exceeded for %s, using fallback categorization", subject)
+        else:
+            logger.error("Unknown OpenAI API error for %s: %s", subject, e)
 
     def _validate_and_map_genre(self, genre_response: str) -> str:
         """
@@ -248,17 +551,17 @@ Respond with ONLY the genre name from the list above, nothing else."""
         genre_clean = genre_response.lower().strip()
         
         # Check if it's already in our predefined list
-        for predefined_genre in self.predefined_genres:
-            if predefined_genre.lower() == genre_clean:
-                return predefined_genre
+        predefined_genre = self._predefined_by_lower.get(genre_clean)
+        if predefined_genre:
+            return predefined_genre
         
-        # Check if it matches any of our mapping keys
-        for openai_genre, mapped_genre in self.genre_mapping.items():
-            if openai_genre in genre_clean:
-                return mapped_genre
+        # Check if it contains any of our mapping keys
+        found = {match.group(1) for match in self._genre_mapping_pattern.finditer(genre_clean)}
+        if found:
+            return self.genre_mapping[min(found, key=self._genre_mapping_priority.get)]
         
         # If no match found, return default
-        logger.warning(f"Could not map genre response '{genre_response}' to predefined genres")
+        logger.warning("Could not map genre response %r to predefined genres", genre_response)
         return 'Fiction'
 
     def _fallback_categorization(self, title: str, author: str) -> str:
@@ -272,35 +575,12 @@ Respond with ONLY the genre name from the list above, nothing else."""
         Returns:
             str: Fallback genre
         """
-        title_lower = title.lower()
-        
         # Keyword-based categorization
-        if any(word in title_lower for word in ['mystery', 'murder', 'detective', 'crime']):
-            return 'Mystery'
-        elif any(word in title_lower for word in ['love', 'romance', 'heart']):
-            return 'Romance'
-        elif any(word in title_lower for word in ['space', 'future', 'robot', 'alien', 'sci-fi']):
-            return 'Science Fiction'
-        elif any(word in title_lower for word in ['magic', 'dragon', 'fantasy', 'wizard']):
-            return 'Fantasy'
-        elif any(word in title_lower for word in ['history', 'historical', 'war', 'battle']):
-            return 'History'
-        elif any(word in title_lower for word in ['business', 'management', 'entrepreneur']):
-            return 'Business'
-        elif any(word in title_lower for word in ['programming', 'code', 'software', 'tech']):
-            return 'Technology'
-        elif any(word in title_lower for word in ['self-help', 'success', 'motivation', 'habits']):
-            return 'Self-Help'
-        elif any(word in title_lower for word in ['biography', 'life of', 'memoir']):
-            return 'Biography'
-        elif any(word in title_lower for word in ['poetry', 'poems', 'verse']):
-            return 'Poetry'
-        elif any(word in title_lower for word in ['art', 'painting', 'design']):
-            return 'Art'
-        elif any(word in title_lower for word in ['drama', 'play', 'theater']):
-            return 'Drama'
-        else:
-            return 'Fiction'  # Default fallback
+        ranks = [FALLBACK_KEYWORD_RANKS[match.group(1)] for match in FALLBACK_KEYWORD_PATTERN.finditer(title.lower())]
+        if ranks:
+            return FALLBACK_GENRE_KEYWORDS[min(ranks)][0]
+        
+        return 'Fiction'  # Default fallback
 
     def _add_default_genres(self, books: List[Dict]) -> List[Dict]:
         """
@@ -329,19 +609,13 @@ Respond with ONLY the genre name from the list above, nothing else."""
         Returns:
             Dict[str, int]: Genre statistics
         """
-        stats = {}
-        
-        for book in books:
-            genre = book.get('genre', 'Unknown')
-            stats[genre] = stats.get(genre, 0) + 1
-        
-        return stats
+        return dict(Counter(book.get('genre', 'Unknown') for book in books))
 
-    def get_available_genres(self) -> List[str]:
+    def get_available_genres(self) -> Tuple[str, ...]:
         """
         Get the list of available predefined genres.
         
         Returns:
-            List[str]: List of available genres
+            Tuple[str, ...]: Available genres, shared and immutable
         """
-        return self.predefined_genres.copy()
+        return self.predefined_genres
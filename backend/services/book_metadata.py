@@ -4,189 +4,319 @@ Book Metadata Service
 Fetches book covers, ratings, and additional metadata from various APIs
 """
 
-import requests
-import json
-import time
+import httpx
+import asyncio
+import orjson
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 import logging
 from urllib.parse import quote
 import os
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+try:
+    from utils.disk_cache import DiskCache, cache_key
+    from utils.rate_limit import AsyncRateLimiter
+except ImportError:
+    from backend.utils.disk_cache import DiskCache, cache_key
+    from backend.utils.rate_limit import AsyncRateLimiter
+
+# Handlers and levels are configured by the application, not at import
 logger = logging.getLogger(__name__)
 
+# How long fetched metadata is reused before asking the APIs again
+METADATA_CACHE_TTL = 30 * 24 * 60 * 60
+
+# Result field for each Google Books identifier type
+ISBN_IDENTIFIER_FIELDS = {'ISBN_10': 'isbn_10', 'ISBN_13': 'isbn_13'}
+
+# Result field for each Open Library ISBN length
+ISBN_LENGTH_FIELDS = {10: 'isbn_10', 13: 'isbn_13'}
+
+# Google Books cover sizes, largest first
+COVER_SIZES = ('large', 'medium', 'small', 'thumbnail')
+
+# ISBNs combined into one Google Books query, its maximum page size
+GOOGLE_BOOKS_BULK_SIZE = 40
+
 class BookMetadataService:
     def __init__(self):
         """Initialize the Book Metadata Service"""
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        }
+        
+        # Pooled client for the sync path, keeping connections to both APIs open
+        self.client = httpx.Client(
+            headers=self.headers,
+            timeout=10,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20)
+        )
         
         # API endpoints
         self.google_books_api = "https://www.googleapis.com/books/v1/volumes"
         self.open_library_api = "https://openlibrary.org/search.json"
         self.open_library_covers = "https://covers.openlibrary.org/b"
         
-        # Rate limiting
-        self.last_request_time = 0
-        self.min_request_interval = 0.1  # 100ms between requests
-        
-    def _rate_limit(self):
-        """Implement rate limiting to be respectful to APIs"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.min_request_interval:
-            time.sleep(self.min_request_interval - time_since_last)
-        self.last_request_time = time.time()
+        # Maximum number of books looked up at once on the async path
+        self.max_concurrency = 10
+        
+        # Runs the Google Books and Open Library searches of sync lookups side by side
+        self._executor = ThreadPoolExecutor(max_workers=2 * self.max_concurrency, thread_name_prefix="metadata")
+        
+        # Requests per second across all async lookups
+        self._async_rate_limiter = AsyncRateLimiter(10, period=1.0)
+        
+        # Pooled client for the async path, created on first use
+        self._async_client: Optional[httpx.AsyncClient] = None
+        
+        # Merged metadata by (title, author), kept across restarts
+        self._cache = DiskCache("metadata", ttl=METADATA_CACHE_TTL)
+    
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """Get the pooled client shared by all async lookups"""
+        if self._async_client is None or self._async_client.is_closed:
+            self._async_client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=10,
+                limits=httpx.Limits(max_connections=20)
+            )
+        return self._async_client
+    
+    def _google_books_params(self, title: str, author: str = None) -> Dict:
+        """Build the Google Books search query parameters"""
+        query_parts = [title]
+        if author:
+            query_parts.append(f"inauthor:{author}")
+        
+        query = "+".join(query_parts)
+        return {
+            'q': query,
+            'maxResults': 5,
+            'printType': 'books'
+        }
+    
+    def _parse_google_books(self, data: Dict, title: str, author: str = None) -> Optional[Dict]:
+        """Extract book metadata from a Google Books search response"""
+        if data.get('totalItems', 0) > 0:
+            # Return the first (most relevant) result
+            book = data['items'][0]['volumeInfo']
+            
+            # Extract relevant information
+            result = {
+                'title': book.get('title', title),
+                'authors': book.get('authors', [author] if author else []),
+                'published_date': book.get('publishedDate', ''),
+                'description': book.get('description', ''),
+                'page_count': book.get('pageCount', 0),
+                'categories': book.get('categories', []),
+                'language': book.get('language', 'en'),
+                'isbn_10': None,
+                'isbn_13': None,
+                'google_books_id': data['items'][0]['id']
+            }
+            
+            # Extract ISBNs
+            for identifier in book.get('industryIdentifiers', ()):
+                field = ISBN_IDENTIFIER_FIELDS.get(identifier['type'])
+                if field:
+                    result[field] = identifier['identifier']
+            
+            # Get cover image
+            image_links = book.get('imageLinks', {})
+            if image_links:
+                # Try to get the largest available cover
+                cover_url = next((url for size in COVER_SIZES if (url := image_links.get(size))), None)
+                if cover_url:
+                    result['cover_url'] = cover_url
+            
+            # Get average rating
+            if 'averageRating' in book:
+                result['average_rating'] = book['averageRating']
+                result['ratings_count'] = book.get('ratingsCount', 0)
+            
+            logger.info("✅ Found Google Books data for: %s", title)
+            return result
+        
+        return None
     
     def search_google_books(self, title: str, author: str = None) -> Optional[Dict]:
         """Search Google Books API for book metadata"""
         try:
-            self._rate_limit()
-            
-            # Construct search query
-            query_parts = [title]
-            if author:
-                query_parts.append(f"inauthor:{author}")
+            params = self._google_books_params(title, author)
+            response = self.client.get(self.google_books_api, params=params)
+            response.raise_for_status()
             
-            query = "+".join(query_parts)
-            params = {
-                'q': query,
-                'maxResults': 5,
-                'printType': 'books'
-            }
+            return self._parse_google_books(orjson.loads(response.content), title, author)
+        
+        except Exception as e:
+            logger.warning("⚠️ Google Books API error for %r: %s", title, e)
+        
+        return None
+    
+    async def asearch_google_books(self, client: httpx.AsyncClient, title: str, author: str = None) -> Optional[Dict]:
+        """Search Google Books API for book metadata using an async client"""
+        try:
+            await self._async_rate_limiter.acquire()
             
-            response = self.session.get(self.google_books_api, params=params, timeout=10)
+            params = self._google_books_params(title, author)
+            response = await client.get(self.google_books_api, params=params)
             response.raise_for_status()
             
-            data = response.json()
-            if data.get('totalItems', 0) > 0:
-                # Return the first (most relevant) result
-                book = data['items'][0]['volumeInfo']
-                
-                # Extract relevant information
-                result = {
-                    'title': book.get('title', title),
-                    'authors': book.get('authors', [author] if author else []),
-                    'published_date': book.get('publishedDate', ''),
-                    'description': book.get('description', ''),
-                    'page_count': book.get('pageCount', 0),
-                    'categories': book.get('categories', []),
-                    'language': book.get('language', 'en'),
-                    'isbn_10': None,
-                    'isbn_13': None,
-                    'google_books_id': data['items'][0]['id']
-                }
-                
-                # Extract ISBNs
-                for identifier in book.get('industryIdentifiers', []):
-                    if identifier['type'] == 'ISBN_10':
-                        result['isbn_10'] = identifier['identifier']
-                    elif identifier['type'] == 'ISBN_13':
-                        result['isbn_13'] = identifier['identifier']
-                
-                # Get cover image
-                image_links = book.get('imageLinks', {})
-                if image_links:
-                    # Try to get the largest available cover
-                    cover_url = (image_links.get('large') or 
-                               image_links.get('medium') or 
-                               image_links.get('small') or 
-                               image_links.get('thumbnail'))
-                    if cover_url:
-                        result['cover_url'] = cover_url
-                
-                # Get average rating
-                if 'averageRating' in book:
-                    result['average_rating'] = book['averageRating']
-                    result['ratings_count'] = book.get('ratingsCount', 0)
-                
-                logger.info(f"✅ Found Google Books data for: {title}")
-                return result
-                
+            return self._parse_google_books(orjson.loads(response.content), title, author)
+        
         except Exception as e:
-            logger.warning(f"⚠️ Google Books API error for '{title}': {e}")
+            logger.warning("⚠️ Google Books API error for %r: %s", title, e)
+        
+        return None
+    
+    def _google_books_bulk_params(self, isbns: List[str]) -> Dict:
+        """Build a Google Books query matching any of the given ISBNs"""
+        return {
+            'q': ' OR '.join(f"isbn:{isbn}" for isbn in isbns),
+            'maxResults': GOOGLE_BOOKS_BULK_SIZE,
+            'printType': 'books'
+        }
+    
+    def _parse_google_books_bulk(self, data: Dict, isbns: List[str]) -> Dict[str, Dict]:
+        """Match the volumes of a bulk ISBN response back to the requested ISBNs"""
+        wanted = set(isbns)
+        found = {}
+        for item in data.get('items', ()):
+            result = self._parse_google_books({'totalItems': 1, 'items': [item]}, item.get('volumeInfo', {}).get('title', ''))
+            for isbn in (result['isbn_10'], result['isbn_13']):
+                if isbn in wanted and isbn not in found:
+                    found[isbn] = result
+        return found
+    
+    def search_google_books_bulk(self, isbns: List[str]) -> Dict[str, Dict]:
+        """
+        Search Google Books for many ISBNs with one request per GOOGLE_BOOKS_BULK_SIZE
+        
+        Args:
+            isbns: ISBN-10 or ISBN-13 numbers without hyphens
+        
+        Returns:
+            Google Books metadata by requested ISBN, for the ISBNs that were found
+        """
+        found = {}
+        for start in range(0, len(isbns), GOOGLE_BOOKS_BULK_SIZE):
+            chunk = isbns[start:start + GOOGLE_BOOKS_BULK_SIZE]
+            try:
+                response = self.client.get(self.google_books_api, params=self._google_books_bulk_params(chunk))
+                response.raise_for_status()
+                found.update(self._parse_google_books_bulk(orjson.loads(response.content), chunk))
+            except Exception as e:
+                logger.warning("⚠️ Google Books API error for %d ISBNs: %s", len(chunk), e)
+        return found
+    
+    async def asearch_google_books_bulk(self, client: httpx.AsyncClient, isbns: List[str]) -> Dict[str, Dict]:
+        """Search Google Books for many ISBNs at once using an async client"""
+        async def search(chunk: List[str]) -> Dict[str, Dict]:
+            try:
+                await self._async_rate_limiter.acquire()
+                response = await client.get(self.google_books_api, params=self._google_books_bulk_params(chunk))
+                response.raise_for_status()
+                return self._parse_google_books_bulk(orjson.loads(response.content), chunk)
+            except Exception as e:
+                logger.warning("⚠️ Google Books API error for %d ISBNs: %s", len(chunk), e)
+                return {}
+        
+        found = {}
+        chunks = [isbns[start:start + GOOGLE_BOOKS_BULK_SIZE] for start in range(0, len(isbns), GOOGLE_BOOKS_BULK_SIZE)]
+        for result in await asyncio.gather(*(search(chunk) for chunk in chunks)):
+            found.update(result)
+        return found
+    
+    def _open_library_params(self, title: str, author: str = None) -> Dict:
+        """Build the Open Library search query parameters"""
+        return {
+            'title': title,
+            'author': author or '',
+            'limit': 5,
+            'fields': 'title,author_name,first_publish_year,isbn,cover_i,ratings_average,ratings_count,subject'
+        }
+    
+    def _parse_open_library(self, data: Dict, title: str, author: str = None) -> Optional[Dict]:
+        """Extract book metadata from an Open Library search response"""
+        if data.get('numFound', 0) > 0:
+            # Return the first result
+            book = data['docs'][0]
+            
+            result = {
+                'title': book.get('title', title),
+                'authors': book.get('author_name', [author] if author else []),
+                'published_date': str(book.get('first_publish_year', '')),
+                'isbn_10': None,
+                'isbn_13': None,
+                'open_library_id': book.get('cover_i'),
+                'subjects': book.get('subject', [])[:5]  # Limit to 5 subjects
+            }
+            
+            # Extract ISBNs
+            for isbn in book.get('isbn', ()):
+                field = ISBN_LENGTH_FIELDS.get(len(isbn))
+                if field:
+                    result[field] = isbn
+            
+            # Get cover image
+            cover_id = book.get('cover_i')
+            if cover_id:
+                result['cover_url'] = f"{self.open_library_covers}/id/{cover_id}-L.jpg"
+            
+            # Get ratings
+            if 'ratings_average' in book:
+                result['average_rating'] = book['ratings_average']
+                result['ratings_count'] = book.get('ratings_count', 0)
+            
+            logger.info("✅ Found Open Library data for: %s", title)
+            return result
         
         return None
     
     def search_open_library(self, title: str, author: str = None) -> Optional[Dict]:
         """Search Open Library API for book metadata"""
         try:
-            self._rate_limit()
-            
-            # Construct search query
-            query_parts = [title]
-            if author:
-                query_parts.append(author)
+            params = self._open_library_params(title, author)
+            response = self.client.get(self.open_library_api, params=params)
+            response.raise_for_status()
             
-            query = " ".join(query_parts)
-            params = {
-                'title': title,
-                'author': author or '',
-                'limit': 5,
-                'fields': 'title,author_name,first_publish_year,isbn,cover_i,ratings_average,ratings_count,subject'
-            }
+            return self._parse_open_library(orjson.loads(response.content), title, author)
+        
+        except Exception as e:
+            logger.warning("⚠️ Open Library API error for %r: %s", title, e)
+        
+        return None
+    
+    async def asearch_open_library(self, client: httpx.AsyncClient, title: str, author: str = None) -> Optional[Dict]:
+        """Search Open Library API for book metadata using an async client"""
+        try:
+            await self._async_rate_limiter.acquire()
             
-            response = self.session.get(self.open_library_api, params=params, timeout=10)
+            params = self._open_library_params(title, author)
+            response = await client.get(self.open_library_api, params=params)
             response.raise_for_status()
             
-            data = response.json()
-            if data.get('numFound', 0) > 0:
-                # Return the first result
-                book = data['docs'][0]
-                
-                result = {
-                    'title': book.get('title', title),
-                    'authors': book.get('author_name', [author] if author else []),
-                    'published_date': str(book.get('first_publish_year', '')),
-                    'isbn_10': None,
-                    'isbn_13': None,
-                    'open_library_id': book.get('cover_i'),
-                    'subjects': book.get('subject', [])[:5]  # Limit to 5 subjects
-                }
-                
-                # Extract ISBNs
-                isbns = book.get('isbn', [])
-                for isbn in isbns:
-                    if len(isbn) == 10:
-                        result['isbn_10'] = isbn
-                    elif len(isbn) == 13:
-                        result['isbn_13'] = isbn
-                
-                # Get cover image
-                cover_id = book.get('cover_i')
-                if cover_id:
-                    result['cover_url'] = f"{self.open_library_covers}/id/{cover_id}-L.jpg"
-                
-                # Get ratings
-                if 'ratings_average' in book:
-                    result['average_rating'] = book['ratings_average']
-                    result['ratings_count'] = book.get('ratings_count', 0)
-                
-                logger.info(f"✅ Found Open Library data for: {title}")
-                return result
-                
+            return self._parse_open_library(orjson.loads(response.content), title, author)
+        
         except Exception as e:
-            logger.warning(f"⚠️ Open Library API error for '{title}': {e}")
+            logger.warning("⚠️ Open Library API error for %r: %s", title, e)
         
         return None
     
-    def get_book_metadata(self, title: str, author: str = None) -> Dict:
+    def _merge_metadata(self, title: str, author: Optional[str], google_data: Optional[Dict], openlib_data: Optional[Dict]) -> Dict:
         """
-        Get comprehensive book metadata from multiple sources
+        Combine Google Books and Open Library results into one metadata dict
         
         Args:
             title (str): Book title
             author (str, optional): Book author
-            
+            google_data (Dict, optional): Google Books result
+            openlib_data (Dict, optional): Open Library result
+        
         Returns:
-            Dict: Combined metadata from all sources
+            Dict: Combined metadata, preferring Google Books on conflicts
         """
-        logger.info(f"🔍 Fetching metadata for: {title} by {author or 'Unknown'}")
-        
         # Start with basic info
         metadata = {
             'title': title,
@@ -205,14 +335,12 @@ class BookMetadataService:
             'source': 'unknown'
         }
         
-        # Try Google Books first (usually better quality)
-        google_data = self.search_google_books(title, author)
+        # Google Books first (usually better quality)
         if google_data:
             metadata.update(google_data)
             metadata['source'] = 'google_books'
         
-        # Try Open Library as backup/supplement
-        openlib_data = self.search_open_library(title, author)
+        # Open Library as backup/supplement
         if openlib_data:
             # Merge data, preferring Google Books for conflicts
             for key, value in openlib_data.items():
@@ -238,39 +366,199 @@ class BookMetadataService:
         if metadata.get('average_rating'):
             metadata['average_rating'] = round(float(metadata['average_rating']), 1)
         
-        logger.info(f"✅ Metadata fetched for: {title} (Source: {metadata['source']})")
+        logger.info("✅ Metadata fetched for: %s (Source: %s)", title, metadata['source'])
+        return metadata
+    
+    def get_book_metadata(self, title: str, author: str = None) -> Dict:
+        """
+        Get comprehensive book metadata from multiple sources
+        
+        Google Books and Open Library are queried at the same time.
+        
+        Args:
+            title (str): Book title
+            author (str, optional): Book author
+        
+        Returns:
+            Dict: Combined metadata from all sources
+        """
+        key = cache_key(title, author)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return dict(cached)
+        
+        logger.info("🔍 Fetching metadata for: %s by %s", title, author or 'Unknown')
+        
+        return self._collect_metadata(key, title, author, self._submit_searches(title, author))
+    
+    def _submit_searches(self, title: str, author: str = None) -> Tuple[Future, Future]:
+        """Start the Google Books and Open Library searches for a book on the thread pool"""
+        return (
+            self._executor.submit(self.search_google_books, title, author),
+            self._executor.submit(self.search_open_library, title, author)
+        )
+    
+    def _collect_metadata(self, key: str, title: str, author: Optional[str], searches: Tuple[Future, Future]) -> Dict:
+        """Wait for a book's searches, then merge and cache their results"""
+        google_future, openlib_future = searches
+        google_data, openlib_data = google_future.result(), openlib_future.result()
+        
+        return self._cache_metadata(key, self._merge_metadata(title, author, google_data, openlib_data),
+                                    google_data or openlib_data)
+    
+    async def aget_book_metadata(self, title: str, author: str = None, client: Optional[httpx.AsyncClient] = None) -> Dict:
+        """
+        Get comprehensive book metadata from multiple sources using an async client
+        
+        Google Books and Open Library are queried at the same time.
+        
+        Args:
+            title (str): Book title
+            author (str, optional): Book author
+            client (httpx.AsyncClient, optional): Client to issue the requests with,
+                defaults to the pooled client
+        
+        Returns:
+            Dict: Combined metadata from all sources
+        """
+        key = cache_key(title, author)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return dict(cached)
+        
+        logger.info("🔍 Fetching metadata for: %s by %s", title, author or 'Unknown')
+        
+        if client is None:
+            client = self._get_async_client()
+        google_data, openlib_data = await asyncio.gather(
+            self.asearch_google_books(client, title, author),
+            self.asearch_open_library(client, title, author)
+        )
+        
+        return self._cache_metadata(key, self._merge_metadata(title, author, google_data, openlib_data),
+                                    google_data or openlib_data)
+    
+    def _cache_metadata(self, key: str, metadata: Dict, found: Optional[Dict]) -> Dict:
+        """Cache merged metadata if either source found the book, and return it"""
+        # Lookups that failed or found nothing are retried next time
+        if found:
+            self._cache.set(key, dict(metadata))
         return metadata
     
+    def _unique_books(self, books: List[Dict]) -> Tuple[Dict[str, Dict], List[str]]:
+        """Get the first book of each (title, author) pair, and each book's cache key"""
+        unique_books = {}
+        keys = []
+        for book in books:
+            key = cache_key(book.get('title', ''), book.get('author', ''))
+            unique_books.setdefault(key, book)
+            keys.append(key)
+        return unique_books, keys
+    
+    def _isbn_lookups(self, unique_books: Dict[str, Dict]) -> Dict[str, str]:
+        """Get the ISBN of each uncached book that has one, by cache key"""
+        lookups = {}
+        for key, book in unique_books.items():
+            isbn = book.get('isbn_13') or book.get('isbn_10') or book.get('isbn')
+            if isbn and self._cache.get(key) is None:
+                lookups[key] = str(isbn).replace('-', '').strip()
+        return lookups
+    
+    def _metadata_from_isbns(self, unique_books: Dict[str, Dict], lookups: Dict[str, str], found: Dict[str, Dict]) -> Dict[str, Dict]:
+        """Merge and cache the bulk ISBN results, by cache key"""
+        metadata_by_key = {}
+        for key, isbn in lookups.items():
+            google_data = found.get(isbn)
+            if google_data:
+                book = unique_books[key]
+                metadata = self._merge_metadata(book.get('title', ''), book.get('author', ''), google_data, None)
+                metadata_by_key[key] = self._cache_metadata(key, metadata, google_data)
+        return metadata_by_key
+    
     def get_multiple_books_metadata(self, books: List[Dict]) -> List[Dict]:
         """
         Get metadata for multiple books
         
+        Books with the same title and author are looked up once. Books that
+        carry an ISBN are first looked up in bulk on Google Books. The searches
+        for all other books are started up front on the thread pool, so their
+        network round trips overlap.
+        
         Args:
             books: List of book dictionaries with 'title' and 'author' keys
-            
+        
         Returns:
             List of enhanced book dictionaries with metadata
         """
-        logger.info(f"🔍 Fetching metadata for {len(books)} books...")
+        logger.info("🔍 Fetching metadata for %d books...", len(books))
         
-        enhanced_books = []
-        for i, book in enumerate(books, 1):
-            logger.info(f"📚 Processing book {i}/{len(books)}: {book.get('title', 'Unknown')}")
-            
-            # Get metadata
-            metadata = self.get_book_metadata(
-                title=book.get('title', ''),
-                author=book.get('author', '')
-            )
-            
-            # Merge with original book data
-            enhanced_book = {**book, **metadata}
-            enhanced_books.append(enhanced_book)
-            
-            # Small delay to be respectful to APIs
-            time.sleep(0.2)
+        unique_books, keys = self._unique_books(books)
+        lookups = self._isbn_lookups(unique_books)
+        metadata_by_key = self._metadata_from_isbns(unique_books, lookups, self.search_google_books_bulk(sorted(set(lookups.values()))))
+        
+        searches = {}
+        for i, (key, book) in enumerate(unique_books.items(), 1):
+            if key in metadata_by_key:
+                continue
+            cached = self._cache.get(key)
+            if cached is not None:
+                metadata_by_key[key] = dict(cached)
+                continue
+            logger.debug("📚 Processing book %d/%d: %s", i, len(unique_books), book.get('title', 'Unknown'))
+            searches[key] = self._submit_searches(book.get('title', ''), book.get('author', ''))
+        
+        # Get metadata
+        for key, book_searches in searches.items():
+            book = unique_books[key]
+            metadata_by_key[key] = self._collect_metadata(key, book.get('title', ''), book.get('author', ''), book_searches)
+        
+        # Merge with original book data
+        enhanced_books = [{**book, **metadata_by_key[key]} for book, key in zip(books, keys)]
+        
+        logger.info("✅ Enhanced metadata for %d books", len(enhanced_books))
+        return enhanced_books
+    
+    async def aget_multiple_books_metadata(self, books: List[Dict]) -> List[Dict]:
+        """
+        Get metadata for multiple books concurrently
+        
+        At most max_concurrency books are looked up at the same time, and
+        books with the same title and author are looked up once. Books that
+        carry an ISBN are first looked up in bulk on Google Books.
+        
+        Args:
+            books: List of book dictionaries with 'title' and 'author' keys
+        
+        Returns:
+            List of enhanced book dictionaries with metadata, in input order
+        """
+        logger.info("🔍 Fetching metadata for %d books...", len(books))
+        
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def fetch(client: httpx.AsyncClient, book: Dict) -> Dict:
+            async with semaphore:
+                return await self.aget_book_metadata(
+                    title=book.get('title', ''),
+                    author=book.get('author', ''),
+                    client=client
+                )
+        
+        unique_books, keys = self._unique_books(books)
+        client = self._get_async_client()
+        
+        lookups = self._isbn_lookups(unique_books)
+        found = await self.asearch_google_books_bulk(client, sorted(set(lookups.values())))
+        metadata_by_key = self._metadata_from_isbns(unique_books, lookups, found)
+        
+        remaining = [key for key in unique_books if key not in metadata_by_key]
+        results = await asyncio.gather(*(fetch(client, unique_books[key]) for key in remaining))
+        metadata_by_key.update(zip(remaining, results))
+        
+        # Merge with original book data
+        enhanced_books = [{**book, **metadata_by_key[key]} for book, key in zip(books, keys)]
         
-        logger.info(f"✅ Enhanced metadata for {len(enhanced_books)} books")
+        logger.info("✅ Enhanced metadata for %d books", len(enhanced_books))
         return enhanced_books
 
 # Global instance
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Import backend modules the way the server does when run from backend/
+sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -0,0 +1,109 @@
+import orjson
+import pytest
+
+try:
+    from api.recommend import RecommendationStreamParser
+except ImportError:
+    from backend.api.recommend import RecommendationStreamParser
+
+
+BOOKS = [
+    {"title": "Dune", "author": "Frank Herbert", "genre": "Science Fiction"},
+    {"title": "Emma", "author": "Jane Austen", "genre": "Romance"},
+]
+
+TRICKY_BOOKS = [
+    {"title": "The {Curly} Brace", "author": "A \"Quoted\" Author", "genre": "Poetry"},
+    {"title": "Back\\slash }{", "author": "Esc \\\" Ape", "genre": "Drama", "tags": ["a", {"nested": "}"}]},
+]
+
+
+def feed_chunks(parser, text, chunk_sizes):
+    """Feed text to the parser in chunks of the given sizes, cycling through them"""
+    objects = []
+    position = 0
+    index = 0
+    while position < len(text):
+        size = chunk_sizes[index % len(chunk_sizes)]
+        objects.extend(parser.feed(text[position:position + size]))
+        position += size
+        index += 1
+    return objects
+
+
+def split_everywhere(text):
+    """Yield (head, tail) for every split point of text"""
+    for offset in range(len(text) + 1):
+        yield text[:offset], text[offset:]
+
+
+def test_wrapped_array_in_one_chunk():
+    text = orjson.dumps({"recommendations": BOOKS}).decode()
+
+    assert RecommendationStreamParser(object_depth=1).feed(text) == BOOKS
+
+
+@pytest.mark.parametrize("books", [BOOKS, TRICKY_BOOKS])
+def test_wrapped_array_split_at_every_offset(books):
+    text = orjson.dumps({"recommendations": books}).decode()
+
+    for head, tail in split_everywhere(text):
+        parser = RecommendationStreamParser(object_depth=1)
+        assert parser.feed(head) + parser.feed(tail) == books, (head, tail)
+
+
+@pytest.mark.parametrize("chunk_sizes", [[1], [2], [3, 1], [7, 2, 5]])
+def test_wrapped_array_fed_in_small_chunks(chunk_sizes):
+    text = orjson.dumps({"recommendations": BOOKS + TRICKY_BOOKS}).decode()
+
+    parser = RecommendationStreamParser(object_depth=1)
+    assert feed_chunks(parser, text, chunk_sizes) == BOOKS + TRICKY_BOOKS
+
+
+def test_objects_are_returned_by_the_chunk_that_closes_them():
+    first = orjson.dumps(BOOKS[0]).decode()
+    second = orjson.dumps(BOOKS[1]).decode()
+    parser = RecommendationStreamParser(object_depth=1)
+
+    assert parser.feed('{"recommendations": [' + first[:-1]) == []
+    assert parser.feed('}, ' + second[:5]) == [BOOKS[0]]
+    assert parser.feed(second[5:]) == [BOOKS[1]]
+    assert parser.feed(']}') == []
+
+
+def test_braces_and_escaped_quotes_inside_strings():
+    text = orjson.dumps({"recommendations": TRICKY_BOOKS}).decode()
+    assert '\\"' in text and '\\\\' in text
+
+    for chunk_size in (1, 2, 3):
+        parser = RecommendationStreamParser(object_depth=1)
+        assert feed_chunks(parser, text, [chunk_size]) == TRICKY_BOOKS
+
+
+def test_split_inside_escape_sequence():
+    text = orjson.dumps({"recommendations": [TRICKY_BOOKS[0]]}).decode()
+    offset = text.index('\\"') + 1
+
+    parser = RecommendationStreamParser(object_depth=1)
+    assert parser.feed(text[:offset]) == []
+    assert parser.feed(text[offset:]) == [TRICKY_BOOKS[0]]
+
+
+def test_bare_array_with_zero_object_depth():
+    text = orjson.dumps(BOOKS + TRICKY_BOOKS).decode()
+
+    for head, tail in split_everywhere(text):
+        parser = RecommendationStreamParser()
+        assert parser.feed(head) + parser.feed(tail) == BOOKS + TRICKY_BOOKS, (head, tail)
+
+
+def test_zero_object_depth_returns_the_wrapper_itself():
+    text = orjson.dumps({"recommendations": BOOKS}).decode()
+
+    assert RecommendationStreamParser().feed(text) == [{"recommendations": BOOKS}]
+
+
+def test_malformed_object_is_skipped():
+    text = '[{"title": "Broken",}, ' + orjson.dumps(BOOKS[0]).decode() + ']'
+
+    assert RecommendationStreamParser().feed(text) == [BOOKS[0]]
@@ -0,0 +1,130 @@
+import hashlib
+import logging
+import shelve
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Project-level directory for caches that should survive restarts
+CACHE_DIR = Path(__file__).parent.parent.parent / ".cache"
+
+# Every DiskCache created, so they can all be closed at shutdown
+_open_caches: List["DiskCache"] = []
+
+
+def cache_key(*parts: Optional[str]) -> str:
+    """
+    Build a short, case-insensitive cache key from string parts
+    
+    Args:
+        *parts: Values identifying the entry, e.g. title and author
+    
+    Returns:
+        16 character hex digest
+    """
+    joined = "|".join((part or "").strip().lower() for part in parts)
+    return hashlib.blake2b(joined.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class DiskCache:
+    """
+    Persistent key/value cache backed by a shelve file
+    
+    The most recently used entries are also kept in memory, so hot repeats
+    don't touch the disk. Entries older than `ttl` seconds are ignored and
+    deleted when they are next looked up.
+    Failing to open or write the file only disables persistence.
+    """
+
+    def __init__(self, name: str, ttl: Optional[float] = None, memory_size: int = 4096):
+        """
+        Args:
+            name: File name of the cache inside CACHE_DIR
+            ttl: Seconds an entry stays valid, or None to keep entries forever
+            memory_size: Number of entries kept in memory
+        """
+        self.ttl = ttl
+        self.memory_size = memory_size
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            self._store = shelve.open(str(CACHE_DIR / name))
+        except Exception as e:
+            logger.warning("⚠️ Cache '%s' not persisted: %s", name, e)
+            self._store = None
+        else:
+            _open_caches.append(self)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get the value stored for a key, or None if missing or expired"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None and self._store is not None:
+                entry = self._store.get(key)
+            if entry is None:
+                return None
+            
+            stored_at, value = entry
+            if self.ttl is not None and time.time() - stored_at > self.ttl:
+                self._forget(key)
+                return None
+            
+            self._remember(key, entry)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value for a key, in memory and on disk"""
+        entry = (time.time(), value)
+        with self._lock:
+            self._remember(key, entry)
+            if self._store is not None:
+                try:
+                    self._store[key] = entry
+                except Exception as e:
+                    logger.warning("⚠️ Failed to persist cache entry: %s", e)
+
+    def _remember(self, key: str, entry: tuple) -> None:
+        """Keep an entry in memory, evicting the least recently used one"""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _forget(self, key: str) -> None:
+        """Drop an expired entry from memory and from disk"""
+        self._memory.pop(key, None)
+        if self._store is not None:
+            try:
+                del self._store[key]
+            except KeyError:
+                pass
+            except Exception as e:
+                logger.warning("⚠️ Failed to delete expired cache entry: %s", e)
+
+    def close(self) -> None:
+        """
+        Flush and close the shelve file; later writes only go to memory
+        
+        Some dbm backends (e.g. dbm.dumb) only write their index on close,
+        so entries stored before a restart are lost without this.
+        """
+        with self._lock:
+            if self._store is None:
+                return
+            try:
+                self._store.close()
+            except Exception as e:
+                logger.warning("⚠️ Failed to close cache: %s", e)
+            self._store = None
+
+
+def close_caches() -> None:
+    """Close every DiskCache opened by this process"""
+    while _open_caches:
+        _open_caches.pop().close()
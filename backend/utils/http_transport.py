@@ -0,0 +1,107 @@
+import asyncio
+from typing import Optional
+
+import httpx
+
+# aiohttp is optional; fall back to httpx's own connection pool without it
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class _AiohttpResponseStream(httpx.AsyncByteStream):
+    """Response body read from an aiohttp response as it arrives"""
+    
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, response: "aiohttp.ClientResponse"):
+        self._response = response
+
+    async def __aiter__(self):
+        async for chunk in self._response.content.iter_chunked(self.CHUNK_SIZE):
+            yield chunk
+
+    async def aclose(self):
+        self._response.release()
+
+
+class AiohttpTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport that sends requests through an aiohttp session
+    
+    httpx's async connection pool serializes many concurrent requests to the
+    same host, so dozens of parallel OpenAI calls end up waiting on each
+    other. aiohttp's connector doesn't, and the OpenAI SDK still sees a
+    regular httpx client.
+    """
+
+    def __init__(self, max_connections: int = 64):
+        """
+        Args:
+            max_connections: Maximum number of simultaneous connections
+        """
+        self.max_connections = max_connections
+        self._session: Optional["aiohttp.ClientSession"] = None
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        """Get the session, created inside the running event loop on first use"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                # httpx decodes the body itself from the Content-Encoding header
+                auto_decompress=False
+            )
+        return self._session
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        timeout = request.extensions.get("timeout", {})
+        body = await request.aread()
+        
+        try:
+            response = await self._get_session().request(
+                request.method,
+                str(request.url),
+                headers=[(key.decode("latin-1"), value.decode("latin-1")) for key, value in request.headers.raw],
+                data=body or None,
+                allow_redirects=False,
+                timeout=aiohttp.ClientTimeout(
+                    sock_connect=timeout.get("connect"),
+                    sock_read=timeout.get("read")
+                )
+            )
+        except asyncio.TimeoutError as e:
+            raise httpx.ReadTimeout(str(e), request=request) from e
+        except aiohttp.ClientConnectionError as e:
+            raise httpx.ConnectError(str(e), request=request) from e
+        
+        return httpx.Response(
+            status_code=response.status,
+            headers=response.raw_headers,
+            stream=_AiohttpResponseStream(response),
+            request=request
+        )
+
+    async def aclose(self):
+        if self._session is not None:
+            await self._session.close()
+
+
+def create_async_http_client(timeout: float = 30.0, max_connections: int = 64) -> httpx.AsyncClient:
+    """
+    Create an async HTTP client for high-concurrency API calls
+    
+    Args:
+        timeout: Request timeout in seconds
+        max_connections: Maximum number of simultaneous connections
+    
+    Returns:
+        httpx.AsyncClient backed by aiohttp when it is installed
+    """
+    if aiohttp is None:
+        return httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_keepalive_connections=max_connections, max_connections=max_connections)
+        )
+    
+    return httpx.AsyncClient(timeout=timeout, transport=AiohttpTransport(max_connections))
@@ -1,11 +1,81 @@
 import cv2
 import numpy as np
 from PIL import Image
-import base64
-import io
 from typing import Tuple, Optional
 import os
 
+# pybase64 is an optional SIMD drop-in for the stdlib base64 module
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+# libjpeg-turbo is optional; fall back to OpenCV when it cannot be loaded
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+    _turbo_jpeg = TurboJPEG()
+except Exception:
+    _turbo_jpeg = None
+
+JPEG_MAGIC = b'\xff\xd8\xff'
+
+# cv2.rotate codes for counterclockwise rotations by right angles
+ORTHOGONAL_ROTATIONS = {
+    90: cv2.ROTATE_90_COUNTERCLOCKWISE,
+    180: cv2.ROTATE_180,
+    270: cv2.ROTATE_90_CLOCKWISE
+}
+
+def is_jpeg(data: bytes) -> bool:
+    """
+    Check whether encoded image bytes are a JPEG
+    
+    Args:
+        data: Encoded image bytes
+        
+    Returns:
+        bool: True if the data starts with a JPEG marker
+    """
+    return data[:3] == JPEG_MAGIC
+
+def decode_image(data: bytes) -> Optional[np.ndarray]:
+    """
+    Decode image bytes to a BGR array, using libjpeg-turbo for JPEGs
+    
+    Args:
+        data: Encoded image bytes
+        
+    Returns:
+        OpenCV image (BGR format), or None if the data cannot be decoded
+    """
+    if _turbo_jpeg is not None and is_jpeg(data):
+        try:
+            return _turbo_jpeg.decode(data, pixel_format=TJPF_BGR)
+        except Exception:
+            pass
+    
+    return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+
+def encode_jpeg(image: np.ndarray, quality: int = 85) -> bytes:
+    """
+    Encode a BGR image as JPEG bytes, using libjpeg-turbo when available
+    
+    Args:
+        image: OpenCV image (BGR format)
+        quality: JPEG quality (1-100)
+        
+    Returns:
+        JPEG encoded bytes
+    """
+    if _turbo_jpeg is not None:
+        return _turbo_jpeg.encode(image, quality=quality, pixel_format=TJPF_BGR)
+    
+    params = [cv2.IMWRITE_JPEG_QUALITY, quality, cv2.IMWRITE_JPEG_OPTIMIZE, 1]
+    success, buffer = cv2.imencode('.jpg', image, params)
+    if not success:
+        raise ValueError("Failed to encode image as JPEG")
+    return buffer.tobytes()
+
 def validate_image_file(file_path: str) -> bool:
     """
     Validate if the file is a valid image
@@ -21,13 +91,10 @@ def validate_image_file(file_path: str) -> bool:
         if not os.path.exists(file_path):
             return False
         
-        # Try to open with OpenCV
-        image = cv2.imread(file_path)
-        if image is None:
-            return False
-        
-        # Check image dimensions
-        height, width = image.shape[:2]
+        # Check the header and dimensions with PIL, without decoding pixels
+        with Image.open(file_path) as image:
+            image.verify()
+            width, height = image.size
         if height < 10 or width < 10:
             return False
         
@@ -36,13 +103,29 @@ def validate_image_file(file_path: str) -> bool:
     except Exception:
         return False
 
-def resize_image(image: np.ndarray, max_size: int = 2048) -> np.ndarray:
+def resize_interpolation(scale: float, high_quality: bool = False) -> int:
+    """
+    Pick the OpenCV interpolation for resizing by a scale factor
+    
+    Args:
+        scale: New size divided by the old size
+        high_quality: Use Lanczos, which is sharper but much slower
+        
+    Returns:
+        cv2 interpolation flag: INTER_AREA when shrinking, INTER_LINEAR when enlarging
+    """
+    if high_quality:
+        return cv2.INTER_LANCZOS4
+    return cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR
+
+def resize_image(image: np.ndarray, max_size: int = 2048, high_quality: bool = False) -> np.ndarray:
     """
     Resize image while maintaining aspect ratio
     
     Args:
         image: Input image
         max_size: Maximum dimension size
+        high_quality: Resample with Lanczos instead of area averaging
         
     Returns:
         Resized image
@@ -58,7 +141,7 @@ def resize_image(image: np.ndarray, max_size: int = 2048) -> np.ndarray:
     new_height = int(height * scale)
     
     # Resize image
-    resized = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_LANCZOS4)
+    resized = cv2.resize(image, (new_width, new_height), interpolation=resize_interpolation(scale, high_quality))
     
     return resized
 
@@ -72,23 +155,25 @@ def enhance_image(image: np.ndarray) -> np.ndarray:
     Returns:
         Enhanced image
     """
-    # Convert to LAB color space
-    lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
-    l, a, b = cv2.split(lab)
+    # Convert to YCrCb; only luminance is equalized, and unlike LAB the
+    # conversion is a linear integer transform
+    ycrcb = cv2.cvtColor(image, cv2.COLOR_BGR2YCrCb)
     
-    # Apply CLAHE (Contrast Limited Adaptive Histogram Equalization)
+    # Apply CLAHE (Contrast Limited Adaptive Histogram Equalization) to the
+    # Y channel in place, without splitting and merging the channels
     clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-    l = clahe.apply(l)
+    ycrcb[:, :, 0] = clahe.apply(np.ascontiguousarray(ycrcb[:, :, 0]))
     
-    # Merge channels and convert back to BGR
-    enhanced = cv2.merge([l, a, b])
-    enhanced = cv2.cvtColor(enhanced, cv2.COLOR_LAB2BGR)
+    # Convert back to BGR, reusing the YCrCb buffer as the destination
+    enhanced = cv2.cvtColor(ycrcb, cv2.COLOR_YCrCb2BGR, dst=ycrcb)
     
-    # Apply slight sharpening
-    kernel = np.array([[-1, -1, -1],
-                       [-1,  9, -1],
-                       [-1, -1, -1]])
-    sharpened = cv2.filter2D(enhanced, -1, kernel)
+    # Apply slight sharpening: the 3x3 kernel with 9 in the center and -1
+    # around it is 10 * pixel - (sum of its 3x3 neighbourhood). A separable
+    # box sum plus addWeighted gives the same result on SIMD paths. The
+    # neighbourhood sum has its own buffer, so addWeighted can write over
+    # the pixels it reads.
+    neighbourhood = cv2.boxFilter(enhanced, cv2.CV_16S, (3, 3), normalize=False)
+    sharpened = cv2.addWeighted(enhanced, 10, neighbourhood, -1, 0, dst=enhanced, dtype=cv2.CV_8U)
     
     return sharpened
 
@@ -104,20 +189,18 @@ def image_to_base64(image: np.ndarray, format: str = 'JPEG', quality: int = 95)
     Returns:
         Base64 encoded image string
     """
-    # Convert BGR to RGB
-    rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-    
-    # Convert to PIL Image
-    pil_image = Image.fromarray(rgb_image)
-    
-    # Convert to base64
-    buffer = io.BytesIO()
-    pil_image.save(buffer, format=format, quality=quality)
-    img_bytes = buffer.getvalue()
-    
-    return base64.b64encode(img_bytes).decode('utf-8')
+    # Encode straight from BGR; no RGB conversion or PIL copy
+    if format.upper() in ('JPEG', 'JPG'):
+        img_bytes = encode_jpeg(image, quality=quality)
+    else:
+        success, buffer = cv2.imencode(f'.{format.lower()}', image)
+        if not success:
+            raise ValueError(f"Failed to encode image as {format}")
+        img_bytes = buffer.tobytes()
+    
+    return base64.b64encode(img_bytes).decode('ascii')
 
-def base64_to_image(base64_string: str) -> np.ndarray:
+def base64_to_image(base64_string: str) -> Optional[np.ndarray]:
     """
     Convert base64 string to OpenCV image
     
@@ -125,26 +208,19 @@ def base64_to_image(base64_string: str) -> np.ndarray:
         base64_string: Base64 encoded image
         
     Returns:
-        OpenCV image (BGR format)
+        OpenCV image (BGR format), or None if the data cannot be decoded
     """
-    # Decode base64
-    img_bytes = base64.b64decode(base64_string)
-    
-    # Convert to PIL Image
-    pil_image = Image.open(io.BytesIO(img_bytes))
-    
-    # Convert to OpenCV format
-    opencv_image = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
-    
-    return opencv_image
+    # Decode base64, then straight to BGR; no PIL copy or RGB conversion
+    return decode_image(base64.b64decode(base64_string))
 
-def create_thumbnail(image: np.ndarray, size: Tuple[int, int] = (300, 400)) -> np.ndarray:
+def create_thumbnail(image: np.ndarray, size: Tuple[int, int] = (300, 400), high_quality: bool = False) -> np.ndarray:
     """
     Create a thumbnail of the image
     
     Args:
         image: Input image
         size: Thumbnail size (width, height)
+        high_quality: Resample with Lanczos instead of area averaging
         
     Returns:
         Thumbnail image
@@ -158,18 +234,16 @@ def create_thumbnail(image: np.ndarray, size: Tuple[int, int] = (300, 400)) -> n
     new_height = int(height * scale)
     
     # Resize image
-    thumbnail = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_LANCZOS4)
+    thumbnail = cv2.resize(image, (new_width, new_height), interpolation=resize_interpolation(scale, high_quality))
     
-    # Create canvas with target size
-    canvas = np.zeros((target_height, target_width, 3), dtype=np.uint8)
+    # Center the thumbnail on a black canvas of the target size, padding
+    # only the bars around it in a single pass
+    top = (target_height - new_height) // 2
+    left = (target_width - new_width) // 2
+    bottom = target_height - new_height - top
+    right = target_width - new_width - left
     
-    # Center the thumbnail on the canvas
-    y_offset = (target_height - new_height) // 2
-    x_offset = (target_width - new_width) // 2
-    
-    canvas[y_offset:y_offset + new_height, x_offset:x_offset + new_width] = thumbnail
-    
-    return canvas
+    return cv2.copyMakeBorder(thumbnail, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(0, 0, 0))
 
 def detect_image_orientation(image: np.ndarray) -> str:
     """
@@ -194,13 +268,16 @@ def get_image_metadata(image: np.ndarray) -> dict:
     Returns:
         Dictionary with image metadata
     """
-    height, width = image.shape[:2]
+    # Read the shape once and derive the orientation inline rather than
+    # through detect_image_orientation
+    shape = image.shape
+    height, width = shape[0], shape[1]
     
     return {
         'width': width,
         'height': height,
-        'channels': image.shape[2] if len(image.shape) > 2 else 1,
-        'orientation': detect_image_orientation(image),
+        'channels': shape[2] if len(shape) > 2 else 1,
+        'orientation': 'landscape' if width > height else 'portrait',
         'aspect_ratio': width / height,
         'total_pixels': width * height
     }
@@ -220,12 +297,17 @@ def crop_image_region(image: np.ndarray, x: int, y: int, width: int, height: int
         Cropped image region
     """
     # Ensure coordinates are within image bounds
-    x = max(0, min(x, image.shape[1] - 1))
-    y = max(0, min(y, image.shape[0] - 1))
-    width = min(width, image.shape[1] - x)
-    height = min(height, image.shape[0] - y)
-    
-    return image[y:y + height, x:x + width]
+    image_height, image_width = image.shape[:2]
+    x = 0 if x < 0 else (image_width - 1 if x >= image_width else x)
+    y = 0 if y < 0 else (image_height - 1 if y >= image_height else y)
+    right = x + width
+    bottom = y + height
+    if right > image_width:
+        right = image_width
+    if bottom > image_height:
+        bottom = image_height
+    
+    return image[y:bottom, x:right]
 
 def rotate_image(image: np.ndarray, angle: float) -> np.ndarray:
     """
@@ -238,6 +320,14 @@ def rotate_image(image: np.ndarray, angle: float) -> np.ndarray:
     Returns:
         Rotated image
     """
+    # Right angles are a transpose/flip; positive angles turn counterclockwise
+    # like getRotationMatrix2D
+    quarter_turn = ORTHOGONAL_ROTATIONS.get(angle % 360)
+    if quarter_turn is not None:
+        return cv2.rotate(image, quarter_turn)
+    if angle % 360 == 0:
+        return image.copy()
+    
     height, width = image.shape[:2]
     center = (width // 2, height // 2)
     
@@ -0,0 +1,77 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, List, Optional, Set, Tuple
+
+
+class MicroBatcher(ABC):
+    """
+    Collect concurrently submitted items into small batches
+    
+    Items are queued and a background worker takes up to `max_batch` of them
+    at a time, waiting at most `max_wait_ms` for the batch to fill. Subclasses
+    implement `_run_batch`, which receives `(item, future)` pairs and must
+    resolve every future, and expose their own `submit` built on `_enqueue`.
+    If `_run_batch` raises, the futures it left unresolved get the exception.
+    """
+
+    def __init__(self, max_batch: int, max_wait_ms: float):
+        """
+        Args:
+            max_batch: Maximum number of items per batch
+            max_wait_ms: Maximum time to wait for a batch to fill
+        """
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_task: Optional[asyncio.Task] = None
+        self._pending: Set[asyncio.Task] = set()
+
+    async def _enqueue(self, item: Any) -> Any:
+        """Queue an item and wait for the result its batch resolves it with"""
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._worker_task is None or self._worker_task.done():
+            self._worker_task = asyncio.create_task(self._worker())
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _worker(self):
+        """Collect queued items into batches and hand each one to _run_batch"""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                await self._run_batch(batch)
+            except Exception as e:
+                self._fail(batch, e)
+
+    @abstractmethod
+    async def _run_batch(self, batch: List[Tuple[Any, asyncio.Future]]):
+        """Process one batch; the next batch is collected once this returns"""
+
+    def _spawn(self, coroutine: Awaitable) -> None:
+        """Run work in the background so the worker can collect the next batch"""
+        task = asyncio.ensure_future(coroutine)
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    @staticmethod
+    def _fail(batch: List[Tuple[Any, asyncio.Future]], error: BaseException) -> None:
+        """Resolve every unresolved future in a batch with an exception"""
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
@@ -1,6 +1,17 @@
+import os
 import re
 from typing import List, Dict, Any, Optional
-from pathlib import Path
+from uuid import UUID
+
+# Letters, spaces, hyphens and apostrophes
+GENRE_NAME_PATTERN = re.compile(r"^[a-zA-Z\s\-']+$")
+# Alphanumerics, hyphens and underscores
+API_KEY_PATTERN = re.compile(r"^[a-zA-Z0-9\-_]+$")
+# str.translate table deleting null bytes and control characters other
+# than tab, newline and carriage return
+CONTROL_CHARS_TABLE = dict.fromkeys([*range(0x00, 0x09), 0x0b, 0x0c, *range(0x0e, 0x20), 0x7f])
+# Fields every book passed to the validators must have
+REQUIRED_BOOK_FIELDS = ('title', 'author', 'isValid')
 
 class ValidationError(Exception):
     """Custom exception for validation errors"""
@@ -22,17 +33,18 @@ def validate_file_upload(file_path: str, allowed_extensions: List[str], max_size
         ValidationError: If validation fails
     """
     try:
-        # Check if file exists
-        if not Path(file_path).exists():
+        # Check if file exists, with one stat for the size below
+        try:
+            file_size = os.stat(file_path).st_size
+        except FileNotFoundError:
             raise ValidationError("File does not exist")
         
         # Check file extension
-        file_extension = Path(file_path).suffix.lower()
+        file_extension = os.path.splitext(file_path)[1].lower()
         if file_extension not in allowed_extensions:
             raise ValidationError(f"File extension '{file_extension}' not allowed. Allowed: {allowed_extensions}")
         
         # Check file size
-        file_size = Path(file_path).stat().st_size
         if file_size > max_size:
             raise ValidationError(f"File too large: {file_size} bytes. Maximum: {max_size} bytes")
         
@@ -47,6 +59,52 @@ def validate_file_upload(file_path: str, allowed_extensions: List[str], max_size
     except Exception as e:
         raise ValidationError(f"File validation error: {str(e)}")
 
+def _check_book_data(book_data: Dict[str, Any]) -> None:
+    """
+    Run the book data checks without wrapping unexpected errors
+    
+    Args:
+        book_data: Dictionary containing book information
+        
+    Raises:
+        ValidationError: If validation fails
+    """
+    # Check required fields
+    for field in REQUIRED_BOOK_FIELDS:
+        if field not in book_data:
+            raise ValidationError(f"Missing required field: {field}")
+    
+    # Validate title
+    title = book_data.get('title', '').strip()
+    if not title:
+        raise ValidationError("Title cannot be empty")
+    
+    if len(title) > 500:
+        raise ValidationError("Title too long (max 500 characters)")
+    
+    # Validate author
+    author = book_data.get('author', '').strip()
+    if not author:
+        raise ValidationError("Author cannot be empty")
+    
+    if len(author) > 200:
+        raise ValidationError("Author name too long (max 200 characters)")
+    
+    # Validate isValid field
+    if not isinstance(book_data.get('isValid'), bool):
+        raise ValidationError("isValid must be a boolean")
+    
+    # Validate optional fields if present
+    if 'rating' in book_data:
+        rating = book_data['rating']
+        if not isinstance(rating, (int, float)) or not (0 <= rating <= 5):
+            raise ValidationError("Rating must be a number between 0 and 5")
+    
+    if 'reasoning' in book_data:
+        reasoning = book_data['reasoning']
+        if not isinstance(reasoning, str):
+            raise ValidationError("Reasoning must be a string")
+
 def validate_book_data(book_data: Dict[str, Any]) -> bool:
     """
     Validate book data structure and content
@@ -61,43 +119,7 @@ def validate_book_data(book_data: Dict[str, Any]) -> bool:
         ValidationError: If validation fails
     """
     try:
-        # Check required fields
-        required_fields = ['title', 'author', 'isValid']
-        for field in required_fields:
-            if field not in book_data:
-                raise ValidationError(f"Missing required field: {field}")
-        
-        # Validate title
-        title = book_data.get('title', '').strip()
-        if not title:
-            raise ValidationError("Title cannot be empty")
-        
-        if len(title) > 500:
-            raise ValidationError("Title too long (max 500 characters)")
-        
-        # Validate author
-        author = book_data.get('author', '').strip()
-        if not author:
-            raise ValidationError("Author cannot be empty")
-        
-        if len(author) > 200:
-            raise ValidationError("Author name too long (max 200 characters)")
-        
-        # Validate isValid field
-        if not isinstance(book_data.get('isValid'), bool):
-            raise ValidationError("isValid must be a boolean")
-        
-        # Validate optional fields if present
-        if 'rating' in book_data:
-            rating = book_data['rating']
-            if not isinstance(rating, (int, float)) or not (0 <= rating <= 5):
-                raise ValidationError("Rating must be a number between 0 and 5")
-        
-        if 'reasoning' in book_data:
-            reasoning = book_data['reasoning']
-            if not isinstance(reasoning, str):
-                raise ValidationError("Reasoning must be a string")
-        
+        _check_book_data(book_data)
         return True
         
     except ValidationError:
@@ -141,7 +163,7 @@ def validate_genre_list(genres: List[str]) -> bool:
                 raise ValidationError(f"Genre name too long: {genre}")
             
             # Check for valid characters (letters, spaces, hyphens, apostrophes)
-            if not re.match(r"^[a-zA-Z\s\-']+$", genre):
+            if not GENRE_NAME_PATTERN.match(genre):
                 raise ValidationError(f"Invalid genre name: {genre}")
         
         return True
@@ -180,7 +202,7 @@ def validate_api_key(api_key: str, key_type: str = "API") -> bool:
             raise ValidationError(f"{key_type} key too long (max 200 characters)")
         
         # Check for valid characters (alphanumeric, hyphens, underscores)
-        if not re.match(r"^[a-zA-Z0-9\-_]+$", api_key):
+        if not API_KEY_PATTERN.match(api_key):
             raise ValidationError(f"Invalid {key_type} key format")
         
         return True
@@ -212,9 +234,13 @@ def validate_file_id(file_id: str) -> bool:
         
         file_id = file_id.strip()
         
-        # Check UUID format (basic pattern)
-        uuid_pattern = r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$"
-        if not re.match(uuid_pattern, file_id, re.IGNORECASE):
+        # Check UUID format; UUID() also takes braces, URNs and missing
+        # hyphens, so only the canonical 8-4-4-4-12 form round-trips
+        try:
+            valid = str(UUID(file_id)) == file_id.lower()
+        except ValueError:
+            valid = False
+        if not valid:
             raise ValidationError("Invalid file ID format (must be UUID)")
         
         return True
@@ -270,7 +296,7 @@ def sanitize_string(input_string: str, max_length: int = 1000) -> str:
         return ""
     
     # Remove null bytes and control characters
-    sanitized = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]', '', input_string)
+    sanitized = input_string.translate(CONTROL_CHARS_TABLE)
     
     # Limit length
     sanitized = sanitized[:max_length]
@@ -304,12 +330,13 @@ def validate_recommendation_params(
         if not isinstance(detected_books, list):
             raise ValidationError("Detected books must be a list")
         
-        # Validate each book in detected_books
+        # Validate each book in detected_books; the checks run directly, as
+        # this function's own handler already wraps unexpected errors
         for i, book in enumerate(detected_books):
             if not isinstance(book, dict):
                 raise ValidationError(f"Book at index {i} must be a dictionary")
             
-            validate_book_data(book)
+            _check_book_data(book)
         
         # Validate preferred_genres
         validate_genre_list(preferred_genres)
@@ -9,6 +9,15 @@ import sys
 from pathlib import Path
 from dotenv import load_dotenv
 
+# uvloop and httptools are optional C implementations of the event loop and
+# HTTP parser; fall back to uvicorn's defaults when they are not installed
+try:
+    import uvloop  # noqa: F401
+    import httptools  # noqa: F401
+    SERVER_BACKENDS = {"loop": "uvloop", "http": "httptools"}
+except ImportError:
+    SERVER_BACKENDS = {}
+
 def check_requirements():
     """Check if all required files and directories exist"""
     required_files = [
@@ -19,10 +28,7 @@ def check_requirements():
         "frontend/script.js"
     ]
     
-    missing_files = []
-    for file_path in required_files:
-        if not Path(file_path).exists():
-            missing_files.append(file_path)
+    missing_files = [file_path for file_path in required_files if not os.path.exists(file_path)]
     
     if missing_files:
         print("❌ Missing required files:")
@@ -36,9 +42,13 @@ def check_environment():
     """Check environment variables and configuration"""
     # Load environment variables
     load_dotenv(".env")    
-    # Check required environment variables
+    # Check required and optional environment variables in one pass
     required_vars = ["OPENAI_API_KEY"]
-    missing_vars = [var for var in required_vars if not os.getenv(var)]
+    optional_vars = ["GOODREADS_API_KEY"]
+    missing_vars, missing_optional = [], []
+    for var in required_vars + optional_vars:
+        if not os.getenv(var):
+            (missing_vars if var in required_vars else missing_optional).append(var)
     
     if missing_vars:
         print("❌ Missing required environment variables:")
@@ -48,10 +58,6 @@ def check_environment():
         print("   You can copy env.example to .env and fill in your API keys.")
         return False
     
-    # Check optional environment variables
-    optional_vars = ["GOODREADS_API_KEY"]
-    missing_optional = [var for var in optional_vars if not os.getenv(var)]
-    
     if missing_optional:
         print("⚠️  Optional environment variables not set:")
         for var in missing_optional:
@@ -64,7 +70,7 @@ def check_model_files():
     """Check if YOLO model files exist"""
     model_path = os.getenv("MODEL_PATH", "models/yolo_weights/best.pt")
     
-    if not Path(model_path).exists():
+    if not os.path.exists(model_path):
         print(f"⚠️  YOLO model not found at: {model_path}")
         print("   Please ensure your trained model is in the correct location.")
         print("   The app will still run but book detection may not work.")
@@ -123,7 +129,8 @@ def main():
             port=8000,
             reload=True,
             reload_dirs=["backend"],
-            log_level="info"
+            log_level="info",
+            **SERVER_BACKENDS
         )
     except KeyboardInterrupt:
         print("\n\n👋 Server stopped. Goodbye!")